@@ -8,7 +8,7 @@ Tested on NodeMCU and Wemos D1 Mini (ESP8266) MicroPython v1.8.7-7-gb5a1a20a3
 and MicroPython v1.9.3-8-g63826ac5c on 2017-11-01; ESP module with ESP8266
 """
 
-from machine import I2C
+from machine import I2C, Pin
 
 class CCS811(object):
     """CCS811 gas sensor. Measures eCO2 in ppm and TVOC in ppb"""
@@ -20,6 +20,9 @@ class CCS811(object):
         self.eCO2 = 0
         self.mode = 1       # Constant power mode; measurement every second
         self.error = False
+        self.data_pending = False
+        # ALG_RESULT_DATA: eCO2 (2), TVOC (2), STATUS, ERROR_ID, RAW_DATA (2)
+        self.result = bytearray(8)
 
         # Check if sensor is vailable at i2c bus address
         devices = i2c.scan()
@@ -61,6 +64,30 @@ class CCS811(object):
         else:
             return False
 
+    def read_results(self):
+        """Burst read of ALG_RESULT_DATA (0x02) including STATUS and ERROR_ID.
+        One I2C transaction instead of two in data_ready(). Returns true if
+        new data was downloaded. Values in .eCO2 and .tVOC, error id in .error"""
+        self.data_pending = False
+        self.i2c.readfrom_mem_into(self.addr, 0x02, self.result)
+        status = self.result[4]
+        # bit 0 in the status register: error, details in ERROR_ID
+        self.error = self.result[5] if status & 0x01 else False
+        # bit 3 in the status register: data_ready
+        if not (status >> 3) & 0x01:
+            return False
+        self.eCO2 = (self.result[0] << 8) | self.result[1]
+        self.tVOC = (self.result[2] << 8) | self.result[3]
+        return True
+
+    def irq(self, pin):
+        """Use the nINT pin (active low, INT_DATARDY is set in MEAS_MODE).
+        The handler only sets .data_pending, the bus is read in read_results()"""
+        pin.irq(trigger=Pin.IRQ_FALLING, handler=self._data_ready_irq)
+
+    def _data_ready_irq(self, pin):
+        self.data_pending = True
+
     def get_baseline(self):
         register = self.i2c.readfrom_mem(self.addr,0x11,2)
         HB = register[0]
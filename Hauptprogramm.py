@@ -14,6 +14,7 @@ import network
 from umqtt.simple import MQTTClient
 from Start import wlan_ssid, wlan_passwort, broker_ip # Daten aus der der Start Datei ziehen
 from aht10 import AHT10  # Temperatur- und Luftfeuchtigkeitssensor
+from messfilter import Messfilter # Filtern von Messwerten, um Ausreißer zu entfernen
 import CCS811 # Luftqualitätssensor
 from ir_tx.nec import NEC # IR-Transmitter
 import st7789py as st7789 #Bildschirm-Bibliothek
@@ -93,11 +94,6 @@ raumtemperatur = 0
 luftfeuchtigkeit = 0
 co2_wert = 0
 tvoc_wert = 0
-raumtemp = []
-raumluft = []
-co2_list = []
-tvoc_list = []
-strom_list = []
 momt_leistung = 0
 ges_verbrauch = 0
 teil_verbrauch = 0
@@ -118,6 +114,13 @@ betriebszahler = 0
 #=====Einstellungen=====#
 messloops = 10  # Anzahl der durchgeführten Messungen bei einem Messzyklus
 
+# Gleitende Messfilter, die letzten "messloops" Werte werden gefiltert
+raumtemp = Messfilter(messloops)
+raumluft = Messfilter(messloops)
+co2_list = Messfilter(messloops)
+tvoc_list = Messfilter(messloops)
+strom_list = Messfilter(messloops)
+
 # Voreinstellung für den Frostschutz
 frostschutzschwellwert = 5 #Wert wenn er aktiviert wird
 frostschutzaus = 7 #Wert wenn er wieder ausgeschaltet wird
@@ -161,39 +164,26 @@ ir_keys = { 0: 0x1a, # Aus
             2: 0x06, # 2kW
             3: 0x0a} # 3kW
 
-ir_adresse = 0080
+ir_adresse = 80 # Unter MicroPython wurde 0080 als Dezimalzahl 80 gelesen
 
 # Variabel wird benötigt zum Senden der IR-Daten
 ir_code = 0x1a # IR Code grundstellung ist immer auf Aus
 #=======================#
 
 #=====Funktionen=====#
-def messfilter(messwerte):
-    """Filtern von Messwerten, um Ausreißer zu entfernen"""
-    if len(messwerte) < 3:  # Sicherheit, um Fehler zu vermeiden
-    messwerte.sort()  # Werte sortieren
-    messwerte.pop(0)  # Kleinster Wert entfernen
-    messwerte.pop()   # Größter Wert entfernen
-    messwerte = round(sum(messwerte) / len(messwerte), 2)
-    return int(messwerte)
-
-#-------------------------------------------#
 # Messung der Temperatur und Luftfeuchtigkeit
 def messungaht10():
     """Messung der Temperatur und Luftfeuchtigkeit"""
     global raumtemperatur, luftfeuchtigkeit
     try:
-        # Alle Elemente in den Listen werden gelöscht, um sicherzustellen, dass sie leer sind, bevor neue Messdaten hinzugefügt werden.
-        raumtemp.clear()
-        raumluft.clear()
         #Messwerte auslesen
         for i in range(messloops):
-            raumtemp.append(sensoraht10.temperature())
-            raumluft.append(sensoraht10.humidity())
+            raumtemp.hinzufuegen(sensoraht10.temperature())
+            raumluft.hinzufuegen(sensoraht10.humidity())
             
         # Mittelwertfilter anwenden
-        raumtemperatur = messfilter(raumtemp)
-        luftfeuchtigkeit = messfilter(raumluft)
+        raumtemperatur = int(raumtemp.wert())
+        luftfeuchtigkeit = int(raumluft.wert())
         
     except Exception as e:
         print("Fehler beim Lesen des AHT10-Sensors:", e)
@@ -207,18 +197,14 @@ def messungccs811():
     """Messung Luftqualität"""
     global co2_wert, tvoc_wert
     try:
-        # Alle Elemente in den Listen werden gelöscht, um sicherzustellen, dass sie leer sind, bevor neue Messdaten hinzugefügt werden.
-        co2_list.clear()
-        tvoc_list.clear()
-        
         # Messwerte auslesen
         for i in range(messloops):
-            co2_list.append(sensorccs811.eCO2)
-            tvoc_list.append(sensorccs811.tVOC)
+            co2_list.hinzufuegen(sensorccs811.eCO2)
+            tvoc_list.hinzufuegen(sensorccs811.tVOC)
             
         # Mittelwertfilter anwenden
-        co2_wert = messfilter(co2_list)
-        tvoc_wert = messfilter(tvoc_list)
+        co2_wert = int(co2_list.wert())
+        tvoc_wert = int(tvoc_list.wert())
     
     except Exception as e:
         # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
@@ -231,14 +217,12 @@ def messungacs712():
     """Messung des Stroms des Heizstrahlers und Umrechnung in Watt """
     global momt_leistung
     try:
-        strom_list.clear()
-        
         # Messwerte auslesen
         for i in range(messloops):
-            strom_list.append(strom_sensor.read())
+            strom_list.hinzufuegen(strom_sensor.read())
 
         # Mittelwertfilter anwenden
-        mess_strom = messfilter(strom_list)
+        mess_strom = int(strom_list.wert())
 
         # ADC-Wert in Millivolt umrechnen
         strom_in_mv = (mess_strom / 4095.0) * 3300
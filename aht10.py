@@ -9,6 +9,8 @@ from math import log
 #CONSTANTS
 AHT10_ADDRESS = 0x38 # 0111000 (7bit address)
 AHT10_READ_DELAY_MS = 75 # Time it takes for AHT to collect data
+AHT10_POLL_INTERVAL_MS = 10 # Time between two status polls while the sensor is busy
+AHT10_STATUS_BUSY = 0x80 # Bit 7 of the status byte is set while a conversion is running
 AHT_TEMPERATURE_CONST = 200
 AHT_TEMPERATURE_OFFSET = 50
 KILOBYTE_CONST = 1048576
@@ -26,27 +28,63 @@ class AHT10:
         self.i2c = i2c
         self.address = address
         self.i2c.writeto(address, CMD_INITIALIZE)
-        self.readings_raw = bytearray(8)
+        self.readings_raw = bytearray(6)
         self.results_parsed = [0, 0]
         self.mode = mode # 0 for Celsius, 1 for Farenheit
 
     def read_raw(self):
         self.i2c.writeto(self.address, CMD_MEASURE)
         time.sleep_ms(AHT10_READ_DELAY_MS)
-        self.readings_raw = self.i2c.readfrom(AHT10_ADDRESS, 6)
+        self.i2c.readfrom_into(self.address, self.readings_raw)
+        self._parse()
+
+    def trigger(self):
+        """Start one conversion and return immediately. Use poll() to fetch the result."""
+        self.i2c.writeto(self.address, CMD_MEASURE)
+
+    def poll(self):
+        """Read the status and the result in one transaction.
+        Returns False while the sensor is busy, True once the new values are parsed."""
+        self.i2c.readfrom_into(self.address, self.readings_raw)
+        if self.readings_raw[0] & AHT10_STATUS_BUSY:
+            return False
+        self._parse()
+        return True
+
+    def measure(self, timeout_ms=4 * AHT10_READ_DELAY_MS):
+        """Return (temperature, humidity) from a single conversion.
+        Polls the busy bit instead of waiting a fixed delay."""
+        self.trigger()
+        start = time.ticks_ms()
+        while True:
+            time.sleep_ms(AHT10_POLL_INTERVAL_MS)
+            if self.poll():
+                return self.last_temperature(), self.last_humidity()
+            if time.ticks_diff(time.ticks_ms(), start) > timeout_ms:
+                raise OSError('AHT10 conversion timeout')
+
+    def _parse(self):
         self.results_parsed[0] = self.readings_raw[1] << 12 | self.readings_raw[2] << 4 | self.readings_raw[3] >> 4
         self.results_parsed[1] = (self.readings_raw[3] & 0x0F) << 16 | self.readings_raw[4] << 8 | self.readings_raw[5]
 
+    def last_humidity(self):
+        """Humidity of the last conversion, without a new measurement"""
+        return (self.results_parsed[0] / KILOBYTE_CONST) * 100
+
+    def last_temperature(self):
+        """Temperature of the last conversion, without a new measurement"""
+        if self.mode == 0:
+            return (self.results_parsed[1] / KILOBYTE_CONST) * AHT_TEMPERATURE_CONST - AHT_TEMPERATURE_OFFSET
+        else:
+            return ((self.results_parsed[1] / KILOBYTE_CONST) * AHT_TEMPERATURE_CONST - AHT_TEMPERATURE_OFFSET) * FARENHEIT_MULTIPLIER + FARENHEIT_OFFSET
+
     def humidity(self):
         self.read_raw()
-        return (self.results_parsed[0] / KILOBYTE_CONST) * 100 
+        return self.last_humidity()
 
     def temperature(self):
         self.read_raw()
-        if self.mode is 0:
-            return (self.results_parsed[1] / KILOBYTE_CONST) * AHT_TEMPERATURE_CONST - AHT_TEMPERATURE_OFFSET
-        else:
-            return ((self.results_parsed[1] / KILOBYTE_CONST) * AHT_TEMPERATURE_CONST - AHT_TEMPERATURE_OFFSET) * FARENHEIT_MULTIPLIER + FARENHEIT_OFFSET
+        return self.last_temperature()
 
     def set_mode(self, mode):
         if mode is not (0 or 1):
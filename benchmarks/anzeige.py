@@ -0,0 +1,91 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/anzeige
+#Aufgabe: Vergleich der Bildschirmaktualisierung auf dem simulierten ST7789
+#		  Bisher: bei jeder Änderung sechs fill_rect() und text() über SoftSPI
+#		  Statusanzeige: nur geänderte Zeichen aus vorgerasterten Zeichen in einem Fenster
+#		  Gemessen werden Bytes über SPI, Fenster und Rechenzeit pro Aktualisierung
+#Aufruf:  python benchmarks/anzeige.py --aktualisierungen 1000
+
+#=====Bibliotheken=====#
+import argparse
+import random
+import time
+
+import host # Suchpfad
+from simulator.anzeige import SimST7789, Schriftart, CYAN, BLACK
+from statusanzeige import Statusanzeige
+#======================#
+
+# Felder wie auf dem Bildschirm der Steuerung: (x, y, Einheit, Breite des Löschrechtecks)
+FELDER = (
+    (120, 40, "°C", 100),
+    (168, 63, "%", 100),
+    (103, 86, "ppm", 100),
+    (112, 109, "ppb", 100),
+    (175, 132, "W", 100),
+    (167, 155, "kWh", 100),
+    )
+
+
+def messwerte(anzahl, seed):
+    """Folge von Messwerten, bei der sich pro Schritt ein Wert um eine Einheit ändert"""
+    zufall = random.Random(seed)
+    werte = [20, 45, 450, 10, 0, 1.25]
+    folge = []
+    for _ in range(anzahl):
+        feld = zufall.randrange(len(werte))
+        if isinstance(werte[feld], float):
+            werte[feld] = round(werte[feld] + 0.01, 2)
+        else:
+            werte[feld] += zufall.choice((-1, 1))
+        folge.append(list(werte))
+    return folge
+
+
+def direkt(display, werte):
+    """Bisheriger Weg aus task_anzeige: jedes Feld löschen und als Text neu schreiben"""
+    for (x, y, einheit, breite), wert in zip(FELDER, werte):
+        display.fill_rect(x, y, breite, 15, BLACK)
+        display.text(Schriftart, f"{wert} {einheit}", x, y, CYAN, BLACK)
+
+
+def messen(name, folge, aktualisieren):
+    display = SimST7789(None, 240, 320, rotation=1)
+    aktualisieren = aktualisieren(display)
+    aktualisieren(folge[0]) # erste vollständige Anzeige nicht mitzählen
+    bytes_start, fenster_start = display.bytes_spi, display.fenster
+    t0 = time.perf_counter()
+    for werte in folge[1:]:
+        aktualisieren(werte)
+    dauer = time.perf_counter() - t0
+    n = len(folge) - 1
+    print(f"{name:15s} {(display.bytes_spi - bytes_start) / n:10.0f} Bytes  "
+          f"{(display.fenster - fenster_start) / n:6.1f} Fenster  {dauer / n * 1e6:8.1f} µs pro Aktualisierung")
+    return (display.bytes_spi - bytes_start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bildschirmaktualisierung direkt gegen Statusanzeige")
+    parser.add_argument("--aktualisierungen", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    folge = messwerte(args.aktualisierungen + 1, args.seed)
+
+    def statusanzeige(display):
+        anzeige = Statusanzeige(display, Schriftart, CYAN, BLACK)
+        felder = [anzeige.feld(x, y, einheit, nachkommastellen=2) for x, y, einheit, _ in FELDER]
+
+        def aktualisieren(werte):
+            for feld, wert in zip(felder, werte):
+                anzeige.setzen(feld, wert)
+        return aktualisieren
+
+    print("Pro Aktualisierung ändert sich ein Messwert um eine Einheit:")
+    alt = messen("direkt", folge, lambda display: lambda werte: direkt(display, werte))
+    neu = messen("Statusanzeige", folge, statusanzeige)
+    print(f"SPI-Daten: {neu / alt * 100:.1f} % des bisherigen Wegs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/bildaufbau
+#Aufgabe: Bildschirm im RAM (Bildpuffer) gegen direktes Zeichnen auf dem simulierten ST7789
+#		  Vollbild: Bildschirm löschen, Beschriftungen, Werte, Frostschutz-Schwellwert und Fehlertext
+#		  Teilaktualisierung: pro Aktualisierung ändert sich ein Messwert, ab und zu der Fehlertext
+#		  Verlauf: pro Messung eine Spalte mit Hardware-Scrolling gegen den ganzen Verlauf neu zeichnen
+#		  Gemessen werden Bytes über SPI, Fenster, Rechenzeit auf dem PC und die geschätzte
+#		  Übertragungszeit (Bytes bei der SPI-Taktrate plus feste Zeit pro Fenster)
+#Aufruf:  python benchmarks/bildaufbau.py --aktualisierungen 1000 --baudrate 2000000 --fenster-us 50
+
+#=====Bibliotheken=====#
+import argparse
+import time
+
+import host # Suchpfad
+from anzeige import messwerte, direkt, FELDER # Messwertfolge und bisheriger Weg aus benchmarks/anzeige
+from simulator.anzeige import SimST7789, Schriftart, CYAN, BLACK
+from statusanzeige import Statusanzeige
+from bildpuffer import Bildpuffer
+from trendanzeige import Trendanzeige
+#======================#
+
+# Beschriftungen wie in Steuerung.setup()
+BESCHRIFTUNGEN = (
+    ("Temperatur: ", 30, 40),
+    ("Luftfeuchtigkeit: ", 30, 63),
+    ("CO2-Wert: ", 30, 86),
+    ("TVOC-Wert: ", 30, 109),
+    ("Aktuelle Leistung: ", 30, 132),
+    ("Gesamte Leistung: ", 30, 155),
+    ("Frostschutz Einschalten: ", 30, 178),
+    )
+FROSTSCHUTZ = (223, 178, "°C", 5)
+FEHLERTEXT = "MQTT-Publish Fehler -1"
+# Verlauf wie in main.py: (y, Höhe, Minimum, Maximum, Farbe)
+TREND_X = 272
+TREND_KURVEN = ((0, 119, 0, 30, 0xF800), (121, 119, 0, 3000, 0xFFE0))
+
+
+class Direkt:
+    """Bisheriger Weg: alles mit fill_rect() und text() direkt auf den Bildschirm"""
+
+    def __init__(self, display):
+        self.display = display
+
+    def vollbild(self, werte, fehler):
+        display = self.display
+        display.fill(BLACK)
+        for text, x, y in BESCHRIFTUNGEN:
+            display.text(Schriftart, text, x, y, CYAN, BLACK)
+        direkt(display, werte)
+        x, y, einheit, wert = FROSTSCHUTZ
+        display.text(Schriftart, f"{wert} {einheit}", x, y, CYAN, BLACK)
+        self.fehler(fehler)
+
+    def werte(self, werte):
+        direkt(self.display, werte)
+
+    def fehler(self, fehler):
+        self.display.fill_rect(30, 201, 290, 15, BLACK)
+        if fehler:
+            self.display.text(Schriftart, FEHLERTEXT, 30, 201, CYAN, BLACK)
+
+
+class Felder(Direkt):
+    """Statusanzeige (nur geänderte Zeichen), direkt oder in den Bildpuffer gezeichnet"""
+
+    def __init__(self, display, bildpuffer=None):
+        super().__init__(bildpuffer or display)
+        self.bildpuffer = bildpuffer
+        self.anzeige = Statusanzeige(self.display, Schriftart, CYAN, BLACK)
+        self.felder = [self.anzeige.feld(x, y, einheit, nachkommastellen=2) for x, y, einheit, _ in FELDER]
+        x, y, einheit, _ = FROSTSCHUTZ
+        self.feld_frostschutz = self.anzeige.feld(x, y, einheit)
+
+    def senden(self):
+        if self.bildpuffer is not None:
+            self.bildpuffer.senden()
+
+    def vollbild(self, werte, fehler):
+        display = self.display
+        display.fill(BLACK)
+        self.anzeige.neu_zeichnen()
+        for text, x, y in BESCHRIFTUNGEN:
+            display.text(Schriftart, text, x, y, CYAN, BLACK)
+        self.werte(werte, senden=False)
+        self.anzeige.setzen(self.feld_frostschutz, FROSTSCHUTZ[3])
+        self.fehler(fehler)
+
+    def werte(self, werte, senden=True):
+        for feld, wert in zip(self.felder, werte):
+            self.anzeige.setzen(feld, wert)
+        if senden:
+            self.senden()
+
+    def fehler(self, fehler):
+        super().fehler(fehler)
+        self.senden()
+
+
+VARIANTEN = ("direkt", "Statusanzeige", "Bildpuffer")
+
+
+def erstellen(name, display):
+    """Anzeige für einen der verglichenen Wege"""
+    if name == "direkt":
+        return Direkt(display)
+    if name == "Statusanzeige":
+        return Felder(display)
+    return Felder(display, Bildpuffer(display, display.width, display.height))
+
+
+def ausgeben(name, display, start, n, dauer, args):
+    daten = (display.bytes_spi - start[0]) / n
+    fenster = (display.fenster - start[1]) / n
+    spi_ms = daten * 8 / args.baudrate * 1e3 + fenster * args.fenster_us / 1e3
+    print(f"  {name:15s} {daten:10.0f} Bytes  {fenster:6.1f} Fenster  "
+          f"{dauer / n * 1e6:8.1f} µs Rechenzeit  {spi_ms:8.2f} ms SPI (geschätzt)")
+    return spi_ms
+
+
+class VerlaufNeuZeichnen(Trendanzeige):
+    """Vergleich ohne Hardware-Scrolling: bei jeder Messung alle Spalten aus den Ringen
+    in einen Puffer zeichnen und in einem Fenster senden"""
+
+    def __init__(self, txt, x, breite, hoehe, kurven):
+        super().__init__(txt, x, breite, hoehe, kurven)
+        self.bild = bytearray(breite * hoehe * 2)
+
+    def hinzufuegen(self, werte):
+        for ring, wert in zip(self.ringe, werte):
+            ring.hinzufuegen(wert)
+        self.bild[:] = bytes(len(self.bild))
+        anzahl = len(self.ringe[0])
+        self.letzte = [None] * len(self.kurven)
+        for i in range(anzahl):
+            spalte = self.breite - anzahl + i
+            for nummer, (y, hoehe, minimum, maximum, farbe) in enumerate(self.kurven):
+                anteil = min(1, max(0, (self.ringe[nummer][i] - minimum) / (maximum - minimum)))
+                punkt = y + hoehe - 1 - int(anteil * (hoehe - 1) + 0.5)
+                von = punkt if self.letzte[nummer] is None else self.letzte[nummer]
+                self.letzte[nummer] = punkt
+                for zeile in range(min(von, punkt), max(von, punkt) + 1):
+                    pos = (zeile * self.breite + spalte) * 2
+                    self.bild[pos] = farbe >> 8
+                    self.bild[pos + 1] = farbe & 0xFF
+        self.txt.blit_buffer(self.bild, self.x, 0, self.breite, self.hoehe)
+
+
+def verlauf(args):
+    print(f"Verlauf ({args.aktualisierungen} Messungen, {320 - TREND_X} Spalten):")
+    for name, klasse in (("neu zeichnen", VerlaufNeuZeichnen), ("Scrolling", Trendanzeige)):
+        display = SimST7789(None, 240, 320, rotation=1)
+        trend = klasse(display, TREND_X, 320 - TREND_X, 240, TREND_KURVEN)
+        if klasse is Trendanzeige:
+            trend.starten()
+        start = display.bytes_spi, display.fenster
+        t0 = time.perf_counter()
+        for n in range(args.aktualisierungen):
+            trend.hinzufuegen((20 + n % 7, n * 37 % 3000))
+        ausgeben(name, display, start, args.aktualisierungen, time.perf_counter() - t0, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bildpuffer gegen direktes Zeichnen")
+    parser.add_argument("--aktualisierungen", type=int, default=1000)
+    parser.add_argument("--vollbilder", type=int, default=20)
+    parser.add_argument("--fehlerabstand", type=int, default=50, help="jede n-te Aktualisierung wechselt der Fehlertext")
+    parser.add_argument("--baudrate", type=int, default=2000000, help="SPI-Takt in Hz")
+    parser.add_argument("--fenster-us", type=float, default=50, help="feste Zeit pro Fenster (Befehle, CS, DC) in µs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    folge = messwerte(args.aktualisierungen + 1, args.seed)
+
+    print(f"Vollbild ({args.vollbilder}x):")
+    for name in VARIANTEN:
+        display = SimST7789(None, 240, 320, rotation=1)
+        anzeige = erstellen(name, display)
+        start = display.bytes_spi, display.fenster
+        t0 = time.perf_counter()
+        for n in range(args.vollbilder):
+            anzeige.vollbild(folge[n % len(folge)], fehler=n % 2)
+        ausgeben(name, display, start, args.vollbilder, time.perf_counter() - t0, args)
+
+    print(f"Teilaktualisierung ({args.aktualisierungen}x, ein Messwert ändert sich, "
+          f"alle {args.fehlerabstand} der Fehlertext):")
+    ergebnisse = {}
+    for name in VARIANTEN:
+        display = SimST7789(None, 240, 320, rotation=1)
+        anzeige = erstellen(name, display)
+        anzeige.vollbild(folge[0], fehler=False) # Aufbau nicht mitzählen
+        start = display.bytes_spi, display.fenster
+        t0 = time.perf_counter()
+        for n, werte in enumerate(folge[1:], 1):
+            anzeige.werte(werte)
+            if n % args.fehlerabstand == 0:
+                anzeige.fehler(n // args.fehlerabstand % 2)
+        ergebnisse[name] = ausgeben(name, display, start, len(folge) - 1, time.perf_counter() - t0, args)
+    print(f"SPI-Zeit Bildpuffer: {ergebnisse['Bildpuffer'] / ergebnisse['direkt'] * 100:.1f} % von direkt, "
+          f"{ergebnisse['Bildpuffer'] / ergebnisse['Statusanzeige'] * 100:.1f} % von Statusanzeige")
+    verlauf(args)
+
+
+if __name__ == "__main__":
+    main()
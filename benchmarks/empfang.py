@@ -0,0 +1,87 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/empfang
+#Aufgabe: Empfang der Steuerbefehle mit poll() auf dem MQTT-Socket gegen das Abfragen im festen Takt
+#		  Die Hauptschleife läuft wie in main.py im asyncio-Eventloop der Simulation
+#		  Gemessen werden Aufwachvorgänge und check_msg()-Aufrufe pro Sekunde sowie die Zeit
+#		  vom Steuerbefehl bis zum IR-Frame
+#Aufruf:  python benchmarks/empfang.py --dauer 600 --befehlsabstand 7
+
+#=====Bibliotheken=====#
+import argparse
+import asyncio
+
+import host # Suchpfad
+from host import perzentil
+from simulator import Simulation
+#======================#
+
+# Jeder Übergang ist erlaubt und ergibt genau einen IR-Frame
+BEFEHLE = (1, 2, 3, 2, 1, 0)
+
+
+def laufen(poll, intervall, dauer, befehlsabstand):
+    """Hauptschleife wie in main.py. Gibt Aufwachvorgänge, check_msg()-Aufrufe und Latenzen in ms zurück."""
+    sim = Simulation()
+    uhr = sim.uhr
+    befehle = []
+    zeit = befehlsabstand
+    while zeit < dauer - befehlsabstand:
+        sim.mqtt_senden(zeit, "Steuerung/Stufen", {"Strahler": BEFEHLE[len(befehle) % len(BEFEHLE)]})
+        befehle.append(zeit)
+        zeit += befehlsabstand + 0.0137 # über die Phasen der zyklischen Aufgaben verteilt
+
+    zaehler = {"step": 0, "check_msg": 0}
+    with sim.aktiv():
+        from socketwarten import lesbar # erst in der Simulation laden
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, task_intervall_empfangen=intervall)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        client = steuerung.pb_sitzung.client
+        check_msg = client.check_msg
+
+        def gezaehlt():
+            zaehler["check_msg"] += 1
+            return check_msg()
+        client.check_msg = gezaehlt
+
+        async def hauptprogramm():
+            start_us = uhr.jetzt_us
+            while uhr.jetzt_us - start_us < dauer * 1e6:
+                naechster = steuerung.step(uhr.ticks_ms())
+                zaehler["step"] += 1
+                wartezeit = max(0, uhr.ticks_diff(naechster, uhr.ticks_ms()))
+                sock = steuerung.empfangs_socket() if poll else None
+                if sock is None:
+                    await asyncio.sleep(wartezeit / 1000)
+                elif await lesbar(sock, wartezeit):
+                    steuerung.empfangen_jetzt()
+
+        start_s = uhr.sekunden()
+        asyncio.run(hauptprogramm())
+        laufzeit = uhr.sekunden() - start_s
+    sim.beenden()
+
+    latenzen = []
+    for befehl in befehle:
+        for zeit_ms, _, _ in sim.ir_frames:
+            if zeit_ms >= befehl * 1000:
+                latenzen.append(zeit_ms - befehl * 1000)
+                break
+    return zaehler["step"] / laufzeit, zaehler["check_msg"] / laufzeit, latenzen, len(befehle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll auf dem MQTT-Socket gegen Abfragen im festen Takt")
+    parser.add_argument("--dauer", type=float, default=600, help="virtuelle Laufzeit in s")
+    parser.add_argument("--befehlsabstand", type=float, default=7.0, help="in s")
+    args = parser.parse_args()
+
+    for name, poll, intervall in (("Takt 50 ms", False, 50), ("Takt 10 ms", False, 10), ("poll()", True, 1000)):
+        aufwachen, abfragen, latenzen, befehle = laufen(poll, intervall, args.dauer, args.befehlsabstand)
+        print(f"{name:11s} {aufwachen:7.1f} Aufwachvorgänge/s  {abfragen:7.1f} check_msg/s  "
+              f"Befehl -> IR-Frame: p50 {perzentil(latenzen, 50):6.1f} ms  p90 {perzentil(latenzen, 90):6.1f} ms  "
+              f"max {max(latenzen):6.1f} ms  ({len(latenzen)}/{befehle} Befehle)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/frostschutz
+#Aufgabe: Einschalt-Rampe des Frostschutzes in der Simulation (kalter Raum)
+#		  Gemessen werden die Zeiten der Stufen, was während der Rampe weiterläuft (Durchläufe,
+#		  Publish, AHT10-Wandlungen, längster step()) und wie schnell ein Steuerbefehl oder ein
+#		  Sensorfehler mitten in der Rampe sie beendet
+#Aufruf:  python benchmarks/frostschutz.py --stufenabstaende 5000 5000 --ereignis-s 2.5
+
+#=====Bibliotheken=====#
+import argparse
+import asyncio
+import time
+
+import host # Suchpfad
+from simulator import Simulation
+#======================#
+
+STUFEN = {0x1a: 0, 0x04: 1, 0x06: 2, 0x0a: 3} # IR-Code -> Stufe wie steuerung.IR_KEYS
+
+
+def laufen(stufenabstaende, ereignis, ereignis_s, dauer):
+    """Kalter Raum, der Frostschutz startet die Rampe. ereignis_s nach Stufe 1 kommt das Ereignis
+    (None, "Aus", "Stufe 1" oder "Sensorfehler"). Gibt Zeiten ab Stufe 1 und Zähler zurück."""
+    sim = Simulation(temperatur=3.0, aussen=-5.0)
+    uhr = sim.uhr
+    werte = {"start_us": None, "ereignis_us": None, "step": 0, "step_max_ms": 0.0}
+
+    def ereignis_ausloesen():
+        werte["ereignis_us"] = uhr.jetzt_us
+        werte["wandlungen"] = sim.aht10.wandlungen
+        if ereignis == "Aus":
+            sim.broker.veroeffentlichen("Steuerung/Stufen", '{"Strahler": 0}')
+        elif ereignis == "Stufe 1":
+            sim.broker.veroeffentlichen("Steuerung/Stufen", '{"Strahler": 1}')
+        elif ereignis == "Sensorfehler":
+            sim.aht10.defekt = True
+
+    with sim.aktiv():
+        from socketwarten import lesbar # erst in der Simulation laden
+        # Sensorfehler: Messung alle 2 s, damit er während der Rampe erkannt wird
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, task_intervall_empfangen=1000,
+                                  frostschutz_stufenabstaende=stufenabstaende,
+                                  mess_umwelt_intervall=2000 if ereignis == "Sensorfehler" else 30000)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        transmit = steuerung.ir_tx.transmit
+
+        def beobachtet(adresse, code, *args, **kwargs):
+            if werte["start_us"] is None and STUFEN.get(code) == 1:
+                werte["start_us"] = uhr.jetzt_us
+                werte["gesendet"] = len(sim.mqtt_gesendet)
+                werte["wandlungen"] = sim.aht10.wandlungen
+                if ereignis is not None:
+                    sim.planen(uhr.sekunden() + ereignis_s, ereignis_ausloesen)
+            return transmit(adresse, code, *args, **kwargs)
+        steuerung.ir_tx.transmit = beobachtet
+
+        # Erster Auftrag an task_strahler nach dem Ereignis, z.B. aus task_umwelt beim Sensorfehler
+        fahren = steuerung.strahler_fahren
+
+        def fahren_beobachtet(*args, **kwargs):
+            if werte["ereignis_us"] is not None and werte.get("auftrag_us") is None:
+                werte["auftrag_us"] = uhr.jetzt_us
+            return fahren(*args, **kwargs)
+        steuerung.strahler_fahren = fahren_beobachtet
+
+        async def hauptprogramm():
+            while werte["start_us"] is None or uhr.jetzt_us - werte["start_us"] < dauer * 1e6:
+                t0 = time.perf_counter()
+                naechster = steuerung.step(uhr.ticks_ms())
+                werte["step_max_ms"] = max(werte["step_max_ms"], (time.perf_counter() - t0) * 1000)
+                if werte["start_us"] is not None:
+                    werte["step"] += 1
+                wartezeit = max(0, uhr.ticks_diff(naechster, uhr.ticks_ms()))
+                if await lesbar(steuerung.empfangs_socket(), wartezeit):
+                    steuerung.empfangen_jetzt()
+                if werte["start_us"] is None and uhr.sekunden() > 120:
+                    raise SystemExit("Frostschutz hat nicht eingeschaltet")
+
+        asyncio.run(hauptprogramm())
+    sim.beenden()
+
+    start_ms = werte["start_us"] / 1000
+    frames = [(zeit - start_ms, STUFEN.get(code)) for zeit, _, code in sim.ir_frames if zeit >= start_ms]
+    werte["frames"] = frames
+    werte["publish"] = len(sim.mqtt_gesendet) - werte["gesendet"]
+    werte["wandlungen"] = sim.aht10.wandlungen - werte["wandlungen"]
+    werte["abbrueche"] = steuerung.frostschutz_abbrueche
+    if werte["ereignis_us"] is not None:
+        ereignis_ms = werte["ereignis_us"] / 1000 - start_ms
+        danach = [(zeit, stufe) for zeit, stufe in frames if zeit >= ereignis_ms]
+        werte["reaktion_ms"] = danach[0][0] - ereignis_ms if danach else None
+        werte["reaktion_stufe"] = danach[0][1] if danach else None
+        # Vom Auftrag (strahler_fahren) bis zum IR-Frame, ohne die Zeit bis zum Erkennen des Ereignisses
+        auftrag_ms = werte["auftrag_us"] / 1000 - start_ms if werte.get("auftrag_us") is not None else None
+        werte["auftrag_ms"] = danach[0][0] - auftrag_ms if danach and auftrag_ms is not None else None
+        # Stufen 2 und 3 vor einer neuen Rampe (wieder Stufe 1) gehören zur abgebrochenen Rampe
+        weiter = 0
+        for _, stufe in danach[1:]:
+            if stufe == 1:
+                break
+            weiter += stufe in (2, 3)
+        werte["weitergeschaltet"] = weiter
+    return werte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Einschalt-Rampe des Frostschutzes")
+    parser.add_argument("--stufenabstaende", type=int, nargs=2, default=(5000, 5000), help="in ms")
+    parser.add_argument("--ereignis-s", type=float, default=2.5, help="Ereignis in s nach Stufe 1")
+    args = parser.parse_args()
+    abstaende = tuple(args.stufenabstaende)
+    dauer = sum(abstaende) / 1000 + 5
+
+    werte = laufen(abstaende, None, 0, dauer)
+    stufen = "  ".join(f"Stufe {stufe} bei {zeit / 1000:5.2f} s" for zeit, stufe in werte["frames"])
+    print(f"Rampe ohne Ereignis: {stufen}")
+    print(f"  während {dauer:.0f} s ab Stufe 1: {werte['step']} Durchläufe, {werte['publish']} Publish, "
+          f"{werte['wandlungen']} AHT10-Wandlungen, längster step() {werte['step_max_ms']:.2f} ms")
+
+    for ereignis in ("Aus", "Stufe 1", "Sensorfehler"):
+        werte = laufen(abstaende, ereignis, args.ereignis_s, dauer)
+        reaktion = "kein IR-Frame" if werte["reaktion_ms"] is None else \
+            f"IR-Frame Stufe {werte['reaktion_stufe']} nach {werte['reaktion_ms']:6.1f} ms " \
+            f"({werte['auftrag_ms']:5.1f} ms nach dem Auftrag)"
+        print(f"{ereignis:12s} {args.ereignis_s:.1f} s nach Stufe 1: {reaktion}  "
+              f"danach {werte['weitergeschaltet']} Stufen der alten Rampe  {werte['abbrueche']} Abbruch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/host
+#Aufgabe: Ergänzt die MicroPython-Zeitfunktionen (ticks_ms, sleep_ms, ...) unter CPython,
+#		  damit die Module des Projekts auf dem PC gemessen werden können
+
+#=====Bibliotheken=====#
+import os
+import sys
+import time
+#======================#
+
+# Projektordner in den Suchpfad aufnehmen, damit z.B. "import mqtt_sitzung" funktioniert
+PROJEKT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJEKT not in sys.path:
+    sys.path.insert(0, PROJEKT)
+
+# Die ticks-Werte laufen unter MicroPython über, unter CPython reicht ein monotoner Zähler
+if not hasattr(time, "ticks_ms"):
+    time.ticks_ms = lambda: time.monotonic_ns() // 1000000
+    time.ticks_us = lambda: time.monotonic_ns() // 1000
+    time.ticks_add = lambda ticks, delta: ticks + delta
+    time.ticks_diff = lambda neu, alt: neu - alt
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+
+
+def perzentil(werte, p):
+    """p-Perzentil (0..100) einer Liste von Messwerten"""
+    if not werte:
+        return 0
+    werte = sorted(werte)
+    index = min(len(werte) - 1, int(round(p / 100 * (len(werte) - 1))))
+    return werte[index]
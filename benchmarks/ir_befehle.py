@@ -0,0 +1,95 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/ir_befehle
+#Aufgabe: Schnell folgende Stufenbefehle vom Dashboard (mehrere Klicks hintereinander)
+#		  Verglichen werden verschiedene Mindestabstände zwischen den IR-Frames. Gemessen werden
+#		  empfangene Befehle, zusammengefasste Aufträge und gesendete Frames, ob der Heizstrahler
+#		  am Ende auf der Stufe des letzten Klicks steht, die Zeit vom letzten Klick bis dahin
+#		  und wie oft transmit() auf das Ende des vorherigen Frames warten musste (RMT)
+#Aufruf:  python benchmarks/ir_befehle.py --serien 50 --klicks 5 --klickabstand 80
+
+#=====Bibliotheken=====#
+import argparse
+import asyncio
+import random
+
+import host # Suchpfad
+from host import perzentil
+from simulator import Simulation
+#======================#
+
+
+def serien(anzahl, klicks, seed):
+    """Je Serie klicks zufällige Stufen, die letzte unterscheidet sich von der vorherigen Serie"""
+    zufall = random.Random(seed)
+    folge = []
+    letzte = 0
+    for _ in range(anzahl):
+        serie = [zufall.randrange(4) for _ in range(klicks - 1)]
+        serie.append(zufall.choice([stufe for stufe in range(4) if stufe != letzte]))
+        letzte = serie[-1]
+        folge.append(serie)
+    return folge
+
+
+def laufen(folge, klickabstand, serienabstand, mindestabstand):
+    """Serien senden. Gibt Kennzahlen der Steuerung, erreichte Serien und Zeiten in ms zurück."""
+    sim = Simulation()
+    uhr = sim.uhr
+    ergebnisse = []
+
+    with sim.aktiv():
+        from socketwarten import lesbar # erst in der Simulation laden
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, task_intervall_empfangen=1000, ir_rmt=True,
+                                  ir_mindestabstand=mindestabstand)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        start_s = uhr.sekunden()
+
+        async def hauptprogramm():
+            while uhr.sekunden() - start_s < (len(folge) + 1) * serienabstand:
+                naechster = steuerung.step(uhr.ticks_ms())
+                wartezeit = max(0, uhr.ticks_diff(naechster, uhr.ticks_ms()))
+                if await lesbar(steuerung.empfangs_socket(), wartezeit):
+                    steuerung.empfangen_jetzt()
+
+        for nummer, serie in enumerate(folge):
+            beginn_s = start_s + (nummer + 1) * serienabstand
+            for klick, stufe in enumerate(serie):
+                sim.mqtt_senden(beginn_s + klick * klickabstand / 1000, "Steuerung/Stufen", {"Strahler": stufe})
+            letzter_ms = (beginn_s + (len(serie) - 1) * klickabstand / 1000) * 1000
+
+            def auswerten(ziel=serie[-1], letzter_ms=letzter_ms):
+                erreicht = sim.heizstrahler.stufe == ziel
+                angenommen = [f[0] for f in sim.heizstrahler.empfangen_frames if f[3]]
+                ergebnisse.append((erreicht, max(0, angenommen[-1] - letzter_ms) if erreicht and angenommen else None))
+            sim.planen(beginn_s + serienabstand - 0.01, auswerten)
+
+        asyncio.run(hauptprogramm())
+    sim.beenden()
+    return steuerung, ergebnisse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zusammenfassen schnell folgender Stufenbefehle")
+    parser.add_argument("--serien", type=int, default=50)
+    parser.add_argument("--klicks", type=int, default=5, help="Befehle pro Serie")
+    parser.add_argument("--klickabstand", type=float, default=80, help="in ms zwischen den Klicks")
+    parser.add_argument("--serienabstand", type=float, default=8, help="in s zwischen den Serien")
+    parser.add_argument("--mindestabstand", type=int, nargs="+", default=(0, 300, 1000), help="in ms")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    folge = serien(args.serien, args.klicks, args.seed)
+    for mindestabstand in args.mindestabstand:
+        steuerung, ergebnisse = laufen(folge, args.klickabstand, args.serienabstand, mindestabstand)
+        zeiten = [e[1] for e in ergebnisse if e[1] is not None] or [0]
+        print(f"Mindestabstand {mindestabstand:4d} ms: {steuerung.ir_befehle} Befehle  "
+              f"{steuerung.ir_zusammengefasst} zusammengefasst  {steuerung.ir_frames} Frames  "
+              f"({steuerung.ir_frames / max(1, steuerung.ir_befehle):.2f} pro Befehl)  "
+              f"{sum(e[0] for e in ergebnisse) / len(ergebnisse) * 100:5.1f} % auf der letzten Stufe  "
+              f"letzter Klick bis Stufe p50 {perzentil(zeiten, 50):5.0f} ms  max {max(zeiten):5.0f} ms  "
+              f"{steuerung.ir_tx.gewartet} mal auf den vorherigen Frame gewartet")
+
+
+if __name__ == "__main__":
+    main()
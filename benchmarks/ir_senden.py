@@ -0,0 +1,102 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/ir_senden
+#Aufgabe: Vorberechnete IR-Frames (ir_sender.IRSender) gegen Kodieren bei jedem Senden
+#		  Gemessen werden Rechenzeit und belegter Speicher pro transmit() auf dem PC und die
+#		  Wellenformen, die das Ersatz-RMT der Simulation aufzeichnet: Dekodierung als NEC-Frame,
+#		  größte Abweichung von den NEC-Zeiten, Länge der Frames und Wartezeit bei Frames direkt hintereinander
+#Aufruf:  python benchmarks/ir_senden.py --anzahl 20000
+
+#=====Bibliotheken=====#
+import argparse
+import time
+import tracemalloc
+
+import host # Suchpfad
+from simulator import Simulation
+from simulator.geraete import nec_dekodieren
+#======================#
+
+IR_KEYS = {0: 0x1a, 1: 0x04, 2: 0x06, 3: 0x0a} # wie in main.py
+IR_ADRESSE = 80
+
+# NEC-Zeiten laut Protokoll in µs
+NEC_SOLL = {"Start an": 9000, "Start aus": 4500, "Bit an": 562.5, "0 aus": 562.5, "1 aus": 1687.5}
+
+
+def messen(transmit, codes, anzahl):
+    """Rechenzeit in µs und belegte Bytes (Spitze) pro Aufruf"""
+    t0 = time.perf_counter()
+    for nummer in range(anzahl):
+        transmit(IR_ADRESSE, codes[nummer % len(codes)])
+    dauer = (time.perf_counter() - t0) / anzahl * 1e6
+
+    tracemalloc.start()
+    gesamt = 0
+    for nummer in range(1000):
+        vorher = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        transmit(IR_ADRESSE, codes[nummer % len(codes)])
+        gesamt += max(0, tracemalloc.get_traced_memory()[1] - vorher)
+    tracemalloc.stop()
+    return dauer, gesamt / 1000
+
+
+def abweichung(dauern):
+    """Größte Abweichung in µs von den NEC-Zeiten"""
+    groesste = max(abs(dauern[0] - NEC_SOLL["Start an"]), abs(dauern[1] - NEC_SOLL["Start aus"]))
+    for nummer in range(2, len(dauern)):
+        if nummer % 2 == 0:
+            soll = NEC_SOLL["Bit an"]
+        else:
+            soll = NEC_SOLL["1 aus"] if dauern[nummer] > 1000 else NEC_SOLL["0 aus"]
+        groesste = max(groesste, abs(dauern[nummer] - soll))
+    return groesste
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vorberechnete IR-Frames über RMT")
+    parser.add_argument("--anzahl", type=int, default=20000, help="Aufrufe für die Rechenzeit")
+    args = parser.parse_args()
+    codes = list(IR_KEYS.values())
+
+    sim = Simulation()
+    with sim.aktiv():
+        import ir_sender # erst in der Simulation laden (esp32)
+        machine = __import__("machine")
+        sender = ir_sender.IRSender(machine.Pin(5, machine.Pin.OUT), codes, IR_ADRESSE)
+        rmt = sender.rmt
+
+        def neu_kodieren(adresse, daten):
+            rmt.write_pulses(ir_sender.nec_frame(adresse, daten), True)
+
+        # Rechenzeit nur auf der Seite des Senders: das Ersatz-RMT ist sofort frei und zeichnet nichts auf
+        rmt.wait_done = lambda timeout=0: True
+        rmt.write_pulses = lambda duration, data=True: None
+        for name, transmit in (("neu kodieren", neu_kodieren), ("vorberechnet", sender.transmit)):
+            dauer, speicher = messen(transmit, codes, args.anzahl)
+            print(f"{name:13s} {dauer:6.2f} µs pro transmit()  {speicher:7.1f} Bytes belegt (Spitze)")
+        del rmt.wait_done, rmt.write_pulses
+
+        # Aufgezeichnete Wellenformen: jeder Code einmal, danach zwei Frames direkt hintereinander
+        rmt.wellenformen.clear()
+        sim.ir_frames.clear()
+        for code in codes:
+            sender.transmit(IR_ADRESSE, code)
+            sim.uhr.vorlaufen(200000)
+        start_us = sim.uhr.jetzt_us
+        sender.transmit(IR_ADRESSE, codes[0])
+        sender.transmit(IR_ADRESSE, codes[1])
+        wartezeit = (sim.uhr.jetzt_us - start_us) / 1000
+
+    print("Wellenformen (Ersatz-RMT):")
+    for (start, pegel, dauern), code in zip(rmt.wellenformen, codes):
+        print(f"  Code 0x{code:02x}: dekodiert {nec_dekodieren(dauern)}, {len(dauern)} Pulse, "
+              f"{sum(dauern) / 1000:5.2f} ms, größte Abweichung {abweichung(dauern):.1f} µs, "
+              f"Träger {rmt.tx_carrier[0]} Hz")
+    print(f"Zweiter Frame direkt danach: {wartezeit:.1f} ms gewartet, {sender.gewartet} mal, "
+          f"{len(sender.frames)} Frames im Speicher")
+    sim.beenden()
+
+
+if __name__ == "__main__":
+    main()
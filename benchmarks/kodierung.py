@@ -0,0 +1,121 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/kodierung
+#Aufgabe: Binärformat (binaerformat.py) gegen json.dumps() für Raum/Sensorwerte und Raum/Feedback
+#		  Gemessen werden Bytes pro Nachricht (Nutzdaten und MQTT-Paket), Rechenzeit und
+#		  belegter Speicher (Spitze) pro Kodierung sowie die größte Abweichung nach dem Dekodieren
+#		  Vereinzelte Sensorfehler ("Fehler", None) müssen als None zurückkommen
+#Aufruf:  python benchmarks/kodierung.py --anzahl 20000
+
+#=====Bibliotheken=====#
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import host # Suchpfad
+import binaerformat
+#======================#
+
+
+def nachrichten(anzahl, seed):
+    """Sensorwerte und Feedback wie von der Steuerung (gefilterte Messwerte sind Kommazahlen).
+    Etwa jede hundertste Nachricht hat einen Sensorfehler ("Fehler") oder einen fehlenden Wert (None)"""
+    zufall = random.Random(seed)
+    sensorwerte, feedback = [], []
+    for n in range(anzahl):
+        sensorwerte.append({
+            "Temperatur": zufall.uniform(15, 25),
+            "Luftfeuchtigkeit": zufall.uniform(30, 60),
+            "CO2_Wert": zufall.uniform(400, 2000),
+            "TVOC_Wert": zufall.uniform(0, 300),
+            "Momentane_Leistung": abs(zufall.choice((0, 1000, 2000, 3000)) + zufall.uniform(-30, 30)),
+            "Gesamte_Leistung": n * 0.0137,
+            })
+        if zufall.random() < 0.01:
+            sensorwerte[-1]["Temperatur"] = sensorwerte[-1]["Luftfeuchtigkeit"] = "Fehler"
+        if zufall.random() < 0.01:
+            sensorwerte[-1][zufall.choice(("CO2_Wert", "Momentane_Leistung"))] = None
+        feedback.append({
+            "Strahlerfeedback": n % 4,
+            "Frostschutzfeedback": zufall.choice(("Aus", "Aktiv")),
+            "Frostschutzschwellwert": 5,
+            "FrostschutzAus": 7,
+            })
+    return sensorwerte, feedback
+
+
+def messen(kodieren, folge):
+    """Rechenzeit in µs und belegte Bytes (Spitze) pro Kodierung, Länge der Nutzdaten"""
+    t0 = time.perf_counter()
+    for nachricht in folge:
+        daten = kodieren(nachricht)
+    dauer = (time.perf_counter() - t0) / len(folge) * 1e6
+
+    # Speicher getrennt messen, tracemalloc verlangsamt die Kodierung
+    # Spitze während des Aufrufs, auch wenn das Ergebnis danach wieder freigegeben wird
+    tracemalloc.start()
+    gesamt = 0
+    for nachricht in folge[:1000]:
+        vorher = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        daten = kodieren(nachricht)
+        gesamt += max(0, tracemalloc.get_traced_memory()[1] - vorher)
+        del daten
+    tracemalloc.stop()
+    laengen = [len(kodieren(nachricht)) for nachricht in folge]
+    return dauer, gesamt / min(1000, len(folge)), sum(laengen) / len(laengen)
+
+
+def abweichung(format, folge):
+    """Größte Abweichung je Feld zwischen Original und dekodiertem Binärformat (inf, wenn ein Text
+    oder ein fehlender Wert nicht richtig zurückkommt) und Anzahl der fehlenden Werte"""
+    groesste = {name: 0.0 for name in format.namen}
+    fehlend = 0
+    for nachricht in folge:
+        dekodiert = binaerformat.dekodieren(bytes(format.kodieren(nachricht)))
+        for name, faktor in zip(format.namen, format.faktoren):
+            wert = nachricht[name]
+            if isinstance(faktor, tuple):
+                if dekodiert[name] != wert:
+                    groesste[name] = float("inf")
+            elif not isinstance(wert, (int, float)):
+                # Sensorfehler
+                fehlend += 1
+                if dekodiert[name] is not None:
+                    groesste[name] = float("inf")
+            elif dekodiert[name] is None:
+                groesste[name] = float("inf")
+            else:
+                groesste[name] = max(groesste[name], abs(dekodiert[name] - wert))
+    return groesste, fehlend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binärformat gegen JSON")
+    parser.add_argument("--anzahl", type=int, default=20000, help="Nachrichten pro Topic")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sensorwerte, feedback = nachrichten(args.anzahl, args.seed)
+    for topic, format, folge in (("Raum/Sensorwerte", binaerformat.SENSORWERTE, sensorwerte),
+                                 ("Raum/Feedback", binaerformat.FEEDBACK, feedback)):
+        print(f"{topic} ({args.anzahl} Nachrichten):")
+        ergebnisse = {}
+        for name, kodieren in (("JSON", json.dumps), ("binär", format.kodieren)):
+            dauer, speicher, laenge = messen(kodieren, folge)
+            # MQTT-PUBLISH mit QoS 0: 1 Byte Typ, 1-2 Byte Länge, 2 Byte Topic-Länge, Topic, Nutzdaten
+            rest = 2 + len(topic) + laenge
+            paket = 1 + (1 if rest < 128 else 2) + rest
+            ergebnisse[name] = laenge, dauer
+            print(f"  {name:6s} {laenge:7.1f} Bytes Nutzdaten  {paket:7.1f} Bytes Paket  "
+                  f"{dauer:6.2f} µs  {speicher:7.1f} Bytes belegt pro Nachricht (Spitze)")
+        print(f"  binär: {ergebnisse['binär'][0] / ergebnisse['JSON'][0] * 100:.1f} % der Größe, "
+              f"{ergebnisse['binär'][1] / ergebnisse['JSON'][1] * 100:.1f} % der Rechenzeit")
+        groesste, fehlend = abweichung(format, folge)
+        print("  größte Abweichung: " + ", ".join(f"{feld} {wert:g}" for feld, wert in groesste.items())
+              + f" ({fehlend} fehlende Werte als None)")
+
+
+if __name__ == "__main__":
+    main()
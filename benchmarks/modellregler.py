@@ -0,0 +1,192 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/modellregler
+#Aufgabe: Modellregler (modellregler.Modellregler) auf dem PC auswerten
+#		  1. Lernen über einen Verlauf: aus dem Raummodell der Simulation mit zufälligen Stufen oder
+#		     aus einer aufgezeichneten CSV-Datei (zeit_s, temperatur, leistung). Gemessen werden die
+#		     gelernten Werte gegen die wahren, der Vorhersagefehler und die Rechenzeit pro Messung
+#		  2. Geschlossener Regelkreis in der Simulation: Zweipunkt-Regelung des Frostschutzes um die
+#		     Solltemperatur gegen den Modellregler (Abweichung, Energie, Stufenwechsel, IR-Frames)
+#Aufruf:  python benchmarks/modellregler.py --stunden 8 --soll 20 --aussen 5
+#		  python benchmarks/modellregler.py --datei verlauf.csv --soll 20
+
+#=====Bibliotheken=====#
+import argparse
+import asyncio
+import csv
+import math
+import random
+import time
+
+import host # Suchpfad
+from simulator import Simulation
+from simulator.raum import Heizstrahler, Raum
+from simulator.uhr import VirtuelleUhr
+from modellregler import Modellregler
+#======================#
+
+MESSABSTAND_S = 30 # wie mess_umwelt_intervall in main.py
+MESSLOOPS = 10 # gemittelte Einzelmessungen des AHT10
+STUFEN_CODES = {0x1a: 0, 0x04: 1, 0x06: 2, 0x0a: 3} # IR-Code -> Stufe wie steuerung.IR_KEYS
+
+
+def verlauf_simulieren(stunden, aussen, tau_s, kelvin_pro_kw, seed):
+    """Verlauf aus dem Raummodell: alle 30 s Temperatur (Mittel aus 10 verrauschten Messungen) und
+    Leistung, die Stufe wechselt zufällig alle 5 bis 40 Minuten"""
+    zufall = random.Random(seed)
+    uhr = VirtuelleUhr()
+    heizstrahler = Heizstrahler(uhr)
+    raum = Raum(uhr, heizstrahler, temperatur=aussen + 5, aussen=aussen, tau_s=tau_s,
+                kelvin_pro_kw=kelvin_pro_kw, seed=seed)
+    verlauf = []
+    wechsel_s = 0
+    for schritt in range(int(stunden * 3600 / MESSABSTAND_S)):
+        zeit_s = schritt * MESSABSTAND_S
+        if zeit_s >= wechsel_s:
+            # Direkt setzen, die erlaubten Übergänge des Geräts spielen für das Modell keine Rolle
+            raum.aktualisieren()
+            heizstrahler.stufe = zufall.randrange(4)
+            wechsel_s = zeit_s + zufall.uniform(300, 2400)
+        leistung = heizstrahler.leistung()
+        uhr.jetzt_us = (zeit_s + MESSABSTAND_S) * 1000000
+        temperatur = sum(raum.temperatur() for _ in range(MESSLOOPS)) / MESSLOOPS
+        verlauf.append((zeit_s + MESSABSTAND_S, temperatur, leistung))
+    return verlauf
+
+
+def verlauf_laden(datei):
+    """CSV mit Kopfzeile zeit_s, temperatur, leistung (in s, °C, W), Trennzeichen , oder ;"""
+    with open(datei, newline="", encoding="utf-8") as f:
+        dialekt = csv.Sniffer().sniff(f.read(1024), delimiters=",;")
+        f.seek(0)
+        return [(float(z["zeit_s"]), float(z["temperatur"]), float(z["leistung"]))
+                for z in csv.DictReader(f, dialect=dialekt)]
+
+
+def lernen(verlauf, soll):
+    """Verlauf in den Modellregler geben. Die Leistung einer Zeile gilt bis zur nächsten Messung.
+    Gibt Regler, RMS des Vorhersagefehlers über einen Messabstand (ab bereit), Rechenzeit in µs
+    pro messung() und die Zeit bis bereit in h zurück."""
+    regler = Modellregler(soll)
+    fehler = []
+    bereit_h = None
+    letzte_zeit, letzte_leistung = None, 0
+    t0 = time.perf_counter()
+    for zeit_s, temperatur, leistung in verlauf:
+        dauer = zeit_s - letzte_zeit if letzte_zeit is not None else 0
+        if regler.bereit() and regler.letzte is not None:
+            fehler.append(regler.vorhersage(regler.letzte, letzte_leistung, dauer) - temperatur)
+        regler.messung(temperatur, letzte_leistung, dauer)
+        if bereit_h is None and regler.bereit():
+            bereit_h = zeit_s / 3600
+        letzte_zeit, letzte_leistung = zeit_s, leistung
+    dauer_us = (time.perf_counter() - t0) / max(1, len(verlauf)) * 1e6
+    rms = math.sqrt(sum(f * f for f in fehler) / len(fehler)) if fehler else None
+    return regler, rms, dauer_us, bereit_h
+
+
+def modell_ausgeben(regler, rms, dauer_us, bereit_h, wahr=None):
+    if not regler.bereit():
+        print(f"  Modell nicht bereit ({regler.proben_heizen} Messungen mit, {regler.proben_aus} ohne Heizung)")
+        return
+    print(f"  bereit nach {bereit_h:.2f} h, {dauer_us:.1f} µs pro messung(), "
+          f"Vorhersagefehler über {MESSABSTAND_S} s (RMS) {rms * 1000:.1f} mK")
+    aussen = regler.gleichgewicht(0)
+    stufen = "  ".join(f"Stufe {stufe} +{regler.gleichgewicht(leistung) - aussen:5.2f} K"
+                       for stufe, leistung in enumerate(regler.leistungen) if stufe)
+    print(f"  gelernt: tau {regler.tau_s():6.0f} s  ohne Heizung {aussen:6.2f} °C  {stufen}")
+    if wahr is not None:
+        tau_s, aussen, kelvin_pro_kw = wahr
+        stufen = "  ".join(f"Stufe {stufe} +{kelvin_pro_kw * stufe:5.2f} K" for stufe in range(1, 4))
+        print(f"  wahr:    tau {tau_s:6.0f} s  ohne Heizung {aussen:6.2f} °C  {stufen}")
+
+
+def regelkreis(regler_aktiv, stunden, soll, aussen, start, einschwingen_h):
+    """Steuerung in der Simulation laufen lassen, mit Frostschutz um soll (EIN soll-1, AUS soll+1)
+    oder mit Modellregler. Gibt Kennzahlen nach einschwingen_h zurück."""
+    sim = Simulation(temperatur=start, aussen=aussen)
+    uhr = sim.uhr
+    proben = [] # (s, Temperatur)
+
+    def abtasten():
+        proben.append((uhr.sekunden(), sim.raum.temperatur()))
+        sim.planen(uhr.sekunden() + 60, abtasten)
+
+    with sim.aktiv():
+        from socketwarten import lesbar # erst in der Simulation laden
+        regler = Modellregler(soll) if regler_aktiv else None
+        # Über Stunden zählt nur die Regelung: Strommessung (wartet aktiv auf die Abtastzeitpunkte),
+        # Senden und Anzeige selten, sonst dauert eine Stunde Minuten
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, task_intervall_empfangen=1000, task_intervall_anzeige=10000,
+                                  task_intervall_senden=10000, mess_strom_intervall=60000, mess_ccs811_intervall=10000,
+                                  frostschutzschwellwert=soll - 1, frostschutzaus=soll + 1, regler=regler)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        start_s = uhr.sekunden()
+        sim.planen(start_s, abtasten)
+
+        async def hauptprogramm():
+            while uhr.sekunden() - start_s < stunden * 3600:
+                naechster = steuerung.step(uhr.ticks_ms())
+                wartezeit = max(0, uhr.ticks_diff(naechster, uhr.ticks_ms()))
+                if await lesbar(steuerung.empfangs_socket(), wartezeit):
+                    steuerung.empfangen_jetzt()
+
+        asyncio.run(hauptprogramm())
+        ende_s = uhr.sekunden()
+    sim.beenden()
+
+    # Energie aus den angenommenen Stufenwechseln des Heizstrahlers (wahre Leistung)
+    ab_s = start_s + einschwingen_h * 3600
+    wechsel = [(ms / 1000, STUFEN_CODES[code]) for ms, _, code, angenommen in sim.heizstrahler.empfangen_frames
+               if angenommen]
+    energie, stufe, zeit = 0.0, 0, ab_s
+    for zeitpunkt, neu in wechsel:
+        if zeitpunkt > ab_s:
+            energie += stufe * sim.heizstrahler.leistung_pro_stufe * (zeitpunkt - zeit) / 3600000
+            zeit = zeitpunkt
+        stufe = neu
+    energie += stufe * sim.heizstrahler.leistung_pro_stufe * (ende_s - zeit) / 3600000
+    temperaturen = [t for s, t in proben if s >= ab_s]
+    return {"abweichung": sum(abs(t - soll) for t in temperaturen) / len(temperaturen),
+            "min": min(temperaturen), "max": max(temperaturen),
+            "unter": sum(t < soll - 0.5 for t in temperaturen) / len(temperaturen) * 100,
+            "kwh": energie, "wechsel": sum(s > ab_s for s, _ in wechsel),
+            "frames": sum(1 for f in sim.ir_frames if f[0] / 1000 > ab_s),
+            "bereit": regler.bereit() if regler is not None else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modellregler auswerten")
+    parser.add_argument("--datei", help="aufgezeichneter Verlauf (CSV: zeit_s, temperatur, leistung)")
+    parser.add_argument("--stunden", type=float, default=8, help="Dauer in h (Verlauf und Regelkreis)")
+    parser.add_argument("--soll", type=float, default=20, help="Solltemperatur in °C")
+    parser.add_argument("--aussen", type=float, default=5, help="Außentemperatur in °C (Simulation)")
+    parser.add_argument("--start", type=float, default=15, help="Raumtemperatur zu Beginn in °C (Regelkreis)")
+    parser.add_argument("--einschwingen", type=float, default=2, help="in h, danach wird der Regelkreis bewertet")
+    parser.add_argument("--tau", type=float, default=3600, help="Zeitkonstante des Raums in s (Verlauf)")
+    parser.add_argument("--kelvin-pro-kw", type=float, default=8, help="Erwärmung pro kW (Verlauf)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.datei:
+        verlauf = verlauf_laden(args.datei)
+        print(f"Verlauf {args.datei}: {len(verlauf)} Messungen")
+        modell_ausgeben(*lernen(verlauf, args.soll))
+        return
+
+    verlauf = verlauf_simulieren(args.stunden, args.aussen, args.tau, args.kelvin_pro_kw, args.seed)
+    print(f"Verlauf aus dem Raummodell, {args.stunden:.0f} h mit zufälligen Stufen:")
+    modell_ausgeben(*lernen(verlauf, args.soll), wahr=(args.tau, args.aussen, args.kelvin_pro_kw))
+
+    print(f"Regelkreis {args.stunden:.0f} h, Solltemperatur {args.soll:.1f} °C, außen {args.aussen:.1f} °C, "
+          f"bewertet ab {args.einschwingen:.0f} h:")
+    for name, regler_aktiv in (("Frostschutz", False), ("Modellregler", True)):
+        werte = regelkreis(regler_aktiv, args.stunden, args.soll, args.aussen, args.start, args.einschwingen)
+        print(f"  {name:12s} mittlere Abweichung {werte['abweichung']:4.2f} K  "
+              f"{werte['min']:5.2f} bis {werte['max']:5.2f} °C  {werte['unter']:5.1f} % unter Soll-0,5 K  "
+              f"{werte['kwh']:5.2f} kWh  {werte['wechsel']} Stufenwechsel  {werte['frames']} IR-Frames"
+              + ("" if werte["bereit"] is None else f"  Modell {'bereit' if werte['bereit'] else 'nicht bereit'}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/mqtt_publish
+#Aufgabe: Vergleich der Publish-Leistung gegen einen lokalen Ersatz-Broker
+#		  vorher:  connect / publish / disconnect für jede Nachricht
+#		  nachher: dauerhafte Verbindung über MQTTSitzung
+#Aufruf:  python benchmarks/mqtt_publish.py --anzahl 500 --rtt-ms 5
+
+#=====Bibliotheken=====#
+import argparse
+import json
+import time
+
+import host # MicroPython-Zeitfunktionen und Suchpfad
+from host import perzentil
+from simulator.broker import MQTTBroker, MQTTClient
+from mqtt_sitzung import MQTTSitzung
+#======================#
+
+# Typische Nutzdaten für Raum/Sensorwerte
+SENSORDATEN = json.dumps({
+    "Temperatur": 21,
+    "Luftfeuchtigkeit": 45,
+    "CO2_Wert": 612,
+    "TVOC_Wert": 31,
+    "Momentane_Leistung": 2012,
+    "Gesamte_Leistung": 3.27,
+    })
+
+
+def messen(broker, anzahl, senden):
+    """anzahl Nachrichten mit der Funktion senden verschicken.
+    Gibt Nachrichten pro Sekunde und die Latenzen pro Publish in ms zurück."""
+    start_anzahl = len(broker.nachrichten)
+    latenzen = []
+    start = time.perf_counter()
+    for i in range(anzahl):
+        t0 = time.perf_counter()
+        senden("Raum/Sensorwerte", SENSORDATEN)
+        latenzen.append((time.perf_counter() - t0) * 1000)
+    # Erst wenn der Broker alle Nachrichten hat, ist der Durchsatz gemessen
+    broker.warten_auf(start_anzahl + anzahl)
+    dauer = time.perf_counter() - start
+    return anzahl / dauer, latenzen
+
+
+def ausgeben(name, durchsatz, latenzen):
+    print(f"{name:8s} {durchsatz:10.1f} Nachr./s   Latenz p50 {perzentil(latenzen, 50):7.3f} ms"
+          f"   p95 {perzentil(latenzen, 95):7.3f} ms   max {max(latenzen):7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vergleich der MQTT-Publish-Leistung")
+    parser.add_argument("--anzahl", type=int, default=500, help="Nachrichten pro Durchlauf")
+    parser.add_argument("--rtt-ms", type=float, default=5, help="simulierte WLAN-Umlaufzeit")
+    args = parser.parse_args()
+
+    broker = MQTTBroker(rtt_ms=args.rtt_ms)
+    client = MQTTClient("benchmark", broker.host, broker.port, "ChSch", "12345678", keepalive=60)
+
+    # Vorher: für jede Nachricht eine neue Verbindung
+    def einzeln(topic, nachricht):
+        client.connect()
+        client.publish(topic, nachricht)
+        client.disconnect()
+
+    vorher = messen(broker, args.anzahl, einzeln)
+
+    # Nachher: eine dauerhafte Verbindung
+    sitzung = MQTTSitzung(client, keepalive=60)
+    sitzung.verbinden()
+
+    def dauerhaft(topic, nachricht):
+        sitzung.senden(topic, nachricht)
+        sitzung.pflegen()
+
+    nachher = messen(broker, args.anzahl, dauerhaft)
+    sitzung.trennen()
+    broker.beenden()
+
+    print(f"{args.anzahl} Nachrichten, simulierte Umlaufzeit {args.rtt_ms} ms")
+    ausgeben("vorher", *vorher)
+    ausgeben("nachher", *nachher)
+    print(f"Faktor Durchsatz: {nachher[0] / vorher[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/mqtt_verbindung
+#Aufgabe: Eine gemeinsame MQTT-Verbindung für Senden und Steuerbefehle gegen zwei Clients
+#		  Speicher: belegter Heap nach setup() (tracemalloc auf dem PC), offene Verbindungen am Broker
+#		  Reconnect: der Broker trennt alle Verbindungen. Gemessen wird die virtuelle Zeit, bis wieder
+#		  gesendet und ein Steuerbefehl empfangen wird, die Zahl der Verbindungsaufbauten und die
+#		  echte Zeit, die step() dabei blockiert (mit simulierter WLAN-Umlaufzeit beim CONNECT)
+#Aufruf:  python benchmarks/mqtt_verbindung.py --abbrueche 5 --rtt-ms 20
+
+#=====Bibliotheken=====#
+import argparse
+import threading
+import time
+import tracemalloc
+
+import host # Suchpfad
+from simulator import Simulation
+#======================#
+
+
+def laufen(gemeinsam, abbrueche, abstand, rtt_ms):
+    """Steuerung mit einer oder zwei Verbindungen, der Broker trennt abbrueche-mal alle Verbindungen.
+    Gibt Heap, Verbindungen und je Abbruch (virtuelle ms bis zum Befehl, CONNECTs, blockierte ms) zurück."""
+    sim = Simulation()
+    uhr = sim.uhr
+    with sim.aktiv():
+        tracemalloc.start(50)
+        steuerung = sim.steuerung(0, mqtt_gemeinsam=gemeinsam, boot_anzeigezeit=0)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        # Nur die Seite der Steuerung: Speicher der Broker-Threads (gestartet über threading) nicht mitzählen
+        heap = sum(statistik.size for statistik in tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, threading.__file__, all_frames=True)]).statistics("filename"))
+        tracemalloc.stop()
+        offen = len(sim.broker.offen)
+        sim.broker.rtt_ms = rtt_ms
+
+        def schritt():
+            t0 = time.perf_counter()
+            termin = steuerung.step(uhr.ticks_ms())
+            dauer = (time.perf_counter() - t0) * 1000
+            uhr.vorlaufen(max(0, uhr.ticks_diff(termin, uhr.ticks_ms())) * 1000)
+            return dauer
+
+        ergebnisse = []
+        stufe = 0
+        for _ in range(abbrueche):
+            ende_us = uhr.jetzt_us + int(abstand * 1e6)
+            while uhr.jetzt_us < ende_us:
+                schritt()
+
+            # Alle Verbindungen trennen, danach so lange Stufenbefehle senden, bis einer ausgeführt wird
+            stufe = 1 if stufe != 1 else 0
+            frames = len(sim.ir_frames)
+            verbindungen = sim.broker.verbindungen
+            start_us = uhr.jetzt_us
+            sim.broker.trennen()
+            time.sleep(0.05) # Broker-Threads schließen die Sockets
+            blockiert = 0.0
+            naechster_befehl_us = start_us
+            while len(sim.ir_frames) == frames or not steuerung.pb_sitzung.verbunden:
+                if uhr.jetzt_us >= naechster_befehl_us:
+                    sim.broker.veroeffentlichen("Steuerung/Stufen", '{"Strahler": %d}' % stufe)
+                    naechster_befehl_us += 10000 # alle 10 ms
+                blockiert = max(blockiert, schritt())
+                if uhr.jetzt_us - start_us > 60e6:
+                    raise SystemExit("keine Verbindung nach 60 s")
+            ergebnisse.append(((uhr.jetzt_us - start_us) / 1000, sim.broker.verbindungen - verbindungen, blockiert))
+    sim.beenden()
+    return heap, offen, ergebnisse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemeinsame MQTT-Verbindung gegen zwei Clients")
+    parser.add_argument("--abbrueche", type=int, default=5)
+    parser.add_argument("--abstand", type=float, default=30, help="in s, Laufzeit vor jedem Abbruch")
+    parser.add_argument("--rtt-ms", type=float, default=20, help="simulierte WLAN-Umlaufzeit beim CONNECT")
+    args = parser.parse_args()
+
+    # Erster Lauf ohne Wertung: Module, die dabei zum ersten Mal geladen werden, nicht mitzählen
+    laufen(True, 1, 1, 0)
+    werte = {}
+    for name, gemeinsam in (("zwei Clients", False), ("gemeinsam", True)):
+        heap, offen, ergebnisse = laufen(gemeinsam, args.abbrueche, args.abstand, args.rtt_ms)
+        zeit = sum(e[0] for e in ergebnisse) / len(ergebnisse)
+        connects = sum(e[1] for e in ergebnisse) / len(ergebnisse)
+        blockiert = max(e[2] for e in ergebnisse)
+        werte[name] = heap
+        print(f"{name:13s} {heap:8d} Bytes Heap nach setup()  {offen} Verbindungen  "
+              f"Reconnect: {zeit:6.0f} ms bis zum Befehl  {connects:.1f} CONNECT  "
+              f"{blockiert:6.1f} ms längster step()")
+    print(f"Eingespart: {werte['zwei Clients'] - werte['gemeinsam']} Bytes Heap (CPython, ohne Broker) "
+          f"und ein Socket mit seinen lwIP-Puffern")
+
+
+if __name__ == "__main__":
+    main()
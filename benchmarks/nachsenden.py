@@ -0,0 +1,139 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/nachsenden
+#Aufgabe: Rückstand eines langen Ausfalls des Brokers in der Warteschlange ablegen und nachsenden
+#		  Ablegen: Zeit pro Nachricht (mit Auslagern des RAM-Rings in den Flash) und Bytes im Flash
+#		  Nachsenden: gegen den lokalen Ersatz-Broker mit verschiedenen Stapelgrößen,
+#		  Dauer pro Aufruf (so lange blockiert die Hauptschleife), Durchsatz und Dauer bis zum
+#		  leeren Rückstand, wenn pro task_intervall_nachsenden ein Stapel gesendet wird
+#		  Am Broker wird geprüft, dass jede Nachricht einmal und mit ihrer Zeit ankommt
+#Aufruf:  python benchmarks/nachsenden.py --stunden 11 --stapel 1 8 32 64 --ziel-s 60
+
+#=====Bibliotheken=====#
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import host # MicroPython-Zeitfunktionen und Suchpfad
+from host import perzentil
+from simulator.broker import MQTTBroker, MQTTClient
+from mqtt_sitzung import MQTTSitzung
+from warteschlange import Warteschlange, UNIX_VERSATZ
+#======================#
+
+
+def rueckstand(stunden, sensorabstand, feedbackabstand):
+    """Nachrichten (Zeit in s, Topic, JSON) wie während eines Ausfalls von stunden"""
+    nachrichten = []
+    for zeit in range(0, int(stunden * 3600)):
+        if zeit % sensorabstand == 0:
+            nachrichten.append((zeit, "Raum/Sensorwerte", json.dumps({
+                "Temperatur": round(19 + 3 * (zeit % 7200) / 7200, 2),
+                "Luftfeuchtigkeit": 40 + zeit % 17,
+                "CO2_Wert": 400 + zeit % 900,
+                "TVOC_Wert": zeit % 120,
+                "Momentane_Leistung": 1000 * (zeit // 1800 % 4),
+                "Gesamte_Leistung": round(zeit / 3600 * 1.5, 4)})))
+        if zeit % feedbackabstand == 0:
+            nachrichten.append((zeit, "Raum/Feedback", json.dumps({
+                "Strahlerfeedback": zeit // 1800 % 4,
+                "Frostschutzfeedback": "Aus",
+                "Frostschutzschwellwert": 5,
+                "FrostschutzAus": 7})))
+    return nachrichten
+
+
+def ablegen(warteschlange, nachrichten):
+    """Alle Nachrichten ablegen. Gibt die Zeiten pro Aufruf in µs zurück."""
+    zeiten = []
+    for zeit, topic, daten in nachrichten:
+        t0 = time.perf_counter()
+        warteschlange.ablegen(topic, daten, zeit)
+        zeiten.append((time.perf_counter() - t0) * 1e6)
+    return zeiten
+
+
+def nachsenden(warteschlange, sitzung):
+    """Nachsenden, bis die Warteschlange leer ist. Gibt die Zeiten pro Aufruf in ms zurück."""
+    zeiten = []
+    while len(warteschlange):
+        t0 = time.perf_counter()
+        if not warteschlange.nachsenden(sitzung.senden) and len(warteschlange):
+            raise SystemExit("Nachsenden fehlgeschlagen")
+        zeiten.append((time.perf_counter() - t0) * 1000)
+    return zeiten
+
+
+def pruefen(broker, start, nachrichten):
+    """Sind alle Nachrichten einmal, in der richtigen Reihenfolge und mit ihrer Zeit angekommen?"""
+    angekommen = []
+    for _, topic, nutzdaten in broker.nachrichten[start:]:
+        if topic == "Raum/Nachtrag":
+            angekommen.extend((e["Zeit"] - UNIX_VERSATZ, e["Topic"], json.dumps(e["Daten"]))
+                              for e in json.loads(nutzdaten))
+    erwartet = [(zeit, topic, json.dumps(json.loads(daten))) for zeit, topic, daten in nachrichten]
+    return angekommen == erwartet
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rückstand ablegen und nachsenden")
+    parser.add_argument("--stunden", type=float, default=11, help="Dauer des Ausfalls (so lange reicht der Flash-Ring aus main.py)")
+    parser.add_argument("--sensorabstand", type=int, default=30, help="in s, Abstand der Sensorwerte")
+    parser.add_argument("--feedbackabstand", type=int, default=60, help="in s, Abstand des Feedbacks")
+    parser.add_argument("--stapel", type=int, nargs="+", default=[1, 8, 32, 64], help="Nachrichten pro Nachtrag")
+    parser.add_argument("--intervall", type=int, default=200, help="in ms, task_intervall_nachsenden")
+    parser.add_argument("--ram-plaetze", type=int, default=32)
+    parser.add_argument("--flash-plaetze", type=int, default=2048)
+    parser.add_argument("--rtt-ms", type=float, default=5, help="simulierte WLAN-Umlaufzeit")
+    parser.add_argument("--ziel-s", type=float, default=60, help="Ziel: Rückstand in dieser Zeit nachgesendet")
+    args = parser.parse_args()
+
+    nachrichten = rueckstand(args.stunden, args.sensorabstand, args.feedbackabstand)
+    broker = MQTTBroker(rtt_ms=args.rtt_ms)
+    client = MQTTClient("benchmark", broker.host, broker.port, keepalive=60)
+    sitzung = MQTTSitzung(client, keepalive=60)
+    sitzung.verbinden()
+    flash = tempfile.mkdtemp(prefix="nachsenden_")
+
+    print(f"Rückstand: {len(nachrichten)} Nachrichten aus {args.stunden:g} h, "
+          f"Ziel {len(nachrichten) / args.ziel_s:.0f} Nachrichten/s ({args.ziel_s:g} s)")
+    try:
+        for stapel in args.stapel:
+            datei = os.path.join(flash, f"warteschlange_{stapel}.bin")
+            warteschlange = Warteschlange(datei, args.ram_plaetze, args.flash_plaetze, stapel=stapel)
+            abgelegt = ablegen(warteschlange, nachrichten)
+            flash_abgelegt = warteschlange.flash_bytes
+
+            # Nach einem Neustart muss der Rückstand aus dem Flash wiedergefunden werden
+            neu = Warteschlange(datei, args.ram_plaetze, args.flash_plaetze, stapel=stapel)
+            geladen = neu.laden()
+
+            start = len(broker.nachrichten)
+            t0 = time.perf_counter()
+            zeiten = nachsenden(warteschlange, sitzung)
+            broker.warten_auf(start + len(zeiten))
+            dauer = time.perf_counter() - t0
+            # In der Steuerung wird pro Intervall ein Stapel gesendet
+            geplant = max(dauer, len(zeiten) * args.intervall / 1000)
+            bytes_gesendet = sum(len(n) for _, topic, n in broker.nachrichten[start:])
+
+            print(f"Stapel {stapel}:")
+            print(f"  Ablegen      {perzentil(abgelegt, 50):7.1f} µs p50  {max(abgelegt):8.1f} µs max  "
+                  f"{flash_abgelegt / 1024:7.0f} KB Flash  {geladen} im Flash nach Neustart  "
+                  f"{warteschlange.verloren} verloren")
+            print(f"  Nachsenden   {len(zeiten):5d} Nachrichten  {bytes_gesendet / 1024:7.0f} KB  "
+                  f"{perzentil(zeiten, 50):6.2f} ms p50  {max(zeiten):6.2f} ms max pro Aufruf")
+            print(f"  Durchsatz    {len(nachrichten) / dauer:8.0f} Nachrichten/s am Stück, "
+                  f"{len(nachrichten) / geplant:6.0f} Nachrichten/s mit {args.intervall} ms Intervall "
+                  f"-> {geplant:6.1f} s  {'Ziel erreicht' if geplant <= args.ziel_s else 'Ziel verfehlt'}")
+            print(f"  vollständig  {pruefen(broker, start, nachrichten)}")
+    finally:
+        sitzung.trennen()
+        broker.beenden()
+        shutil.rmtree(flash, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
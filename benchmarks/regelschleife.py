@@ -0,0 +1,194 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/regelschleife
+#Aufgabe: Ende-zu-Ende-Messung der Hauptschleife von main.py in der Simulation
+#		  Dauer der Schleifendurchläufe, Latenz Steuerbefehl -> IR-Frame, Publish-Durchsatz,
+#		  I2C-Transaktionen und Speicheranforderungen pro Durchlauf
+#		  Die Ergebnisse werden als JSON gespeichert und können zwischen Commits verglichen werden
+#Aufruf:  python benchmarks/regelschleife.py --dauer 300 --ausgabe ergebnis.json --vergleich alt.json
+
+#=====Bibliotheken=====#
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import host # Suchpfad und perzentil()
+from host import perzentil
+from simulator import Simulation
+#======================#
+
+# Befehlsfolge für den Heizstrahler, jeder Übergang ist erlaubt und ergibt genau einen IR-Frame
+BEFEHLE = (1, 2, 3, 2, 1, 0)
+
+
+class Schleifenmessung:
+    """Beobachter für den Eventloop der Simulation. Misst für jeden Durchlauf
+    die Rechenzeit auf dem PC, die verbrauchte virtuelle Zeit (blockierende
+    Wartezeiten auf dem ESP32), die I2C-Transaktionen und optional die
+    Spitze des angeforderten Speichers (tracemalloc)."""
+
+    def __init__(self, sim, speicher=False):
+        self.sim = sim
+        self.speicher = speicher
+        self.host_us = []
+        self.virtuell_us = []
+        self.i2c = []
+        self.speicher_bytes = []
+
+    def start(self):
+        self._i2c = self.sim.bus.transaktionen
+        self._virtuell = self.sim.uhr.jetzt_us
+        if self.speicher:
+            tracemalloc.reset_peak()
+            self._speicher = tracemalloc.get_traced_memory()[0]
+        self._host = time.perf_counter()
+
+    def ende(self):
+        self.host_us.append((time.perf_counter() - self._host) * 1e6)
+        self.virtuell_us.append(self.sim.uhr.jetzt_us - self._virtuell)
+        self.i2c.append(self.sim.bus.transaktionen - self._i2c)
+        if self.speicher:
+            self.speicher_bytes.append(tracemalloc.get_traced_memory()[1] - self._speicher)
+
+
+def verteilung(werte, nachkommastellen=1):
+    """Kennwerte einer Messreihe"""
+    if not werte:
+        return {"anzahl": 0}
+    return {
+        "anzahl": len(werte),
+        "mittel": round(sum(werte) / len(werte), nachkommastellen),
+        "p50": round(perzentil(werte, 50), nachkommastellen),
+        "p90": round(perzentil(werte, 90), nachkommastellen),
+        "p99": round(perzentil(werte, 99), nachkommastellen),
+        "max": round(max(werte), nachkommastellen),
+        }
+
+
+def simulieren(args, speicher=False):
+    """Einen Lauf der Simulation mit Steuerbefehlen im festen Abstand ausführen"""
+    sim = Simulation(seed=args.seed)
+    messung = Schleifenmessung(sim, speicher)
+    sim.beobachter = messung
+
+    befehle = []
+    zeit = args.befehlsabstand
+    # Der Versatz verteilt die Befehle über die Phasen der zyklischen Tasks
+    while zeit < args.dauer - args.befehlsabstand:
+        stufe = BEFEHLE[len(befehle) % len(BEFEHLE)]
+        befehle.append(zeit)
+        sim.mqtt_senden(zeit, "Steuerung/Stufen", {"Strahler": stufe})
+        zeit += args.befehlsabstand + 0.0137
+
+    if speicher:
+        tracemalloc.start()
+    try:
+        sim.starten(args.dauer)
+    finally:
+        if speicher:
+            tracemalloc.stop()
+        sim.beenden()
+    return sim, messung, befehle
+
+
+def latenzen(befehle, ir_frames):
+    """Zeit vom Steuerbefehl bis zum ersten IR-Frame danach (in ms)"""
+    ergebnis = []
+    for befehl in befehle:
+        befehl_ms = befehl * 1000
+        for zeit_ms, _, _ in ir_frames:
+            if zeit_ms >= befehl_ms:
+                ergebnis.append(zeit_ms - befehl_ms)
+                break
+    return ergebnis
+
+
+def git_stand():
+    projekt = host.PROJEKT
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=projekt,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        geaendert = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                        cwd=projekt, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unbekannt"
+    return commit + ("-geaendert" if geaendert else "")
+
+
+def vergleichen(alt, neu, pfad=""):
+    """Zahlenwerte zweier Ergebnisse gegenüberstellen"""
+    for schluessel, wert in neu.items():
+        name = f"{pfad}.{schluessel}" if pfad else schluessel
+        alter_wert = alt.get(schluessel) if isinstance(alt, dict) else None
+        if isinstance(wert, dict):
+            vergleichen(alter_wert or {}, wert, name)
+        elif isinstance(wert, (int, float)) and isinstance(alter_wert, (int, float)) \
+                and not isinstance(wert, bool):
+            aenderung = f"{(wert - alter_wert) / alter_wert * 100:+7.1f} %" if alter_wert else ""
+            print(f"  {name:40s} {alter_wert:12.1f} -> {wert:12.1f} {aenderung}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ende-zu-Ende-Messung der Hauptschleife")
+    parser.add_argument("--dauer", type=float, default=300, help="virtuelle Laufzeit in s")
+    parser.add_argument("--befehlsabstand", type=float, default=7.0, help="Abstand der Steuerbefehle in s")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ohne-speicher", action="store_true", help="Lauf mit tracemalloc auslassen")
+    parser.add_argument("--ausgabe", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--vergleich", help="JSON-Ergebnis eines früheren Laufs zum Vergleich")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sim, messung, befehle = simulieren(args)
+    laufzeit = time.perf_counter() - start
+    minuten = sim.uhr.sekunden() / 60
+
+    publish_bytes = sum(laenge for _, _, laenge in sim.mqtt_gesendet)
+    ergebnis = {
+        "commit": git_stand(),
+        "datum": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "parameter": {"dauer_s": args.dauer, "befehlsabstand_s": args.befehlsabstand, "seed": args.seed},
+        "laufzeit_s": round(laufzeit, 2),
+        "schleife": {
+            "host_us": verteilung(messung.host_us),
+            "blockiert_ms": verteilung([us / 1000 for us in messung.virtuell_us], 3),
+            },
+        "befehl_zu_ir_ms": dict(verteilung(latenzen(befehle, sim.ir_frames)), befehle=len(befehle)),
+        "publish": {
+            "anzahl": len(sim.mqtt_gesendet),
+            "pro_minute": round(len(sim.mqtt_gesendet) / minuten, 1),
+            "bytes_pro_minute": round(publish_bytes / minuten, 1),
+            },
+        "i2c": {
+            "transaktionen": sim.bus.transaktionen,
+            "pro_durchlauf": verteilung(messung.i2c, 3),
+            "pro_sekunde": round(sim.bus.transaktionen / sim.uhr.sekunden(), 2),
+            },
+        }
+
+    if not args.ohne_speicher:
+        # Eigener Lauf, da tracemalloc die Laufzeit stark verlängert. Gleicher Seed, gleicher Ablauf
+        _, speicher, _ = simulieren(args, speicher=True)
+        ergebnis["speicher_bytes_pro_durchlauf"] = verteilung(speicher.speicher_bytes, 0)
+
+    print(json.dumps(ergebnis, indent=2, ensure_ascii=False))
+
+    if args.ausgabe:
+        ordner = os.path.dirname(os.path.abspath(args.ausgabe))
+        os.makedirs(ordner, exist_ok=True)
+        with open(args.ausgabe, "w", encoding="utf-8") as f:
+            json.dump(ergebnis, f, indent=2, ensure_ascii=False)
+
+    if args.vergleich:
+        with open(args.vergleich, encoding="utf-8") as f:
+            alt = json.load(f)
+        print(f"\nVergleich {alt.get('commit')} -> {ergebnis['commit']}:")
+        vergleichen(alt, ergebnis)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/steuerung_last
+#Aufgabe: Mehrere Steuerungen in einem Prozess Schritt für Schritt ausführen
+#		  Messung der Startzeit (setup) und der Rechenzeit pro step() auf dem PC
+#Aufruf:  python benchmarks/steuerung_last.py --instanzen 10 --dauer 300
+
+#=====Bibliotheken=====#
+import argparse
+import time
+
+import host # Suchpfad und perzentil()
+from host import perzentil
+from simulator import Simulation
+#======================#
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Last mit mehreren Steuerungen in einem Prozess")
+    parser.add_argument("--instanzen", type=int, default=10)
+    parser.add_argument("--dauer", type=float, default=300, help="virtuelle Laufzeit in s")
+    parser.add_argument("--befehlsabstand", type=float, default=10.0, help="Abstand der Steuerbefehle in s")
+    args = parser.parse_args()
+
+    sim = Simulation()
+    uhr = sim.uhr
+    with sim.aktiv():
+        # Erstellen ohne Nebenwirkungen, Bootvorgang ohne Wartezeit zum Lesen
+        steuerungen = [sim.steuerung(i, boot_anzeigezeit=0) for i in range(args.instanzen)]
+        startzeiten = []
+        for steuerung in steuerungen:
+            t0 = time.perf_counter()
+            if not steuerung.setup():
+                raise SystemExit("Bootvorgang fehlgeschlagen")
+            startzeiten.append((time.perf_counter() - t0) * 1e3)
+
+        # Steuerbefehle an alle Steuerungen (gleiches Topic)
+        zeit, stufe = args.befehlsabstand, 1
+        while zeit < args.dauer:
+            sim.mqtt_senden(uhr.sekunden() + zeit, "Steuerung/Stufen", {"Strahler": stufe})
+            zeit += args.befehlsabstand
+            stufe = (stufe + 1) % 4
+
+        # Alle Steuerungen Schritt für Schritt ausführen, die Uhr springt zum nächsten fälligen Zeitpunkt
+        ende_us = uhr.jetzt_us + int(args.dauer * 1e6)
+        schritte = []
+        while uhr.jetzt_us < ende_us:
+            naechster = None
+            for steuerung in steuerungen:
+                t0 = time.perf_counter()
+                termin = steuerung.step(uhr.ticks_ms())
+                schritte.append((time.perf_counter() - t0) * 1e6)
+                if naechster is None or uhr.ticks_diff(termin, naechster) < 0:
+                    naechster = termin
+            wartezeit = uhr.ticks_diff(naechster, uhr.ticks_ms())
+            uhr.vorlaufen(max(0, wartezeit) * 1000)
+    sim.beenden()
+
+    print(f"Instanzen:            {args.instanzen}")
+    print(f"setup():              Mittel {sum(startzeiten) / len(startzeiten):8.2f} ms   "
+          f"max {max(startzeiten):8.2f} ms")
+    print(f"step() pro Instanz:   p50 {perzentil(schritte, 50):8.1f} µs   p90 {perzentil(schritte, 90):8.1f} µs   "
+          f"p99 {perzentil(schritte, 99):8.1f} µs   ({len(schritte)} Aufrufe)")
+    print(f"Rechenzeit gesamt:    {sum(schritte) / 1e6:8.2f} s für {args.dauer:.0f} s virtuelle Zeit")
+    print(f"IR-Frames:            {len(sim.ir_frames)}")
+    print(f"MQTT-Nachrichten:     {len(sim.mqtt_gesendet)} gesendet")
+
+
+if __name__ == "__main__":
+    main()
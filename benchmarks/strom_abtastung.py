@@ -0,0 +1,71 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/strom_abtastung
+#Aufgabe: Messung der erreichten Abtastrate der Effektivwertmessung auf dem PC
+#		  Prüfung des berechneten Effektivwerts gegen einen bekannten Sinusstrom
+#Aufruf:  python benchmarks/strom_abtastung.py --abtastrate 2000 --perioden 5 --strom 4.0
+
+#=====Bibliotheken=====#
+import argparse
+import math
+import time
+
+import host # MicroPython-Zeitfunktionen und Suchpfad
+from strommessung import EffektivwertMessung
+#======================#
+
+
+class SinusADC:
+    """ADC mit einem 50-Hz-Sinusstrom am ACS712 (12 Bit, 3,3 V)"""
+
+    def __init__(self, strom_eff, offset_mv=2500, mv_pro_a=100, frequenz=50):
+        self.amplitude_mv = strom_eff * math.sqrt(2) * mv_pro_a
+        self.offset_mv = offset_mv
+        self.omega = 2 * math.pi * frequenz
+        self.lesungen = 0
+
+    def read(self):
+        self.lesungen += 1
+        t = time.perf_counter()
+        mv = self.offset_mv + self.amplitude_mv * math.sin(self.omega * t)
+        return max(0, min(4095, int(mv / 3300 * 4095)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Abtastrate der Effektivwertmessung")
+    parser.add_argument("--abtastrate", type=int, default=2000, help="Abtastrate in Hz")
+    parser.add_argument("--perioden", type=int, default=5, help="Netzperioden pro Messung")
+    parser.add_argument("--strom", type=float, default=4.0, help="Effektivstrom des Sinus in A (max. ca. 5,6 A ohne Übersteuerung)")
+    parser.add_argument("--wiederholungen", type=int, default=20)
+    args = parser.parse_args()
+
+    adc = SinusADC(args.strom)
+
+    # Innere Schleife ohne Wartezeit: höchste erreichbare Abtastrate
+    schnell = EffektivwertMessung(adc, abtastrate=1000000, perioden=args.perioden)
+    schnell.intervall_us = 0
+    schnell.erfassen()
+    print(f"Innere Schleife ohne Takt: {schnell.anzahl / (schnell.dauer_us / 1e6):12.0f} Abtastungen/s")
+
+    # Auswertung des Puffers
+    t0 = time.perf_counter()
+    for _ in range(args.wiederholungen):
+        schnell.auswerten()
+    dauer = (time.perf_counter() - t0) / args.wiederholungen
+    print(f"Auswertung:                {schnell.anzahl / dauer:12.0f} Abtastungen/s")
+
+    # Getaktete Messung wie im Hauptprogramm
+    messung = EffektivwertMessung(adc, abtastrate=args.abtastrate, perioden=args.perioden)
+    fehler = []
+    raten = []
+    for _ in range(args.wiederholungen):
+        strom, leistung = messung.messen()
+        raten.append(messung.anzahl / (messung.dauer_us / 1e6))
+        fehler.append(abs(strom - args.strom) / args.strom * 100)
+    print(f"Getaktet {args.abtastrate} Hz, {args.perioden} Perioden ({messung.anzahl} Abtastungen):")
+    print(f"  erreichte Abtastrate  {min(raten):10.0f} .. {max(raten):.0f} Hz")
+    print(f"  Effektivwert          {strom:10.3f} A (Soll {args.strom} A), {leistung:.0f} W")
+    print(f"  Abweichung            {max(fehler):10.2f} % (max)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/stufenpruefung
+#Aufgabe: Prüfen der Stufe über die gemessene Leistung gegen das Feedback nach dem Senden
+#		  Der simulierte Heizstrahler verliert einen Teil der IR-Frames. Gemessen wird, wie oft er die
+#		  angeforderte Stufe erreicht, wie oft das Strahlerfeedback seiner Stufe entspricht,
+#		  IR-Frames pro Befehl, Zeit bis zur Stufe und die längste Dauer eines step() in virtueller Zeit
+#Aufruf:  python benchmarks/stufenpruefung.py --befehle 100 --verlust 0 0.1 0.3
+
+#=====Bibliotheken=====#
+import argparse
+import asyncio
+import random
+
+import host # Suchpfad
+from host import perzentil
+from simulator import Simulation
+#======================#
+
+
+def laufen(befehle, abstand, verlustrate, pruefen):
+    """Befehle im Abstand von abstand s senden. Gibt je Befehl (erreicht, Feedback stimmt, IR-Frames,
+    ms bis zur Stufe) und die längste Dauer eines step() in ms (virtuell) zurück."""
+    sim = Simulation()
+    sim.heizstrahler.verlustrate = verlustrate
+    uhr = sim.uhr
+    ergebnisse = []
+    werte = {"step_max_ms": 0.0}
+
+    with sim.aktiv():
+        from socketwarten import lesbar # erst in der Simulation laden
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, task_intervall_empfangen=1000, stufe_pruefen=pruefen)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        start_s = uhr.sekunden()
+
+        async def hauptprogramm():
+            while uhr.sekunden() - start_s < (len(befehle) + 1) * abstand:
+                vorher = uhr.jetzt_us
+                naechster = steuerung.step(uhr.ticks_ms())
+                werte["step_max_ms"] = max(werte["step_max_ms"], (uhr.jetzt_us - vorher) / 1000)
+                wartezeit = max(0, uhr.ticks_diff(naechster, uhr.ticks_ms()))
+                if await lesbar(steuerung.empfangs_socket(), wartezeit):
+                    steuerung.empfangen_jetzt()
+
+        # Befehle senden und kurz vor dem nächsten Befehl auswerten
+        for nummer, stufe in enumerate(befehle):
+            befehl_s = start_s + (nummer + 1) * abstand
+            sim.mqtt_senden(befehl_s, "Steuerung/Stufen", {"Strahler": stufe})
+
+            def auswerten(stufe=stufe, befehl_ms=befehl_s * 1000):
+                frames = [f for f in sim.ir_frames if f[0] >= befehl_ms]
+                erreicht = sim.heizstrahler.stufe == stufe
+                ergebnisse.append((erreicht, steuerung.strahlerfeedback == sim.heizstrahler.stufe, len(frames),
+                                   frames[-1][0] - befehl_ms if frames and erreicht else None))
+            sim.planen(befehl_s + abstand - 0.01, auswerten)
+
+        asyncio.run(hauptprogramm())
+    sim.beenden()
+    return ergebnisse, werte["step_max_ms"], steuerung.strahler_fehler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prüfen der Stufe über die gemessene Leistung")
+    parser.add_argument("--befehle", type=int, default=100)
+    parser.add_argument("--abstand", type=float, default=8.0, help="in s zwischen den Befehlen")
+    parser.add_argument("--verlust", type=float, nargs="+", default=(0.0, 0.1, 0.3), help="Anteil verlorener Frames")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    zufall = random.Random(args.seed)
+    befehle = [zufall.randrange(4) for _ in range(args.befehle)]
+    for verlustrate in args.verlust:
+        print(f"Verlust {verlustrate * 100:.0f} % der Frames:")
+        for name, pruefen in (("ohne Prüfung", False), ("mit Prüfung", True)):
+            ergebnisse, step_max, fehler = laufen(befehle, args.abstand, verlustrate, pruefen)
+            anzahl = len(ergebnisse)
+            zeiten = [e[3] for e in ergebnisse if e[3] is not None] or [0]
+            print(f"  {name:13s} {sum(e[0] for e in ergebnisse) / anzahl * 100:5.1f} % erreicht  "
+                  f"Feedback stimmt {sum(e[1] for e in ergebnisse) / anzahl * 100:5.1f} %  "
+                  f"{sum(e[2] for e in ergebnisse) / anzahl:.2f} Frames/Befehl  "
+                  f"bis zur Stufe p50 {perzentil(zeiten, 50):5.0f} ms  p90 {perzentil(zeiten, 90):5.0f} ms  "
+                  f"längster step() {step_max:5.1f} ms  {fehler} aufgegeben")
+
+
+if __name__ == "__main__":
+    main()
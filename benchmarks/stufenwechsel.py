@@ -0,0 +1,105 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/stufenwechsel
+#Aufgabe: Stufenwechsel über Zwischenstufen (steuerung.stufenplan) gegen das bisherige Verwerfen
+#		  nicht erlaubter Übergänge
+#		  Tabelle: IR-Frames für jeden Wechsel. Simulation: zufällige Stufenbefehle vom Dashboard,
+#		  gemessen wird, wie oft der Heizstrahler die angeforderte Stufe erreicht, ob
+#		  Strahlerfeedback und Heizstrahler übereinstimmen, IR-Frames und Zeit bis zur Stufe
+#Aufruf:  python benchmarks/stufenwechsel.py --befehle 200 --abstand 6 --stufenabstand 1000
+
+#=====Bibliotheken=====#
+import argparse
+import asyncio
+import random
+
+import host # Suchpfad
+from host import perzentil
+from simulator import Simulation
+from simulator.raum import VORGAENGER
+from steuerung import STUFENWECHSEL, stufenplan
+#======================#
+
+
+def bisher(von, nach):
+    """Stufe nach einem Befehl mit den bisherigen Regeln: ein Frame, nicht erlaubte Wechsel werden verworfen"""
+    vorgaenger = VORGAENGER.get(nach, ())
+    return nach if nach not in (2, 3) or von in vorgaenger else von
+
+
+def befehlsfolge(anzahl, seed):
+    zufall = random.Random(seed)
+    return [zufall.randrange(4) for _ in range(anzahl)]
+
+
+def laufen(befehle, abstand, stufenabstand):
+    """Befehle im Abstand von abstand s über den Broker senden. Gibt je Befehl
+    (erreicht, Feedback stimmt, IR-Frames, ms bis zur Stufe) zurück."""
+    sim = Simulation()
+    uhr = sim.uhr
+    ergebnisse = []
+
+    with sim.aktiv():
+        from socketwarten import lesbar # erst in der Simulation laden
+        # Frostschutz aus dem Weg: der Raum ist warm
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, task_intervall_empfangen=1000,
+                                  strahler_stufenabstand=stufenabstand)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+        start_s = uhr.sekunden()
+
+        async def hauptprogramm():
+            while uhr.sekunden() - start_s < (len(befehle) + 1) * abstand:
+                naechster = steuerung.step(uhr.ticks_ms())
+                wartezeit = max(0, uhr.ticks_diff(naechster, uhr.ticks_ms()))
+                if await lesbar(steuerung.empfangs_socket(), wartezeit):
+                    steuerung.empfangen_jetzt()
+
+        # Befehle senden und kurz vor dem nächsten Befehl auswerten
+        for nummer, stufe in enumerate(befehle):
+            befehl_s = start_s + (nummer + 1) * abstand
+            sim.mqtt_senden(befehl_s, "Steuerung/Stufen", {"Strahler": stufe})
+
+            def auswerten(stufe=stufe, befehl_ms=befehl_s * 1000):
+                frames = [f for f in sim.ir_frames if f[0] >= befehl_ms]
+                erreicht = sim.heizstrahler.stufe == stufe
+                ergebnisse.append((erreicht, steuerung.strahlerfeedback == sim.heizstrahler.stufe, len(frames),
+                                   frames[-1][0] - befehl_ms if frames and erreicht else None))
+            sim.planen(befehl_s + abstand - 0.01, auswerten)
+
+        asyncio.run(hauptprogramm())
+    sim.beenden()
+    return ergebnisse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stufenwechsel über Zwischenstufen")
+    parser.add_argument("--befehle", type=int, default=200)
+    parser.add_argument("--abstand", type=float, default=6.0, help="in s zwischen den Befehlen")
+    parser.add_argument("--stufenabstand", type=int, default=1000, help="in ms zwischen den IR-Frames")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("IR-Frames je Wechsel (Zeile: von, Spalte: nach):")
+    print("      " + "".join(f"{nach:>10d}" for nach in STUFENWECHSEL))
+    for von in STUFENWECHSEL:
+        print(f"  {von:d}   " + "".join(f"{'-'.join(map(str, stufenplan(von, nach))) or '-':>10s}" for nach in STUFENWECHSEL))
+
+    befehle = befehlsfolge(args.befehle, args.seed)
+    stufe = erreicht = 0
+    for nach in befehle:
+        stufe = bisher(stufe, nach)
+        erreicht += stufe == nach
+    print(f"bisher:      {erreicht / len(befehle) * 100:5.1f} % der Befehle erreicht (1 Frame je Befehl)")
+
+    ergebnisse = laufen(befehle, args.abstand, args.stufenabstand)
+    erreicht = sum(e[0] for e in ergebnisse)
+    feedback = sum(e[1] for e in ergebnisse)
+    frames = sum(e[2] for e in ergebnisse)
+    zeiten = [e[3] for e in ergebnisse if e[3] is not None]
+    print(f"Fahrplan:    {erreicht / len(ergebnisse) * 100:5.1f} % der Befehle erreicht, "
+          f"Feedback stimmt bei {feedback / len(ergebnisse) * 100:5.1f} %, {frames / len(ergebnisse):.2f} Frames je Befehl, "
+          f"bis zur Stufe p50 {perzentil(zeiten, 50):.0f} ms  max {max(zeiten):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/telemetrie
+#Aufgabe: Nachrichten an den Broker mit Totbändern gegen den bisherigen Vergleich der ganzen Nachricht
+#		  Bisher entspricht Totband 0 für alle Felder ohne Lebenszeichen
+#		  Gemessen werden Nachrichten und Bytes pro Topic sowie die größte Abweichung zwischen
+#		  dem zuletzt gesendeten und dem aktuellen Wert je Feld (was der Broker verpasst)
+#Aufruf:  python benchmarks/telemetrie.py --dauer 3600
+
+#=====Bibliotheken=====#
+import argparse
+
+import host # Suchpfad
+from simulator import Simulation
+#======================#
+
+
+def laufen(dauer, befehlsabstand, **einstellungen):
+    """Eine Steuerung in der Simulation ausführen. Gibt Nachrichten/Bytes pro Topic
+    und die größte Abweichung je Sensorfeld zurück."""
+    sim = Simulation()
+    uhr = sim.uhr
+    with sim.aktiv():
+        steuerung = sim.steuerung(0, boot_anzeigezeit=0, **einstellungen)
+        if not steuerung.setup():
+            raise SystemExit("Bootvorgang fehlgeschlagen")
+
+        zeit, stufe = befehlsabstand, 1
+        while zeit < dauer:
+            sim.mqtt_senden(uhr.sekunden() + zeit, "Steuerung/Stufen", {"Strahler": stufe})
+            zeit += befehlsabstand
+            stufe = (stufe + 1) % 4
+
+        telemetrie = steuerung.sensor_telemetrie
+        abweichung = [0.0] * len(telemetrie.namen)
+        ende_us = uhr.jetzt_us + int(dauer * 1e6)
+        while uhr.jetzt_us < ende_us:
+            termin = steuerung.step(uhr.ticks_ms())
+            for i, (wert, gesendet) in enumerate(zip(telemetrie.werte, telemetrie.gesendet)):
+                if isinstance(wert, (int, float)) and isinstance(gesendet, (int, float)):
+                    abweichung[i] = max(abweichung[i], abs(wert - gesendet))
+            uhr.vorlaufen(max(0, uhr.ticks_diff(termin, uhr.ticks_ms())) * 1000)
+    sim.beenden()
+
+    themen = {}
+    for _, topic, laenge in sim.mqtt_gesendet:
+        anzahl, summe = themen.get(topic, (0, 0))
+        themen[topic] = (anzahl + 1, summe + laenge)
+    return themen, dict(zip(telemetrie.namen, abweichung))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetrie mit Totbändern gegen Vergleich der ganzen Nachricht")
+    parser.add_argument("--dauer", type=float, default=3600, help="virtuelle Laufzeit in s")
+    parser.add_argument("--befehlsabstand", type=float, default=300, help="Abstand der Steuerbefehle in s")
+    parser.add_argument("--max-stille", type=int, default=60000, help="Lebenszeichen in ms")
+    args = parser.parse_args()
+
+    varianten = (
+        ("bisher", dict(sensor_totbaender={}, telemetrie_max_stille=10 ** 9)),
+        ("Totband", dict(telemetrie_max_stille=args.max_stille)),
+        ("Totband einzeln", dict(telemetrie_max_stille=args.max_stille, telemetrie_einzeltopics=True)),
+        )
+    ergebnisse = {}
+    for name, einstellungen in varianten:
+        themen, abweichung = laufen(args.dauer, args.befehlsabstand, **einstellungen)
+        ergebnisse[name] = sum(anzahl for anzahl, _ in themen.values())
+        print(f"{name}:")
+        for topic in sorted(themen):
+            anzahl, summe = themen[topic]
+            print(f"  {topic:40s} {anzahl:6d} Nachrichten  {summe:8d} Bytes")
+        print("  größte Abweichung: " + ", ".join(f"{feld} {wert:.2f}" for feld, wert in abweichung.items()))
+    print(f"Nachrichten mit Totband: {ergebnisse['Totband'] / ergebnisse['bisher'] * 100:.1f} % von bisher "
+          f"in {args.dauer:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: benchmarks/zeitreihe
+#Aufgabe: Verlauf der Messwerte (zeitreihe.Zeitreihe) über Wochen im Flash (Ordner auf dem PC)
+#		  Gemessen werden Bytes pro Datensatz gegen einen festen Datensatz (struct), Tage im Ring,
+#		  Schreibvorgänge und Bytes pro Stunde, Größe der Dateien, Rechenzeit pro anhaengen() (nur RAM)
+#		  und pro sichern() (eigene Aufgabe wie in der Steuerung), Dauer von Abfragen über eine Stunde,
+#		  einen Tag und eine Woche gegen das Lesen aller Datensätze und laden() nach einem Neustart
+#		  Jeder gelesene Datensatz wird mit dem angehängten verglichen
+#Aufruf:  python benchmarks/zeitreihe.py --tage 21 --abstand 30 --sichern 5
+
+#=====Bibliotheken=====#
+import argparse
+import math
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+
+import host # MicroPython-Zeitfunktionen und Suchpfad
+from host import perzentil
+from zeitreihe import Zeitreihe
+#======================#
+
+FEST_FORMAT = "<IhHHHH" # Zeit, Temperatur, Luftfeuchtigkeit, CO2, TVOC, Leistung: 14 Byte pro Datensatz
+START = 800000000 # s, time.time() unter MicroPython zählt ab 2000
+
+
+def messwerte(tage, abstand, seed):
+    """Messungen wie in der Steuerung: Temperatur und Luftfeuchtigkeit aus dem Filter (Mittel aus
+    10 Messungen), CO2 und TVOC des CCS811, gemessene Leistung der Stufe. Vereinzelt Sensorfehler."""
+    zufall = random.Random(seed)
+    werte = []
+    stufe, wechsel = 0, 0
+    for schritt in range(int(tage * 86400 / abstand)):
+        zeit = START + schritt * abstand
+        tag = 2 * math.pi * (zeit % 86400) / 86400
+        if zeit >= wechsel:
+            stufe = zufall.choice((0, 0, 1, 2, 3))
+            wechsel = zeit + zufall.uniform(600, 5400)
+        temperatur = 19.5 + 1.5 * math.sin(tag) + zufall.gauss(0, 0.03)
+        feuchte = 45 + 5 * math.cos(tag) + zufall.gauss(0, 0.2)
+        co2 = int(450 + 300 * max(0, math.sin(tag)) + zufall.gauss(0, 8))
+        tvoc = max(0, int(20 + 30 * max(0, math.sin(tag)) + zufall.gauss(0, 3)))
+        leistung = int(stufe * 1000 * (1 + zufall.gauss(0, 0.01))) if stufe else 0
+        if zufall.random() < 0.002:
+            temperatur = feuchte = "Fehler"
+        if zufall.random() < 0.002:
+            leistung = "Fehler"
+        werte.append((zeit, (temperatur, feuchte, co2, tvoc, leistung)))
+    return werte
+
+
+def erwartet(werte, faktoren):
+    """Werte so, wie sie gelesen werden sollen (auf den Faktor gerundet, Fehler als None)"""
+    return tuple(None if not isinstance(wert, (int, float)) else
+                 round(wert * faktor) / faktor if faktor != 1 else int(round(wert))
+                 for wert, faktor in zip(werte, faktoren))
+
+
+def abfrage_messen(zeitreihe, von, bis, wiederholungen):
+    """Mittlere Dauer einer Abfrage in ms und Anzahl der Datensätze"""
+    t0 = time.perf_counter()
+    for _ in range(wiederholungen):
+        anzahl = sum(1 for _ in zeitreihe.abfragen(von, bis))
+    return (time.perf_counter() - t0) / wiederholungen * 1000, anzahl
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zeitreihe im Flash auswerten")
+    parser.add_argument("--tage", type=float, default=21, help="Dauer des Verlaufs")
+    parser.add_argument("--abstand", type=int, default=30, help="in s, task_intervall_zeitreihe")
+    parser.add_argument("--segmente", type=int, default=16)
+    parser.add_argument("--segment-bytes", type=int, default=32768)
+    parser.add_argument("--index-abstand", type=int, default=64)
+    parser.add_argument("--schreibabstand", type=int, default=600000, help="in ms")
+    parser.add_argument("--sichern", type=int, default=5, help="in s, task_intervall_zeitreihe_sichern")
+    parser.add_argument("--wiederholungen", type=int, default=20, help="pro Abfrage")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    verlauf = messwerte(args.tage, args.abstand, args.seed)
+    flash = tempfile.mkdtemp(prefix="zeitreihe_")
+    name = os.path.join(flash, "zeitreihe")
+    einstellungen = dict(segmente=args.segmente, segment_bytes=args.segment_bytes,
+                         index_abstand=args.index_abstand, schreibabstand=args.schreibabstand)
+    try:
+        zeitreihe = Zeitreihe(name, **einstellungen)
+        dauer_us = []
+        sichern_us = []
+        for schritt, (zeit, werte) in enumerate(verlauf):
+            jetzt = schritt * args.abstand * 1000
+            t0 = time.perf_counter()
+            zeitreihe.anhaengen(zeit, werte, jetzt)
+            dauer_us.append((time.perf_counter() - t0) * 1e6)
+            # sichern() im eigenen Intervall bis zum nächsten Datensatz, gemessen nur, wenn geschrieben wird
+            for versatz in range(0, args.abstand, args.sichern):
+                t0 = time.perf_counter()
+                if zeitreihe.sichern(jetzt + versatz * 1000):
+                    sichern_us.append((time.perf_counter() - t0) * 1e6)
+        zeitreihe.schreiben(len(verlauf) * args.abstand * 1000)
+        dateien = sum(os.path.getsize(zeitreihe.datei(platz)) for platz in range(args.segmente)
+                      if os.path.exists(zeitreihe.datei(platz)))
+
+        stunden = len(verlauf) * args.abstand / 3600
+        pro_satz = zeitreihe.flash_bytes / zeitreihe.datensaetze
+        fest = struct.calcsize(FEST_FORMAT)
+        ring = args.segmente * args.segment_bytes
+        print(f"{len(verlauf)} Datensätze aus {args.tage:g} Tagen, alle {args.abstand} s, "
+              f"Ring {args.segmente} x {args.segment_bytes // 1024} kB = {ring // 1024} kB")
+        print(f"  Flash: {pro_satz:.2f} Byte pro Datensatz (mit Kopf und Index) gegen {fest} Byte fest "
+              f"({fest / pro_satz:.1f}x), im Ring {ring / pro_satz * args.abstand / 86400:.1f} Tage "
+              f"gegen {ring / fest * args.abstand / 86400:.1f} Tage")
+        print(f"  Schreiben: {zeitreihe.schreibvorgaenge / stunden:.1f} Schreibvorgänge/h "
+              f"({zeitreihe.vorzeitig} vor Ablauf des Schreibabstands), {zeitreihe.flash_bytes / stunden:.0f} Byte/h, "
+              f"gegen {3600 / args.abstand:.0f} Schreibvorgänge/h ohne Puffer")
+        print(f"  Dateien im Flash: {dateien / 1024:.0f} kB (Datensätze, Köpfe und Zeitindex)")
+        print(f"  anhaengen(): Median {perzentil(dauer_us, 50):.1f} µs, 99 % {perzentil(dauer_us, 99):.1f} µs, "
+              f"max {max(dauer_us):.0f} µs, {zeitreihe.im_anhaengen} mal geschrieben")
+        print(f"  sichern() mit Schreiben: Median {perzentil(sichern_us, 50):.0f} µs, max {max(sichern_us):.0f} µs")
+
+        # Nach einem Neustart
+        t0 = time.perf_counter()
+        neu = Zeitreihe(name, **einstellungen)
+        segmente = neu.laden()
+        print(f"  laden(): {segmente} Segmente in {(time.perf_counter() - t0) * 1000:.1f} ms, "
+              f"Datensätze im offenen Segment {neu.anzahl}, gleicher Zustand: "
+              f"{neu.nummer == zeitreihe.nummer and neu.laenge == zeitreihe.laenge and neu.werte == zeitreihe.werte}")
+
+        # Alles lesen und mit dem Verlauf vergleichen
+        gelesen = list(neu.abfragen(0, 0xFFFFFFFF))
+        erste = gelesen[0][0]
+        vergleich = [(zeit, erwartet(werte, neu.faktoren)) for zeit, werte in verlauf if zeit >= erste]
+        fehler = sum(1 for a, b in zip(gelesen, vergleich)
+                     if a[0] != b[0] or any((x is None) != (y is None) or (x is not None and abs(x - y) > 1e-9)
+                                            for x, y in zip(a[1], b[1])))
+        print(f"  gelesen: {len(gelesen)} Datensätze ab Tag {(erste - START) / 86400:.1f}, "
+              f"{fehler + abs(len(gelesen) - len(vergleich))} abweichend")
+
+        # Abfragen am Ende des Verlaufs (offenes Segment) und am Anfang des ältesten Segments
+        ende = verlauf[-1][0]
+        alles_ms, _ = abfrage_messen(neu, 0, 0xFFFFFFFF, max(1, args.wiederholungen // 10))
+        print(f"  Abfrage aller Datensätze: {alles_ms:.1f} ms")
+        for name_bereich, sekunden in (("1 Stunde", 3600), ("1 Tag", 86400), ("1 Woche", 7 * 86400)):
+            for lage, bis in (("am Ende", ende), ("am Anfang", erste + sekunden + 3600)):
+                ms, anzahl = abfrage_messen(neu, bis - sekunden, bis, args.wiederholungen)
+                print(f"  {name_bereich:8s} {lage:9s} {anzahl:6d} Datensätze in {ms:7.2f} ms "
+                      f"({ms / alles_ms * 100:5.1f} % des Lesens aller)")
+    finally:
+        shutil.rmtree(flash)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: bildpuffer
+#Aufgabe: Bildschirminhalt im RAM zusammensetzen und nur geänderte Bereiche senden
+#		  Der Bildpuffer kann dieselben Zeichenbefehle wie st7789py (fill, fill_rect, text,
+#		  blit_buffer). Gezeichnet wird in einen RGB565-Puffer, senden() überträgt die
+#		  geänderten Rechtecke mit möglichst wenigen Fenstern zum Bildschirm
+#		  Für den ganzen Bildschirm (320x240) werden 150 KB RAM benötigt (PSRAM)
+
+#=====Bibliotheken=====#
+from statusanzeige import Glyphen, GRAD # Gerasterte Zeichen, High-Byte zuerst wie bei st7789py
+#======================#
+
+
+class Bildpuffer:
+    """RGB565-Puffer für einen Bereich des Bildschirms (Koordinaten wie auf dem Bildschirm).
+
+    Jeder Zeichenbefehl merkt sich das geänderte Rechteck. senden() fasst
+    benachbarte Rechtecke zusammen, wenn das weniger kostet als ein weiteres
+    Fenster (fenster_kosten in Bytes), und sendet jedes Rechteck mit einem
+    blit_buffer(). Rechtecke über die ganze Breite werden direkt aus dem Puffer
+    gesendet, schmalere über einen Zwischenspeicher von zwischenzeilen Zeilen."""
+
+    FENSTER_BYTES = 11 # CASET, RASET und RAMWR mit Parametern
+
+    def __init__(self, txt, breite=320, hoehe=240, x=0, y=0, fenster_kosten=256, zwischenzeilen=16):
+        self.txt = txt
+        self.breite = breite
+        self.hoehe = hoehe
+        self.x = x
+        self.y = y
+        self.fenster_kosten = fenster_kosten
+        self.puffer = bytearray(breite * hoehe * 2)
+        self.zwischenspeicher = bytearray(breite * zwischenzeilen * 2)
+        self.zeichensaetze = {} # (Schrift, Vordergrund, Hintergrund) -> Glyphen
+        self.geaendert = [] # [x0, y0, x1, y1] im Puffer, x1 und y1 ausschließlich
+        self.bytes_spi = 0
+        self.fenster = 0
+        self.letzte_bytes = 0
+
+    #=====Zeichnen im Puffer=====#
+    def _begrenzen(self, x, y, breite, hoehe):
+        """Rechteck auf den Puffer begrenzen, Koordinaten im Puffer"""
+        x0 = max(0, x - self.x)
+        y0 = max(0, y - self.y)
+        x1 = min(self.breite, x - self.x + breite)
+        y1 = min(self.hoehe, y - self.y + hoehe)
+        return x0, y0, x1, y1
+
+    def _markieren(self, x0, y0, x1, y1):
+        if x1 > x0 and y1 > y0:
+            self.geaendert.append([x0, y0, x1, y1])
+
+    def fill_rect(self, x, y, breite, hoehe, farbe):
+        x0, y0, x1, y1 = self._begrenzen(x, y, breite, hoehe)
+        if x1 <= x0 or y1 <= y0:
+            return
+        zeile = bytes((farbe >> 8, farbe & 0xFF)) * (x1 - x0)
+        laenge = len(zeile)
+        puffer = self.puffer
+        pos = (y0 * self.breite + x0) * 2
+        for _ in range(y1 - y0):
+            puffer[pos:pos + laenge] = zeile
+            pos += self.breite * 2
+        self._markieren(x0, y0, x1, y1)
+
+    def fill(self, farbe):
+        self.fill_rect(self.x, self.y, self.breite, self.hoehe, farbe)
+
+    def blit_buffer(self, bild, x, y, breite, hoehe):
+        """RGB565-Bild (High-Byte zuerst) in den Puffer kopieren"""
+        x0, y0, x1, y1 = self._begrenzen(x, y, breite, hoehe)
+        if x1 <= x0 or y1 <= y0:
+            return
+        bild = memoryview(bild)
+        quelle = ((y0 + self.y - y) * breite + (x0 + self.x - x)) * 2
+        ziel = (y0 * self.breite + x0) * 2
+        laenge = (x1 - x0) * 2
+        puffer = self.puffer
+        for _ in range(y1 - y0):
+            puffer[ziel:ziel + laenge] = bild[quelle:quelle + laenge]
+            quelle += breite * 2
+            ziel += self.breite * 2
+        self._markieren(x0, y0, x1, y1)
+
+    def text(self, font, text, x, y, vordergrund=0xFFFF, hintergrund=0x0000):
+        """Text mit den gerasterten Zeichen der Schrift schreiben"""
+        schluessel = (font, vordergrund, hintergrund)
+        glyphen = self.zeichensaetze.get(schluessel)
+        if glyphen is None:
+            glyphen = Glyphen(font, vordergrund, hintergrund, vorrat="")
+            self.zeichensaetze[schluessel] = glyphen
+        for zeichen in text:
+            code = GRAD if zeichen == "°" else ord(zeichen)
+            self.blit_buffer(glyphen.glyph(code), x, y, glyphen.breite, glyphen.hoehe)
+            x += glyphen.breite
+
+    #=====Senden zum Bildschirm=====#
+    def _zusammenfassen(self):
+        """Rechtecke zusammenfassen, solange das umschließende Rechteck weniger
+        Bytes kostet als beide einzeln plus ein Fenster"""
+        rechtecke = self.geaendert
+        zusammengefasst = True
+        while zusammengefasst and len(rechtecke) > 1:
+            zusammengefasst = False
+            for i in range(len(rechtecke)):
+                a = rechtecke[i]
+                for j in range(i + 1, len(rechtecke)):
+                    b = rechtecke[j]
+                    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+                    x1, y1 = max(a[2], b[2]), max(a[3], b[3])
+                    flaeche_a = (a[2] - a[0]) * (a[3] - a[1])
+                    flaeche_b = (b[2] - b[0]) * (b[3] - b[1])
+                    if (x1 - x0) * (y1 - y0) * 2 <= (flaeche_a + flaeche_b) * 2 + self.fenster_kosten:
+                        a[0], a[1], a[2], a[3] = x0, y0, x1, y1
+                        del rechtecke[j]
+                        zusammengefasst = True
+                        break
+                if zusammengefasst:
+                    break
+        return rechtecke
+
+    def _senden(self, bild, x, y, breite, hoehe):
+        self.txt.blit_buffer(bild, self.x + x, self.y + y, breite, hoehe)
+        self.fenster += 1
+        self.letzte_bytes += self.FENSTER_BYTES + breite * hoehe * 2
+
+    def senden(self):
+        """Geänderte Bereiche zum Bildschirm senden. Gibt die Bytes über SPI zurück."""
+        self.letzte_bytes = 0
+        puffer = memoryview(self.puffer)
+        zeilenbytes = self.breite * 2
+        for x0, y0, x1, y1 in self._zusammenfassen():
+            if x0 == 0 and x1 == self.breite:
+                # Ganze Zeilen liegen im Puffer am Stück
+                self._senden(puffer[y0 * zeilenbytes:y1 * zeilenbytes], 0, y0, self.breite, y1 - y0)
+                continue
+
+            # Schmaleres Rechteck: Zeilen in den Zwischenspeicher kopieren, bei Bedarf in mehreren Teilen
+            laenge = (x1 - x0) * 2
+            zeilen_pro_teil = len(self.zwischenspeicher) // laenge
+            y = y0
+            while y < y1:
+                zeilen = min(zeilen_pro_teil, y1 - y)
+                ziel = 0
+                quelle = y * zeilenbytes + x0 * 2
+                for _ in range(zeilen):
+                    self.zwischenspeicher[ziel:ziel + laenge] = puffer[quelle:quelle + laenge]
+                    ziel += laenge
+                    quelle += zeilenbytes
+                self._senden(memoryview(self.zwischenspeicher)[:ziel], x0, y, x1 - x0, zeilen)
+                y += zeilen
+        self.geaendert = []
+        self.bytes_spi += self.letzte_bytes
+        return self.letzte_bytes
+
+    def alles_senden(self):
+        """Den ganzen Puffer in einem Fenster senden, z.B. nach dem Einschalten"""
+        self.geaendert = [[0, 0, self.breite, self.hoehe]]
+        return self.senden()
@@ -0,0 +1,108 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: binaerformat
+#Aufgabe: Kompaktes Binärformat für Raum/Sensorwerte und Raum/Feedback als Alternative zu JSON
+#		  Feste struct-Anordnung: Versionsbyte, Art der Nachricht, danach die Felder als ganze Zahlen
+#		  mit festem Faktor (z.B. Temperatur in 1/100 °C). Kodiert wird in einen wiederverwendeten Puffer
+#		  Fehlende Werte (None, "Fehler") bekommen einen eigenen Kennwert und werden wieder zu None
+#		  dekodieren() läuft auch unter CPython (Auswertung, Node-RED über einen Python-Knoten)
+#		  und erkennt JSON-Nachrichten am ersten Zeichen "{"
+
+#=====Bibliotheken=====#
+import json
+import struct
+#======================#
+
+# Version der Anordnung, bei jeder Änderung der Felder erhöhen. Darf nicht 0x7B ("{") sein
+VERSION = 2 # 2: Kennwert für fehlende Werte
+KOPF_FORMAT = "<BB" # Version, Art
+
+# Kennwert für fehlende Werte je struct-Format: das Minimum bei Formaten mit Vorzeichen, sonst das Maximum
+FEHLT = {"b": -0x80, "B": 0xFF, "h": -0x8000, "H": 0xFFFF, "i": -0x80000000, "I": 0xFFFFFFFF}
+# Grenzen der struct-Formate ohne den Kennwert, Werte außerhalb werden auf den Rand gesetzt
+GRENZEN = {"b": (-0x7F, 0x7F), "B": (0, 0xFE), "h": (-0x7FFF, 0x7FFF), "H": (0, 0xFFFE),
+           "i": (-0x7FFFFFFF, 0x7FFFFFFF), "I": (0, 0xFFFFFFFE)}
+UNBEKANNT = 0xFF # Text, der nicht in der Liste steht
+
+
+class Binaerformat:
+    """Anordnung einer Nachricht mit festen Feldern.
+
+    felder: je Feld (Name, struct-Format, Faktor). Der Wert wird mit dem
+    Faktor multipliziert und gerundet gespeichert. Ist der Faktor ein Tupel
+    von Texten, wird der Index des Textes gespeichert (Format "B"). kodieren()
+    schreibt in denselben Puffer und gibt ihn zurück, er gilt bis zum nächsten
+    Aufruf. Werte, die keine Zahl sind (None, "Fehler"), werden als FEHLT
+    des Formats gespeichert (bei Texten UNBEKANNT) und als None dekodiert."""
+
+    def __init__(self, art, felder):
+        self.art = art
+        self.namen = tuple(name for name, _, _ in felder)
+        self.formate = tuple(format for _, format, _ in felder)
+        self.faktoren = tuple(faktor for _, _, faktor in felder)
+        self.format = KOPF_FORMAT + "".join(self.formate)
+        self.puffer = bytearray(struct.calcsize(self.format))
+        self.werte = [0] * len(felder)
+
+    def __len__(self):
+        return len(self.puffer)
+
+    def kodieren(self, nachricht):
+        """Dictionary mit den Feldern (z.B. Telemetrie.nachricht) in den Puffer schreiben"""
+        werte = self.werte
+        for nummer, name in enumerate(self.namen):
+            wert = nachricht[name]
+            faktor = self.faktoren[nummer]
+            if isinstance(faktor, tuple):
+                werte[nummer] = faktor.index(wert) if wert in faktor else UNBEKANNT
+                continue
+            if not isinstance(wert, (int, float)):
+                werte[nummer] = FEHLT[self.formate[nummer]]
+                continue
+            wert = int(round(wert * faktor))
+            minimum, maximum = GRENZEN[self.formate[nummer]]
+            werte[nummer] = minimum if wert < minimum else maximum if wert > maximum else wert
+        struct.pack_into(self.format, self.puffer, 0, VERSION, self.art, *werte)
+        return self.puffer
+
+    def dekodieren(self, daten):
+        """Felder als Dictionary, Werte wieder in ihrer Einheit, fehlende Werte als None"""
+        werte = struct.unpack_from(self.format, daten, 0)[2:]
+        nachricht = {}
+        for name, format, faktor, wert in zip(self.namen, self.formate, self.faktoren, werte):
+            if isinstance(faktor, tuple):
+                nachricht[name] = faktor[wert] if wert < len(faktor) else None
+            elif wert == FEHLT[format]:
+                nachricht[name] = None
+            else:
+                nachricht[name] = wert if faktor == 1 else wert / faktor
+        return nachricht
+
+
+# Reihenfolge wie steuerung.SENSORFELDER und steuerung.FEEDBACKFELDER
+SENSORWERTE = Binaerformat(1, (
+    ("Temperatur", "h", 100), # in 1/100 °C
+    ("Luftfeuchtigkeit", "H", 10), # in 1/10 %
+    ("CO2_Wert", "H", 1), # in ppm
+    ("TVOC_Wert", "H", 1), # in ppb
+    ("Momentane_Leistung", "H", 1), # in W
+    ("Gesamte_Leistung", "I", 1000), # in Wh
+    ))
+FEEDBACK = Binaerformat(2, (
+    ("Strahlerfeedback", "B", 1),
+    ("Frostschutzfeedback", "B", ("Aus", "Aktiv")),
+    ("Frostschutzschwellwert", "h", 10), # in 1/10 °C
+    ("FrostschutzAus", "h", 10), # in 1/10 °C
+    ))
+FORMATE = {SENSORWERTE.art: SENSORWERTE, FEEDBACK.art: FEEDBACK}
+
+
+def dekodieren(daten):
+    """Nachricht vom Broker (bytes) als Dictionary, egal ob binär oder JSON"""
+    if daten[:1] == b"{":
+        return json.loads(daten)
+    if len(daten) < 2 or daten[0] != VERSION:
+        raise ValueError("unbekannte Version %d" % daten[0] if daten else "leere Nachricht")
+    format = FORMATE.get(daten[1])
+    if format is None or len(daten) < len(format):
+        raise ValueError("unbekannte Art %d" % daten[1])
+    return format.dekodieren(daten)
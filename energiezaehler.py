@@ -0,0 +1,121 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: energiezaehler
+#Aufgabe: Aufsummieren der verbrauchten Energie aus den Leistungsmessungen (Trapezregel)
+#		  Sichern des Zählerstands im Flash in einem Ring aus festen Binär-Datensätzen
+#		  Wiederherstellen des Zählerstands beim Start
+
+#=====Bibliotheken=====#
+import struct
+import time
+#======================#
+
+#=====Datensatz=====#
+# Kennung (2 Byte), laufende Nummer (4 Byte), Energie in mWh (8 Byte), Prüfsumme (2 Byte)
+SATZ_FORMAT = "<HIQH"
+SATZ_GROESSE = struct.calcsize(SATZ_FORMAT) # 16 Byte
+SATZ_KENNUNG = 0xE5A1
+#===================#
+
+
+def _pruefsumme(daten):
+    """Summe der Bytes, erkennt z.B. einen abgebrochenen Schreibvorgang"""
+    summe = 0
+    for byte in daten:
+        summe += byte
+    return summe & 0xFFFF
+
+
+class Energiezaehler:
+    """Summiert die Energie in Wh über die Trapezregel aus einzelnen Leistungswerten.
+    Der Zählerstand wird reihum in einen von "plaetze" Datensätzen einer Datei
+    geschrieben. Dadurch verteilt sich der Verschleiß auf den ganzen Ring und
+    ein abgebrochener Schreibvorgang zerstört höchstens den neuesten Datensatz.
+    Geschrieben wird nur, wenn sich der Zähler geändert hat und das
+    Speicherintervall abgelaufen ist. Schlägt das Schreiben fehl (Flash voll
+    oder defekt), zählt der Zähler im RAM weiter und das Sichern wird nach
+    dem nächsten Intervall wiederholt."""
+
+    def __init__(self, datei="energie.bin", plaetze=64, speicherintervall=600000,
+                 min_abstand=60000, max_luecke=10000):
+        self.datei = datei
+        self.plaetze = plaetze
+        self.speicherintervall = speicherintervall # in ms, regelmäßiges Sichern
+        self.min_abstand = min_abstand # in ms, kürzester Abstand auch beim erzwungenen Sichern
+        self.max_luecke = max_luecke # in ms, längere Pausen zwischen zwei Messungen werden nicht aufsummiert
+        self.energie = 0.0 # in Wh
+        self.nummer = 0 # Laufende Nummer des zuletzt geschriebenen Datensatzes
+        self.gesichert = 0.0 # Zuletzt gesicherter Zählerstand in Wh
+        self.letzte_sicherung = time.ticks_ms()
+        self.fehlgeschlagen = 0 # Anzahl fehlgeschlagener Schreibvorgänge
+        self.letzte_leistung = None
+        self.letzte_zeit = 0
+        self.puffer = bytearray(SATZ_GROESSE)
+
+    def laden(self):
+        """Neuesten gültigen Datensatz lesen. Gibt den Zählerstand in Wh zurück."""
+        try:
+            with open(self.datei, "rb") as f:
+                daten = f.read()
+        except OSError:
+            # Noch keine Datei vorhanden, der Zähler beginnt bei 0
+            return self.energie
+
+        for platz in range(len(daten) // SATZ_GROESSE):
+            start = platz * SATZ_GROESSE
+            kennung, nummer, mwh, summe = struct.unpack_from(SATZ_FORMAT, daten, start)
+            if kennung != SATZ_KENNUNG:
+                continue
+            if summe != _pruefsumme(daten[start:start + SATZ_GROESSE - 2]):
+                continue
+            if nummer >= self.nummer:
+                self.nummer = nummer
+                self.energie = mwh / 1000
+        self.gesichert = self.energie
+        return self.energie
+
+    def hinzufuegen(self, leistung, jetzt):
+        """Neuen Leistungswert (in W) zum Zeitpunkt jetzt (ticks_ms) aufnehmen"""
+        if self.letzte_leistung is not None:
+            dauer = time.ticks_diff(jetzt, self.letzte_zeit)
+            if 0 < dauer <= self.max_luecke:
+                # Trapezregel: mittlere Leistung mal Dauer, ms in h umrechnen
+                self.energie += (self.letzte_leistung + leistung) / 2 * dauer / 3600000
+        self.letzte_leistung = leistung
+        self.letzte_zeit = jetzt
+
+    def sichern(self, erzwingen=False):
+        """Zählerstand in den nächsten Platz des Rings schreiben, wenn es fällig ist.
+        Gibt True zurück, wenn geschrieben wurde."""
+        if self.energie == self.gesichert:
+            return False
+        vergangen = time.ticks_diff(time.ticks_ms(), self.letzte_sicherung)
+        if vergangen < (self.min_abstand if erzwingen else self.speicherintervall):
+            return False
+
+        nummer = self.nummer + 1
+        struct.pack_into(SATZ_FORMAT, self.puffer, 0, SATZ_KENNUNG, nummer, int(self.energie * 1000), 0)
+        struct.pack_into("<H", self.puffer, SATZ_GROESSE - 2, _pruefsumme(self.puffer[:SATZ_GROESSE - 2]))
+        try:
+            try:
+                f = open(self.datei, "r+b")
+            except OSError:
+                # Datei mit leeren Plätzen anlegen
+                f = open(self.datei, "wb")
+                f.write(bytearray(SATZ_GROESSE * self.plaetze))
+            with f:
+                f.seek((nummer % self.plaetze) * SATZ_GROESSE)
+                f.write(self.puffer)
+        except OSError:
+            # Flash voll oder defekt: Zählerstand bleibt im RAM, neuer Versuch nach dem nächsten Intervall
+            self.fehlgeschlagen += 1
+            self.letzte_sicherung = time.ticks_ms()
+            return False
+
+        self.nummer = nummer
+        self.gesichert = self.energie
+        self.letzte_sicherung = time.ticks_ms()
+        return True
+
+    def kwh(self):
+        """Zählerstand in kWh, auf 2 Stellen gerundet"""
+        return round(self.energie / 1000, 2)
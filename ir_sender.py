@@ -0,0 +1,67 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: ir_sender
+#Aufgabe: IR-Frames (NEC) über das RMT-Modul des ESP32 senden
+#		  Die Frames der IR-Codes werden beim Start einmal als Pulsdauern berechnet und
+#		  zwischengespeichert. Das RMT-Modul erzeugt Träger und Zeiten selbst, die CPU
+#		  (und eine GC-Pause) hat auf den laufenden Frame keinen Einfluss
+#		  Gleiche Schnittstelle wie ir_tx.nec.NEC: transmit(adresse, daten)
+
+#=====Bibliotheken=====#
+import esp32
+#======================#
+
+# NEC-Zeiten in µs (RMT mit clock_div=80: 1 Tick = 1 µs)
+NEC_START = (9000, 4500) # Träger an, aus
+NEC_BIT = 563 # Träger an für jedes Bit und das Stoppbit
+NEC_NULL = 563 # Pause nach dem Bit bei 0
+NEC_EINS = 1688 # Pause nach dem Bit bei 1
+RAHMEN_MS = 70 # Länge eines Frames (68,1 ms) mit Reserve
+
+
+def nec_frame(adresse, daten):
+    """Pulsdauern in µs für einen NEC-Frame, abwechselnd Träger an und aus, beginnend mit an.
+    Adressen über 0xFF werden als erweiterte 16-Bit-Adresse gesendet."""
+    if adresse > 0xFF:
+        wert = adresse & 0xFFFF
+    else:
+        wert = adresse | (adresse ^ 0xFF) << 8
+    wert |= (daten & 0xFF) << 16 | (daten ^ 0xFF) << 24
+    dauern = list(NEC_START)
+    for bit in range(32):
+        dauern.append(NEC_BIT)
+        dauern.append(NEC_EINS if wert >> bit & 1 else NEC_NULL)
+    dauern.append(NEC_BIT) # Stoppbit
+    return tuple(dauern) # write_pulses() nimmt Listen und Tupel
+
+
+class IRSender:
+    """NEC-Sender mit vorberechneten Frames auf einem RMT-Kanal.
+
+    codes: IR-Codes, deren Frames beim Start für adresse berechnet werden
+    (z.B. steuerung.IR_KEYS.values()). Andere Codes werden beim ersten Senden
+    berechnet und ebenfalls gespeichert. transmit() kehrt sofort zurück, läuft
+    noch ein Frame, wird auf dessen Ende gewartet (höchstens RAHMEN_MS)."""
+
+    def __init__(self, pin, codes=(), adresse=80, kanal=0, frequenz=38000, tastgrad=33):
+        self.rmt = esp32.RMT(kanal, pin=pin, clock_div=80, tx_carrier=(frequenz, tastgrad, 1))
+        self.frames = {}
+        for code in codes:
+            self.frames[(adresse, code)] = nec_frame(adresse, code)
+        self.gesendet = 0
+        self.gewartet = 0 # Frames, vor denen der vorherige noch lief
+
+    def transmit(self, adresse, daten, toggle=0, validate=False):
+        """Frame senden. toggle wird bei NEC nicht verwendet"""
+        if validate and not (0 <= adresse <= 0xFFFF and 0 <= daten <= 0xFF):
+            raise ValueError("Adresse oder Daten außerhalb des Bereichs")
+        frame = self.frames.get((adresse, daten))
+        if frame is None:
+            frame = self.frames[(adresse, daten)] = nec_frame(adresse, daten)
+        if not self.rmt.wait_done():
+            self.gewartet += 1
+            self.rmt.wait_done(timeout=RAHMEN_MS)
+        self.rmt.write_pulses(frame, True)
+        self.gesendet += 1
+
+    def deinit(self):
+        self.rmt.deinit()
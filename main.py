@@ -3,19 +3,29 @@
 #Erstellungsdatum: 25.03.2025
 #Letzte Änderung: 29.04.2025
 #Programm Name: main (hauptprogramm)
-#Aufgabe: Messung und Auswertung der Sensordaten
-#		  Kommunikation mit den MQTT-Broker
-#		  Steuern des Heizstrahlers
+#Aufgabe: Hardware und Einstellungen festlegen und die Steuerung starten
+#		  Messung, MQTT-Kommunikation, Heizstrahler und Bildschirm laufen in steuerung.Steuerung
 #=====Bibliotheken=====#
 from machine import Pin, PWM, SoftI2C, SoftSPI, ADC
 import time
-import json
+import asyncio
+from socketwarten import lesbar # Warten auf Daten am MQTT-Socket ohne CPU-Last
 import network
 from umqtt.simple import MQTTClient
+from mqtt_sitzung import MQTTSitzung # Dauerhafte Verbindung für das Senden
 from Start import wlan_ssid, wlan_passwort, broker_ip # Daten aus der der Start Datei ziehen
+from steuerung import Steuerung # Ablauf der Heizungssteuerung
+from bildpuffer import Bildpuffer # Bildschirm im RAM zusammensetzen
+from trendanzeige import Trendanzeige # Verlauf von Temperatur und Leistung mit Hardware-Scrolling
 from aht10 import AHT10  # Temperatur- und Luftfeuchtigkeitssensor
+from strommessung import EffektivwertMessung # True-RMS Messung des Stroms
+from energiezaehler import Energiezaehler # Verbrauch aufsummieren und im Flash sichern
+from warteschlange import Warteschlange # Nicht gesendete Nachrichten zwischenspeichern und nachsenden
+from modellregler import Modellregler # Modellbasierte Regelung auf die Solltemperatur
+from zeitreihe import Zeitreihe # Verlauf der Messwerte im Flash
 import CCS811 # Luftqualitätssensor
 from ir_tx.nec import NEC # IR-Transmitter
+from ir_sender import IRSender # IR-Frames vorberechnet über das RMT-Modul senden
 import st7789py as st7789 #Bildschirm-Bibliothek
 import vga1_8x16 as font #Bildschirm Font
 #======================#
@@ -33,6 +43,9 @@ import vga1_8x16 as font #Bildschirm Font
 #KY-005
 #Signal (S) = Pin 5
 
+#CCS811 (optional)
+#nINT = ccs811_int_pin, None wenn nicht angeschlossen
+
 #Bildschirm Belegung
 #ST7789V3
 #SCK = Pin 42
@@ -51,8 +64,7 @@ i2c = SoftI2C(scl=Pin(1), sda=Pin(2))
 strom_sensor = ADC(Pin(4))
 strom_sensor.atten(ADC.ATTN_11DB)  # 0-3.3V Bereich
 
-# IR-Transmitter
-ir_tx = NEC(Pin(5, Pin.OUT))
+# IR-Transmitter (Pin 5) siehe IR-Daten
 
 #SPI-Schnittstelle
 spi = SoftSPI(
@@ -71,6 +83,11 @@ sensoraht10 = AHT10(i2c)
 #CCS811 definieren
 sensorccs811 = CCS811.CCS811(i2c=i2c, addr=90)
 
+#nINT des CCS811 meldet neue Messwerte. Ohne Pin wird zeitgesteuert abgefragt
+ccs811_int_pin = None
+if ccs811_int_pin is not None:
+    sensorccs811.irq(Pin(ccs811_int_pin, Pin.IN, Pin.PULL_UP))
+
 #Bildschirm ST7789 definieren
 txt = st7789.ST7789(
         spi,
@@ -82,53 +99,61 @@ txt = st7789.ST7789(
         backlight = Pin(0, Pin.OUT),
         rotation = 1)
 
-#Bildschirm auf Schwarz setzen
-txt.fill(st7789.BLACK)
-txt.text(font, "Boot Vorgang gestartet", 72, 109, st7789.CYAN, st7789.BLACK)
-bootvorgang = True
+#Bildpuffer: Der Bildschirm wird im RAM gezeichnet, geänderte Bereiche werden gesammelt gesendet
+#Benötigt 150 KB RAM (PSRAM). Bei False wird direkt auf den Bildschirm gezeichnet
+anzeige_bildpuffer = False
+bildpuffer = Bildpuffer(txt, 320, 240) if anzeige_bildpuffer else None
+
+#Trendanzeige: Verlauf rechts neben den Werten, eine Spalte pro Sekunde, der Bildschirm scrollt selbst
+#Je Kurve: (y, Höhe, Minimum, Maximum, Farbe)
+anzeige_trend = True
+trend_x = 272 # in Pixel, linker Rand des Verlaufs. Bis zum rechten Rand sind es 48 Spalten (48 s)
+trend_kurven = ((0, 119, 0, 30, st7789.RED), # Temperatur in °C
+                (121, 119, 0, 3000, st7789.YELLOW)) # Leistung in W
+trendanzeige = Trendanzeige(txt, trend_x, 320 - trend_x, 240, trend_kurven) if anzeige_trend else None
 #===================================#
 
-#=====Variabeln festlegen=====#
-raumtemperatur = 0
-luftfeuchtigkeit = 0
-co2_wert = 0
-tvoc_wert = 0
-raumtemp = []
-raumluft = []
-co2_list = []
-tvoc_list = []
-strom_list = []
-momt_leistung = 0
-ges_verbrauch = 0
-teil_verbrauch = 0
-neu_strahlersteuerung = 0
-alt_strahlersteuerung = 0
-strahlerfeedback = 0
-frostschutzfeedback = 0
-mqttpb_verbunden = False
-mqttsb_verbunden = False
-frostschutzfeedbackstring = 0
-feedbackdaten_alt = {}
-feedbackdaten_neu = {}
-sensordaten_alt = {}
-sensordaten_neu = {}
-betriebszahler = 0
-#=============================#
-
 #=====Einstellungen=====#
-messloops = 10  # Anzahl der durchgeführten Messungen bei einem Messzyklus
+messloops = 10  # Anzahl der durchgeführten Messungen bei einem Messzyklus, so viele Werte werden gefiltert
+aht10_abfrageintervall = 10 # in ms, Abstand der Statusabfragen während der AHT10 misst
+aht10_timeout = 300 # in ms, danach gilt die Messung als fehlgeschlagen
 
 # Voreinstellung für den Frostschutz
 frostschutzschwellwert = 5 #Wert wenn er aktiviert wird
 frostschutzaus = 7 #Wert wenn er wieder ausgeschaltet wird
+frostschutz_stufenabstaende = (5000, 5000) # in ms, Wartezeit nach Stufe 1 und nach Stufe 2 um große Einschaltströme zu verhindern
+strahler_stufenabstand = 1000 # in ms, Wartezeit zwischen den IR-Frames, wenn eine Stufe über Zwischenstufen erreicht wird
+ir_mindestabstand = 300 # in ms, zwischen zwei IR-Frames. Befehle, die in der Zwischenzeit kommen, werden zum letzten zusammengefasst
+
+# Modellregler statt Frostschutz: lernt Zeitkonstante des Raums und Erwärmung je Stufe und hält die Solltemperatur
+# mit der kleinsten Stufe, die reicht. Die Solltemperatur kann per MQTT geändert werden: {"Solltemperatur": 21}
+regler_aktiv = False
+solltemperatur = 20 # in °C
+regler_nennleistungen = (0, 1000, 2000, 3000) # in W je Stufe laut Heizstrahler, nicht die gemessene Leistung
+regler_mindestlaufzeit = 300 # in s, so lange bleibt eine Stufe mindestens, so weit wird vorhergesagt
+regler = Modellregler(solltemperatur, regler_nennleistungen, horizont_s=regler_mindestlaufzeit,
+                      mindestlaufzeit_s=regler_mindestlaufzeit) if regler_aktiv else None
+
+# Prüfen der Stufe: nach jedem IR-Frame wird die Leistung gemessen, als Strahlerfeedback wird die gemessene Stufe gesendet
+# Kommt der Frame nicht an, wird er wiederholt (höchstens pruef_wiederholungen mal pro Befehl)
+stufe_pruefen = True
+stufen_leistungen = (0, 1000, 1780, 2360) # in W, gemessene Leistung je Stufe (über 1 kW schneidet der ADC ab)
+pruef_toleranz = 250 # in W, größte Abweichung von der Leistung der Stufe
+pruef_wartezeit = 500 # in ms, nach dem Frame bis zur Messung
+pruef_perioden = 2 # Netzperioden pro Messung, 2 Perioden entsprechen 40 ms
+pruef_wiederholungen = 3
 
 # Zeit Intervalle Einstellungen
-mess_umwelt_now = 0
-mess_umwelt_last = 0
-mess_strom_now = 0
-mess_strom_last = 0
 mess_umwelt_intervall = 30000 # in ms, entspricht 30s
 mess_strom_intervall = 1000 # in ms, entspricht 1s
+mess_ccs811_intervall = 1000 # in ms, der CCS811 misst im Drive Mode 1 jede Sekunde
+ccs811_int_intervall = 100 # in ms, Abfrage des nINT-Merkers, wenn der Pin angeschlossen ist
+empfang_poll = True # True: die Hauptschleife wartet mit poll() auf den MQTT-Socket, Befehle werden sofort bearbeitet
+task_intervall_empfangen = 1000 if empfang_poll else 50 # in ms, Abfrage neuer Steuerbefehle (mit Poll nur Reconnect)
+task_intervall_senden = 200 # in ms, Senden geänderter Daten an den Broker
+task_intervall_anzeige = 500 # in ms, Aktualisierung des Bildschirms
+task_intervall_frostschutz = 1000 # in ms, Prüfung der Frostschutz-Schwellwerte
+task_intervall_trend = 1000 # in ms, neue Spalte in der Trendanzeige
 
 # WLAN-Daten
 ssid = wlan_ssid # Variabel kommt von der "Start-Datei". Wert wird vom Nutzer festgelegt
@@ -141,8 +166,59 @@ pb_broker_ip = broker_ip # Variabel kommt von der "Start-Datei". Wert wird vom N
 pb_port = 1883
 pb_user = "ChSch"
 pb_password = "12345678"
+pb_keepalive = 60 # in s, nach der halben Zeit ohne Nachricht wird ein PINGREQ gesendet
+pb_backoff_min = 500 # in ms, Wartezeit nach einem fehlgeschlagenen Reconnect
+pb_backoff_max = 30000 # in ms, die Wartezeit verdoppelt sich bis zu diesem Wert
+
+# Senden der Daten an den Broker
+# Totband je Sensorwert: (absolut, relativ). Gesendet wird erst, wenn sich ein Wert um mehr als das größere
+# von beiden gegenüber dem zuletzt gesendeten Wert geändert hat. (0, 0) = jede Änderung senden
+sensor_totbaender = {
+    "Temperatur": (0.2, 0), # in °C
+    "Luftfeuchtigkeit": (1, 0), # in %
+    "CO2_Wert": (20, 0.03), # in ppm oder 3 %
+    "TVOC_Wert": (5, 0.05), # in ppb oder 5 %
+    "Momentane_Leistung": (20, 0.02), # in W oder 2 %
+    "Gesamte_Leistung": (0.01, 0)} # in kWh
+telemetrie_max_stille = 60000 # in ms, spätestens dann werden alle Werte gesendet (Lebenszeichen)
+telemetrie_einzeltopics = False # True: jedes geänderte Feld einzeln an z.B. Raum/Sensorwerte/Temperatur
+telemetrie_binaer = False # True: Sensorwerte (16 Byte) und Feedback (8 Byte) im Binärformat statt JSON, siehe binaerformat.py
+
+# Warteschlange: Ist der Broker oder das WLAN nicht erreichbar, werden die Nachrichten mit Zeit abgelegt
+# und nach dem Reconnect in Stapeln an Raum/Nachtrag gesendet
+# Node-RED schreibt die nachgesendeten Sensorwerte mit ihrer Zeit in die Datenbank (Node-Red-Flows.json)
+warteschlange_aktiv = True
+warteschlange_datei = "warteschlange.bin" # Datei im Flash, in die der volle RAM-Ring geschrieben wird
+warteschlange_ram_plaetze = 32 # Nachrichten im RAM, je 256 Byte
+warteschlange_flash_plaetze = 2048 # Nachrichten im Flash (512 kB), reicht für ca. 11 Stunden ohne Broker
+warteschlange_stapel = 32 # Nachrichten pro Nachtrag
+task_intervall_nachsenden = 200 # in ms, ein Stapel pro Intervall: 160 Nachrichten/s, ein Tag in ca. 30 s
+zeit_synchronisieren = True # Uhrzeit nach der WLAN-Verbindung per NTP stellen, sie steht im Nachtrag
+
+# Zeitreihe: Temperatur, Luftfeuchtigkeit, CO2, TVOC und Leistung werden alle 30 s delta-kodiert im Flash
+# gespeichert (im Mittel ca. 6,3 Byte pro Datensatz), das älteste Segment wird überschrieben
+zeitreihe_aktiv = True
+zeitreihe_name = "zeitreihe" # Dateien zeitreihe_0.bin ... im Flash
+zeitreihe_segmente = 16 # Segment-Dateien im Ring
+zeitreihe_segment_bytes = 32768 # Datensätze pro Segment, 16 x 32 kB = 512 kB reichen für ca. 4 Wochen
+zeitreihe_schreibabstand = 600000 # in ms, höchstens so oft wird geschrieben (20 Datensätze pro Schreibvorgang)
+task_intervall_zeitreihe = 30000 # in ms, ein Datensatz pro Intervall
+task_intervall_zeitreihe_sichern = 5000 # in ms, so oft wird geprüft, ob geschrieben werden muss (eigene Aufgabe)
+
+# Flash-Budget: alle Dateien im Dateisystem (LittleFS) zusammen. Das Dateisystem hat bei 4 MB Flash ca. 2 MB,
+# bei 8 MB ca. 6 MB (os.statvfs("/") auf dem Gerät). Mit den Einstellungen oben:
+#   Programm und Bibliotheken (*.py, st7789py, Font, umqtt, ir_tx)       ca. 350 kB
+#   Zeitreihe: zeitreihe_segmente x zeitreihe_segment_bytes + Zeitindex  ca. 540 kB (16 x 32 kB)
+#   Warteschlange: warteschlange_flash_plaetze x 256 Byte                    512 kB (2048 Plätze)
+#   Energiezähler: energie_plaetze x 16 Byte                                   1 kB (64 Plätze)
+#   zusammen                                                             ca. 1,4 MB
+# Es bleiben auch bei 2 MB ca. 600 kB frei, LittleFS braucht freie Blöcke zum Umschreiben.
+# Werden Zeitreihe oder Warteschlange vergrößert, die Summe hier nachrechnen
 
 # MQTT-Subscribe-Einstellungen
+# True: Die Steuerbefehle kommen über die Publish-Verbindung (ein Socket, gemeinsamer Reconnect)
+# False: eigener Subscribe-Client mit zweiter Verbindung
+mqtt_gemeinsam = True
 subscribe_MQTT_CLIENT_ID = "mqttx_b1dee8e6"
 subscribe_MQTT_BROKER_IP = pb_broker_ip
 subscribe_MQTT_TOPIC_1 = "Steuerung/Stufen"
@@ -154,6 +230,26 @@ mV_per_A = 100  #100mV pro 1A aus
 ACS_offset = 2500  #Spannung bei 0A (in mV)
 messpannung = 230 #Zur Berechnung der Leistung
 
+# Abtastung für die Effektivwertmessung des Stroms
+strom_abtastrate = 2000 # in Hz, Abtastungen pro Sekunde
+strom_perioden = 5 # Anzahl ganzer Netzperioden pro Messung, 5 Perioden entsprechen 100 ms
+netzfrequenz = 50 # in Hz
+strom_messung = EffektivwertMessung(strom_sensor, strom_abtastrate, strom_perioden, netzfrequenz, mV_per_A, ACS_offset, messpannung)
+
+# Energiezähler
+energie_datei = "energie.bin" # Datei im Flash für den Zählerstand
+energie_plaetze = 64 # Anzahl der Datensätze im Ring, auf die sich die Schreibvorgänge verteilen
+energie_speicherintervall = 600000 # in ms, entspricht 10 Minuten. Höchstens so oft wird im Betrieb gesichert
+energiezaehler = Energiezaehler(energie_datei, energie_plaetze, energie_speicherintervall)
+
+# Warteschlange für nicht gesendete Nachrichten
+warteschlange = Warteschlange(warteschlange_datei, warteschlange_ram_plaetze, warteschlange_flash_plaetze,
+                              stapel=warteschlange_stapel) if warteschlange_aktiv else None
+
+# Verlauf der Messwerte
+zeitreihe = Zeitreihe(zeitreihe_name, segmente=zeitreihe_segmente, segment_bytes=zeitreihe_segment_bytes,
+                      schreibabstand=zeitreihe_schreibabstand) if zeitreihe_aktiv else None
+
 # IR-Daten
 # Zur Steuerung des Heizstrahlers
 ir_keys = { 0: 0x1a, # Aus
@@ -161,557 +257,100 @@ ir_keys = { 0: 0x1a, # Aus
             2: 0x06, # 2kW
             3: 0x0a} # 3kW
 
-ir_adresse = 0080
+ir_adresse = 80 # Unter MicroPython wurde 0080 als Dezimalzahl 80 gelesen
 
-# Variabel wird benötigt zum Senden der IR-Daten
-ir_code = 0x1a # IR Code grundstellung ist immer auf Aus
+# IR-Transmitter
+# ir_rmt: die Frames der ir_keys werden beim Start berechnet und vom RMT-Modul ohne CPU gesendet
+# Bei False kodiert ir_tx.nec jeden Frame beim Senden neu
+ir_rmt = True
+ir_tx = IRSender(Pin(5, Pin.OUT), ir_keys.values(), ir_adresse) if ir_rmt else NEC(Pin(5, Pin.OUT))
 #=======================#
 
-#=====Funktionen=====#
-def messfilter(messwerte):
-    """Filtern von Messwerten, um Ausreißer zu entfernen"""
-    if len(messwerte) < 3:  # Sicherheit, um Fehler zu vermeiden
-        return sum(messwerte) / len(messwerte) if messwerte else 0
-    
-    messwerte.sort()  # Werte sortieren
-    messwerte.pop(0)  # Kleinster Wert entfernen
-    messwerte.pop()   # Größter Wert entfernen
-    messwerte = round(sum(messwerte) / len(messwerte), 2)
-    return int(messwerte)
-
-#-------------------------------------------#
-# Messung der Temperatur und Luftfeuchtigkeit
-def messungaht10():
-    """Messung der Temperatur und Luftfeuchtigkeit"""
-    global raumtemperatur, luftfeuchtigkeit
-    try:
-        # Alle Elemente in den Listen werden gelöscht, um sicherzustellen, dass sie leer sind, bevor neue Messdaten hinzugefügt werden.
-        raumtemp.clear()
-        raumluft.clear()
-        #Messwerte auslesen
-        for i in range(messloops):
-            raumtemp.append(sensoraht10.temperature())
-            raumluft.append(sensoraht10.humidity())
-            
-        # Mittelwertfilter anwenden
-        raumtemperatur = messfilter(raumtemp)
-        luftfeuchtigkeit = messfilter(raumluft)
-        
-    except Exception as e:
-        # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
-        raumtemperatur = "Fehler"
-        luftfeuchtigkeit = "Fehler"
-
-#-------------------------------------------#
-# Messung der Luftqualität
-def messungccs811():
-    """Messung Luftqualität"""
-    global co2_wert, tvoc_wert
-    try:
-        # Alle Elemente in den Listen werden gelöscht, um sicherzustellen, dass sie leer sind, bevor neue Messdaten hinzugefügt werden.
-        co2_list.clear()
-        tvoc_list.clear()
-        
-        # Messwerte auslesen
-        for i in range(messloops):
-            co2_list.append(sensorccs811.eCO2)
-            tvoc_list.append(sensorccs811.tVOC)
-            
-        # Mittelwertfilter anwenden
-        co2_wert = messfilter(co2_list)
-        tvoc_wert = messfilter(tvoc_list)
-    
-    except Exception as e:
-        # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
-        co2_wert = "Fehler"
-        tvoc_wert = "Fehler"
-
-#-------------------------------------------#
-def messungacs712():
-    """Messung des Stroms des Heizstrahlers und Umrechnung in Watt """
-    global momt_leistung
-    try:
-        strom_list.clear()
-        
-        # Messwerte auslesen
-        for i in range(messloops):
-            strom_list.append(strom_sensor.read())
-
-        # Mittelwertfilter anwenden
-        mess_strom = messfilter(strom_list)
-
-        # ADC-Wert in Millivolt umrechnen
-        strom_in_mv = (mess_strom / 4095.0) * 3300
-
-        # Umrechnung von mV in Ampere unter Berücksichtigung des Offset
-        strom_A = (strom_in_mv - ACS_offset) / mV_per_A
-
-    except Exception as e:
-         # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
-        strom_A = "Fehler"
-        
-    # Berechnung wird nur ausgeführt falls kein Fehler vorliegt
-    if strom_A != "Fehler":
-        # Momentanleistung berechnen
-        momt_leistung = messpannung * strom_A
-        momt_leistung = int(momt_leistung)
-        
-        # Bei negativen Zahlen, sollte ein Fehler beim Stromsensor sein
-        if momt_leistung < 0:
-            momt_leistung = 0
-    else:
-        # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
-        momt_leistung = "Fehler"
-#-------------------------------------------#
-def callback_strahler(topic, msg):
-    """Abrufen der Steuerungsdaten für den Heizstrahler """
-    global neu_strahlersteuerung, alt_strahlersteuerung, ir_code, frostschutzschwellwert, frostschutzaus
-    try:
-        #Aus der MQTT-Nachricht den Werte für "Strahler" extrahieren
-        sub_daten = json.loads(msg)
-        
-        # Überprüfen, ob der Wert für "Strahler" in den empfangenen Daten vorhanden ist
-        # Wenn der Wert existiert und nicht None ist, wird der neue Wert gesetzt
-        if sub_daten.get("Strahler") is not None:
-            neu_strahlersteuerung = sub_daten.get("Strahler")
-        
-        # Überprüfen, ob der Wert für "FrostEIN" in den empfangenen Daten vorhanden ist
-        # Wenn der Wert existiert und nicht None ist, wird der neue Wert gesetzt
-        if sub_daten.get("FrostEIN") is not None:
-            frostschutzschwellwert = sub_daten.get("FrostEIN")
-        
-        # Überprüfen, ob der Wert für "FrostAUS" in den empfangenen Daten vorhanden ist
-        # Wenn der Wert existiert und nicht None ist, wird der neue Wert gesetzt
-        if sub_daten.get("FrostAUS") is not None:
-            frostschutzaus = sub_daten.get("FrostAUS")
-        
-    except Exception as e:
-        # Bei einen Fehler immer 0.
-        # 0 Entspricht Heizstrahler Aus
-        neu_strahlersteuerung = 0
-        
-    # Nur ein IR-Code Änderung wenn es eine Änderung gibt
-    if neu_strahlersteuerung != alt_strahlersteuerung:
-        # IR-Code aus den Dictionary ziehen
-        ir_code = ir_keys.get(neu_strahlersteuerung)
-        alt_strahlersteuerung = neu_strahlersteuerung
-        # Funktion zur Steuerung des Strahler aufrufen
-        steuerung_strahler()
-
-#-------------------------------------------#
-def steuerung_strahler():
-    """Senden der IR Daten an den Heizstrahler """
-    global strahlerfeedback
-    # Stufe 1
-    # Kann immer eingeschaltet werden
-    if neu_strahlersteuerung == 1:
-        ir_tx.transmit(ir_adresse, ir_code)
-        strahlerfeedback = 1 # Feedback für die Node-Red-Dashboard Anzeige
-        
-    # Stufe 2
-    # Kann nur Bedingt eingeschaltet werden, wenn er auf Stufe 1 oder 3 ist.
-    elif neu_strahlersteuerung == 2 and strahlerfeedback in [1, 3]:
-        ir_tx.transmit(ir_adresse, ir_code)
-        strahlerfeedback = 2 # Feedback für die Node-Red-Dashboard Anzeige
-    
-    # Stufe 3
-    # Kann nur eingeschlatet werden wenn er in Stufe 2 ist.
-    elif neu_strahlersteuerung == 3 and strahlerfeedback == 2:
-        ir_tx.transmit(ir_adresse, ir_code)
-        strahlerfeedback = 3 # Feedback für die Node-Red-Dashboard Anzeige
-    
-    # Aus
-    # Heizstrahler wird ausgeschaltet 
-    elif neu_strahlersteuerung not in [1, 2, 3]:
-        ir_tx.transmit(ir_adresse, ir_code)
-        strahlerfeedback = 0
-
-#-------------------------------------------#
-def wifi_verbindung():
-    """ Funktion um sich mit den Wlan Netzwerk zu Verbinden.
-    Abbruch, sobald die maximal gesetzte Anzahl an Versuchen überschritten ist. """
-    
-    # Wenn bereits verbunden, abbrechen
-    if wlan.isconnected():
-        return
-    
-    # Verbindung mit WLAN herstellen
-    wlan.connect(ssid, password) 
-    versuche = 0
-    
-    # Versuche, so lange mit WLAN zu verbinden, bis entweder eine Verbindung hergestellt wird oder die maximale Anzahl an Versuchen erreicht ist
-    while not wlan.isconnected() and versuche < max_versuche:
-        try:
-            time.sleep(1)
-            versuche += 1
-                
-        except Exception as e:
-            # Fehlerbehandlung im Falle eines Fehlers bei der Verbindung
-            
-            # Anzeige eines Fehlertexts beim Bootvorgang
-            if bootvorgang:
-                txt.text(font, "Boot Vorgang abgebrochen", 72, 109, st7789.CYAN, st7789.BLACK)
-                
-            # Anzeige des Fehlertexts
-            txt.text(font, "Fehler beim Verbindungsversuch", 45, 132, st7789.CYAN, st7789.BLACK)
-            txt.text(font, "mit den Wlan Netzwerk", 80, 155, st7789.CYAN, st7789.BLACK)
-            
-            return 
-
-    # Wenn Wlan verbunden ist, wird die Netzwerkonfiguration ausgegeben
-    if wlan.isconnected():
-        pass
-        #print("WLAN verbunden!")
-        #print("Netzwerk-Konfiguration:", wlan.ifconfig())
-
-    else:
-        # Wenn die Verbindung nicht erfolgreich war, Fehlernachricht anzeigen
-        # Anzeige des Fehlertexts
-        txt.fill(st7789.BLACK)
-        
-        # Anzeige eines Fehlertexts beim Bootvorgang
-        if bootvorgang:
-            txt.text(font, "Boot Vorgang abgebrochen", 72, 109, st7789.CYAN, st7789.BLACK)
-            
-         # Anzeige des Fehlertexts
-        txt.text(font, "Verbindung Wlan fehlgeschlagen", 50, 132, st7789.CYAN, st7789.BLACK)
-        txt.text(font, "Zu viele Versuche", 90, 155, st7789.CYAN, st7789.BLACK)
-#-------------------------------------------#
-
-def publish_senden(topic, daten):
-    """Funktion zum Verbinden mit dem MQTT-Broker und Senden der Daten."""
-    global mqttpb_verbunden
-    
-    try:
-        # Sollte die Wlan Verbindung verloren sein, wird sie wieder hergestellt
-        if not wlan.isconnected():
-            wifi_verbindung()
-            
-        # Verbindung zum Broker herstellen, Daten versenden und Verbindung trennen
-        pb_client.connect()
-        
-        # Dictionary wird in JSON-Format umgeschrieben
-        json_daten = json.dumps(daten)
-            
-        # Daten werden am Broker gesendet
-        pb_client.publish(topic, json_daten)
-            
-        # Verbindung zum Broker wird abgebrochen
-        pb_client.disconnect()
-            
-    except Exception as e:
-        # Anzeige des Fehlertexts
-        txt.fill(st7789.BLACK)
-        txt.text(font, "Fehler bei der Verbindung mit", 60, 132, st7789.CYAN, st7789.BLACK)
-        txt.text(font, "MQTT-Broker-Publish", 85, 155, st7789.CYAN, st7789.BLACK)
-        txt.text(font, f"Fehler {e}", 30, 178, st7789.CYAN, st7789.BLACK)
-        
-        # Wird auf False gesetzt um die Hauptschleife zu beenden
-        mqttpb_verbunden = False 
-
-#====================#
-
-#=====Einmalige Einrichtungen=====#
-
-# WLAN-Verbindung herstellen
+#=====Netzwerk Objekte definieren=====#
+# Beim Erstellen wird noch nicht verbunden, das passiert in steuerung.setup()
 wlan = network.WLAN(network.STA_IF)
-wlan.active(True)
-wifi_verbindung()
-
-# MQTT-Client einrichten und testen
-
-# Publish Client
-if wlan.isconnected():
-    
-    # MQTT-Publish-Client erstellen
-    pb_client = MQTTClient(pb_client_id, pb_broker_ip, pb_port, pb_user, pb_password)
-    # Test Verbindung zum Client herstellen
-    try:
-        pb_client.connect()
-        time.sleep(0.5)
-        pb_client.disconnect()
-        
-        # Der Wert wird auf True gesetzt, wenn der Test erfolgreich war. Nur bei einem erfolgreichen Test kann die Hauptschleife gestartet werden.
-        mqttpb_verbunden = True
-        
-    except Exception as e:
-        
-        # Anzeige des Fehlertexts
-        txt.fill_rect(72, 109, 170, 15, st7789.BLACK)
-        txt.text(font, "Boot Vorgang abgebrochen", 72, 86, st7789.CYAN, st7789.BLACK)
-        txt.text(font, "Fehler beim Verbinden mit", 60, 109, st7789.CYAN, st7789.BLACK)
-        txt.text(font, "MQTT-Broker-Publish", 85, 132, st7789.CYAN, st7789.BLACK)
-        txt.text(font, f"Fehler {e}", 30, 155, st7789.CYAN, st7789.BLACK)
-
-# Subscribe Client
-if wlan.isconnected():
-    try:
-        # MQTT-Subscribe-Client erstellen
-        subscribe_client = MQTTClient(subscribe_MQTT_CLIENT_ID, subscribe_MQTT_BROKER_IP)
-        
-        # Callback-Funktion wird festgelegt. Bei Empfang von Nachrichten wird die Funktion durch den Subscribe-Client aufgerufen wird.
-        subscribe_client.set_callback(callback_strahler)
-        
-        # Verbindung zum Subscribe Broker wird hergestellt
-        subscribe_client.connect()
-        
-        # Topics werden abonniert
-        subscribe_client.subscribe(subscribe_MQTT_TOPIC_1) #Topic Steuerung/Stufen
-        subscribe_client.subscribe(subscribe_MQTT_TOPIC_2) #Topic Steuerung/FrostEIN
-        subscribe_client.subscribe(subscribe_MQTT_TOPIC_3) #Topic Steuerung/FrostAUS
-        
-        # Der Wert wird auf True gesetzt, wenn der Test erfolgreich war. Nur bei einem erfolgreichen Test kann die Hauptschleife gestartet werden.
-        mqttsb_verbunden = True
-        
-        
-    except Exception as e:
-        # Anzeige des Fehlertexts
-        txt.fill_rect(72, 109, 170, 15, st7789.BLACK)
-        txt.text(font, "Boot Vorgang abgebrochen", 72, 86, st7789.CYAN, st7789.BLACK)
-        txt.text(font, "Fehler beim Verbinden mit", 60, 109, st7789.CYAN, st7789.BLACK)
-        
-        # Falls beim MQTT-Publish bereits ein Fehler ist, wird die Nachricht darunter eingefügt
-        if mqttpb_verbunden == True:
-            txt.text(font, "MQTT-Broker-Subscribe", 80, 132, st7789.CYAN, st7789.BLACK)
-            txt.text(font, f"Fehler {e}", 30, 1553, st7789.CYAN, st7789.BLACK)
-            
-        else:
-            txt.text(font, "MQTT-Broker-Subscribe", 80, 178, st7789.CYAN, st7789.BLACK)
-            txt.text(font, f"Fehler {e}", 30, 201, st7789.CYAN, st7789.BLACK)
-#=================================#
-
-# Bildschirmtexte einfügen nach erfolgreichen Boot Vorgang
-if wlan.isconnected() and mqttpb_verbunden and mqttsb_verbunden:
-    txt.fill_rect(72, 109, 170, 15, st7789.BLACK)
-    txt.text(font, "Boot Vorgang erfolgreich", 72, 109, st7789.CYAN, st7789.BLACK)
-    
-    # Merker für Fehlertexte falls nach den Boot Vorgang Fehler Texte auf Bildschirm geschrieben werden
-    bootvorgang = False
-    
-    # Kurze Wartezeit zum Lesen
-    time.sleep(2)
-    txt.fill_rect(72, 109, 195, 15, st7789.BLACK)
-
-# Bildschirm Texte einfügen für die Sensorwerte und Einstellungen
-    txt.text(font, "Temperatur: ", 30, 40, st7789.CYAN, st7789.BLACK)
-    txt.text(font, "Luftfeuchtigkeit: ", 30, 63, st7789.CYAN, st7789.BLACK)
-    txt.text(font, "CO2-Wert: ", 30, 86, st7789.CYAN, st7789.BLACK)
-    txt.text(font, "TVOC-Wert: ", 30, 109, st7789.CYAN, st7789.BLACK)
-    txt.text(font, "Aktuelle Leistung: ", 30, 132, st7789.CYAN, st7789.BLACK)
-    txt.text(font, "Gesamte Leistung: ", 30, 155, st7789.CYAN, st7789.BLACK)
-    txt.text(font, "Frostschutz Einschalten: ", 30, 178, st7789.CYAN, st7789.BLACK)
-    
+
+# MQTT-Publish-Client, die Verbindung bleibt für das Senden der Daten offen
+pb_client = MQTTClient(pb_client_id, pb_broker_ip, pb_port, pb_user, pb_password, keepalive=pb_keepalive)
+pb_sitzung = MQTTSitzung(pb_client, pb_keepalive, pb_backoff_min, pb_backoff_max)
+
+# MQTT-Subscribe-Client, nur ohne gemeinsame Verbindung
+subscribe_client = None if mqtt_gemeinsam else MQTTClient(subscribe_MQTT_CLIENT_ID, subscribe_MQTT_BROKER_IP)
+
+# Uhrzeit per NTP, wird in steuerung.setup() nach der WLAN-Verbindung aufgerufen
+if zeit_synchronisieren:
+    import ntptime
+    uhr_stellen = ntptime.settime
+else:
+    uhr_stellen = None
+#=====================================#
+
+#=====Steuerung=====#
+steuerung = Steuerung(
+        sensoraht10, sensorccs811, strom_messung, energiezaehler, ir_tx, txt, font, wlan,
+        pb_sitzung, subscribe_client, ssid, password,
+        subscribe_topics = (subscribe_MQTT_TOPIC_1, subscribe_MQTT_TOPIC_2, subscribe_MQTT_TOPIC_3),
+        ccs811_interrupt = ccs811_int_pin is not None,
+        messloops = messloops,
+        aht10_abfrageintervall = aht10_abfrageintervall,
+        aht10_timeout = aht10_timeout,
+        frostschutzschwellwert = frostschutzschwellwert,
+        frostschutzaus = frostschutzaus,
+        frostschutz_stufenabstaende = frostschutz_stufenabstaende,
+        strahler_stufenabstand = strahler_stufenabstand,
+        ir_mindestabstand = ir_mindestabstand,
+        regler = regler,
+        stufe_pruefen = stufe_pruefen,
+        stufen_leistungen = stufen_leistungen,
+        pruef_toleranz = pruef_toleranz,
+        pruef_wartezeit = pruef_wartezeit,
+        pruef_perioden = pruef_perioden,
+        pruef_wiederholungen = pruef_wiederholungen,
+        mess_umwelt_intervall = mess_umwelt_intervall,
+        mess_strom_intervall = mess_strom_intervall,
+        mess_ccs811_intervall = mess_ccs811_intervall,
+        ccs811_int_intervall = ccs811_int_intervall,
+        task_intervall_empfangen = task_intervall_empfangen,
+        task_intervall_senden = task_intervall_senden,
+        task_intervall_anzeige = task_intervall_anzeige,
+        task_intervall_frostschutz = task_intervall_frostschutz,
+        task_intervall_trend = task_intervall_trend,
+        max_versuche = max_versuche,
+        sensor_totbaender = sensor_totbaender,
+        telemetrie_max_stille = telemetrie_max_stille,
+        telemetrie_einzeltopics = telemetrie_einzeltopics,
+        telemetrie_binaer = telemetrie_binaer,
+        ir_adresse = ir_adresse,
+        ir_keys = ir_keys,
+        bildpuffer = bildpuffer,
+        trendanzeige = trendanzeige,
+        warteschlange = warteschlange,
+        task_intervall_nachsenden = task_intervall_nachsenden,
+        zeitreihe = zeitreihe,
+        task_intervall_zeitreihe = task_intervall_zeitreihe,
+        task_intervall_zeitreihe_sichern = task_intervall_zeitreihe_sichern,
+        uhr_stellen = uhr_stellen)
+#===================#
 
 #=====Hauptschleife=====#
-while mqttpb_verbunden and mqttsb_verbunden:
-
-# Auswertung und Messung der Sensordaten
-
-    # Aktuelle Zeit wird gemessen für die Messintervalle der Sensoren
-    mess_umwelt_now = time.ticks_ms()
-    mess_strom_now = time.ticks_ms()
-    
-    # Alle 30 Sekunden wird eine Messung durchgeführt
-    if time.ticks_diff(mess_umwelt_now, mess_umwelt_last) >= mess_umwelt_intervall:
-        mess_umwelt_last = mess_umwelt_now
-        
-        # Temperatur und Luftfeuchtigkeit messen
-        messungaht10()
-    
-        # Luftqualität messen wenn der Sensor bereit ist
-        try:
-            if sensorccs811.data_ready():
-                
-                # Wird nur ausgeführt wenn beide Varibalen vom AHT10 ein Integer sind. Ist es ein String liegt ein Fehler vor
-                if isinstance(raumtemperatur, int) and isinstance(luftfeuchtigkeit, int):
-                    
-                    # Umweltdaten einspeisen um Messwerte zu verbessern.
-                    sensorccs811.put_envdata(luftfeuchtigkeit, raumtemperatur)
-            
-            # Funktion zur Messung der Luftqualität
-            messungccs811()
-            
-        except Exception as e:
-            # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
-            co2_wert = "Fehler"
-            tvoc_wert = "Fehler" 
-    
-    # Leistung messen sobald der Heizstrahler eingeschaltet ist    
-    if neu_strahlersteuerung in [1, 2, 3]:
-        
-        # In einen Takt von 1 Sekunde wird gemessen
-        if time.ticks_diff(mess_strom_now, mess_strom_last) >= mess_strom_intervall:
-            betriebszahler += 1 # Betriebszähler vom Heizstrahler zur Berechnung des Verbrauchs
-            mess_strom_last = mess_strom_now
-            
-            # Funktion zur Messung des Stroms und Berechnung der Leistung
-            messungacs712()
-
-    # Wenn der Heizstrahler ist ausgeschaltet wird, wird die verbrauchte Leistung berechnet
-    elif strahlerfeedback == 0 and momt_leistung != 0:
-        betriebszahler = betriebszahler / 3600 # Umrechnung von Sekunden auf Stunden
-        teil_verbrauch = (momt_leistung / 1000 ) * betriebszahler # Berechnung der Leistung in kWh
-        ges_verbrauch = round((teil_verbrauch + ges_verbrauch),2 ) # Teil Verbrauch zum gesamten Verbrauch addieren und runden
-        
-        # Werte werden zurückgesetzt
-        momt_leistung = 0
-        teil_verbrauch = 0
-        betriebszahler = 0
-
-#-------------------------------------------------------------------------------------------------------------#
-# Frostschutz-Funktion
-# Automatisches Ein- und Ausschalten des Heizstrahlers zur Aufrechterhaltung einer konstanten Raumtemperatur
-    
-    # Frostschutz wird nur ausgeführt wenn es ein Integer ist. Sollte es ein String sein hat der Sensor ein Fehler
-    # Der Schwellwert muss immer kleiner sein als der Ausschaltwert
-    if isinstance(raumtemperatur, int) and frostschutzschwellwert < frostschutzaus:
-        
-        # Heizstrahler wird eingeschaltet wenn die Temperatur unter den eingestellten Wert ist und er nicht eingeschaltet ist
-        if raumtemperatur < frostschutzschwellwert  and strahlerfeedback == 0:
-            ir_tx.transmit(ir_adresse, ir_keys.get(1)) # Strahler wird auf Stufe 1 geschaltet
-            time.sleep(5) # 5 Sekunden Wartezeit um große Einschaltströme zu verhindern
-            
-            ir_tx.transmit(ir_adresse, ir_keys.get(2)) # Strahler wird auf Stufe 2 geschaltet
-            time.sleep(5) # 5 Sekunden Wartezeit um große Einschaltströme zu verhindern
-    
-            ir_tx.transmit(ir_adresse, ir_keys.get(3)) # Strahler wird auf Stufe 3 geschaltet
-            
-            # Feedback an das Node-Red-Dashboard zur Anzeige des aktuellen Status des Heizstrahlers und der Frostschutzfunktion
-            strahlerfeedback = 3
-            frostschutzfeedback = 1
-         
-        # Heizstrahler wird ausgeschaltet wenn die Temperatur über den eingestellten Wert ist und die Frostschutzfunktion aktiv ist
-        elif raumtemperatur > frostschutzaus and frostschutzfeedback == 1:
-            ir_tx.transmit(ir_adresse, ir_keys.get(0)) # Heizstrahler wird ausgeschaltet
-            
-            # Feedback an das Node-Red-Dashboard zur Anzeige des aktuellen Status des Heizstrahlers und der Frostschutzfunktion
-            strahlerfeedback = 0
-            frostschutzfeedback = 0
-            
-        
-        # Setzt das Frostschutzfeedback für die Anzeige im Node-Red-Dashboard, um den Status des Frostschutzmechanismus (aktiv oder inaktiv) anzuzeigen.
-        if frostschutzfeedback == 0:
-            frostschutzfeedbackstring = "Aus" #Bei inaktivem Frostschutz
-            
-        elif frostschutzfeedback == 1:
-            frostschutzfeedbackstring = "Aktiv" #Bei aktivem Frostschutz
-
-#-------------------------------------------------------------------------------------------------------------#
-# Daten an den MQTT-Broker senden
-
-    #Sensordaten in JSON-Fomart schreiben
-    sensordaten_neu = {
-        "Temperatur": raumtemperatur,
-        "Luftfeuchtigkeit": luftfeuchtigkeit,
-        "CO2_Wert": co2_wert,
-        "TVOC_Wert": tvoc_wert,
-        "Momentane_Leistung": momt_leistung,
-        "Gesamte_Leistung": ges_verbrauch
-        }
-    
-    #Feedback vom Strahler in JSON-Fomart schreiben
-    feedbackdaten_neu = {
-        "Strahlerfeedback": strahlerfeedback,
-        "Frostschutzfeedback": frostschutzfeedbackstring,
-        "Frostschutzschwellwert": frostschutzschwellwert,
-        "FrostschutzAus": frostschutzaus
-        }
-
-    # Sensordaten werden nur am Broker und zum Bildschirm gesendet wenn es eine Veränderung gibt
-    if sensordaten_neu != sensordaten_alt and mqttpb_verbunden and mqttsb_verbunden:
-        sensordaten_alt = sensordaten_neu.copy()
-        # Daten werden zum Bildschirm gesendet
-        
-        # Temperatur
-        txt.fill_rect(120, 40, 100, 15, st7789.BLACK)
-        txt.text(font, f"{raumtemperatur} °C", 120, 40, st7789.CYAN, st7789.BLACK)
-    
-        # Luftfeuchtigkeit
-        txt.fill_rect(168, 63, 100, 15, st7789.BLACK)
-        txt.text(font, f"{luftfeuchtigkeit} %", 168, 63, st7789.CYAN, st7789.BLACK)
-    
-        # CO2-Wert
-        txt.fill_rect(103, 86, 100, 15, st7789.BLACK)
-        txt.text(font, f"{co2_wert} ppm", 103, 86, st7789.CYAN, st7789.BLACK)
-    
-        # TVOC-Wert
-        txt.fill_rect(112, 109, 100, 15, st7789.BLACK)
-        txt.text(font, f"{tvoc_wert} ppb", 112, 109, st7789.CYAN, st7789.BLACK)
-    
-        # Momentane Leistung
-        txt.fill_rect(175, 132, 100, 15, st7789.BLACK)
-        txt.text(font, f"{momt_leistung} W", 175, 132, st7789.CYAN, st7789.BLACK)
-    
-        # Gesamte Leistung
-        txt.fill_rect(167, 155, 100, 15, st7789.BLACK)
-        txt.text(font, f"{ges_verbrauch} kWh", 167, 155, st7789.CYAN, st7789.BLACK)
-        
-        # Daten werden zum Broker gesendet
-        publish_senden("Raum/Sensorwerte", sensordaten_neu)
-  
-    # Feedbackdaten werden nur am Broker und zum Bildschirm gesendet wenn es eine Veränderung gibt
-    if feedbackdaten_neu != feedbackdaten_alt and mqttpb_verbunden and mqttsb_verbunden:
-        feedbackdaten_alt = feedbackdaten_neu.copy()
-        
-        # Daten werden zum Bildschirm gesendet
-        
-        # Frostschutzschwellwert
-        txt.fill_rect(217, 178, 100, 15, st7789.BLACK)
-        txt.text(font, f"{frostschutzschwellwert} °C", 223, 178, st7789.CYAN, st7789.BLACK)
-        
-        # Daten werden zum Broker gesendet
-        publish_senden("Raum/Feedback", feedbackdaten_neu)
-
-#-------------------------------------------------------------------------------------------------------------#
-# Daten vom Broker empfangen
-
-    # Nach neuen Nachrichten Abfragen
-    if wlan.isconnected() and mqttsb_verbunden:
-        try:
-            subscribe_client.check_msg()
-        
-        except OSError as e:
-            # Fehlerbehandlung bei Netzwerkfehler
-            
-            try:
-                # Überprüfen ob eine Verbindung zum Wlan Netzwerkvorhanden ist
-                if not wlan.isconnected():
-                    wifi_verbindung() # Wlan-Verbindung wieder herstellen, sollte keine da sein
-                
-                
-                # Reconntecten und Subscriben
-                subscribe_client.connect()
-                subscribe_client.subscribe(subscribe_MQTT_TOPIC_1) #Topic Steuerung/Stufen
-                subscribe_client.subscribe(subscribe_MQTT_TOPIC_2) #Topic Steuerung/FrostEIN
-                subscribe_client.subscribe(subscribe_MQTT_TOPIC_3) #Topic Steuerung/FrostAUS
-                
-                # Erneut nach neuen Nachrichten Abfragen
-                subscribe_client.check_msg()
-            
-            except Exception as e2:
-                # Fehlernachricht falls das Reconnecten nicht funktioniert
-                
-                # Anzeige des Fehler Textes
-                txt.fill(st7789.BLACK)
-                txt.text(font, "Fehler beim Reconnect mit", 60, 132, st7789.CYAN, st7789.BLACK)
-                txt.text(font, "MQTT-Broker-Subscribe-", 85, 155, st7789.CYAN, st7789.BLACK)
-                txt.text(font, f"Fehler {e2}", 30, 178, st7789.CYAN, st7789.BLACK)
-                
-                # Der Wert wird auf False gesetzt um die Hauptschleife kontrolliert zu beenden
-                mqttsb_verbunden = False
-        
-        except Exception as e:
-            
-            # Anzeige des Fehler Textes
-            txt.fill(st7789.BLACK)
-            txt.text(font, "Fehler beim Verbinden mit", 60, 132, st7789.CYAN, st7789.BLACK)
-            txt.text(font, "MQTT-Broker-Subscribe", 85, 155, st7789.CYAN, st7789.BLACK)
-            txt.text(font, f"Fehler {e}", 30, 178, st7789.CYAN, st7789.BLACK)
-            
-            # Der Wert wird auf False gesetzt um die Hauptschleife kontrolliert zu beenden
-            mqttsb_verbunden = False
-            
+async def hauptprogramm():
+    """Die Steuerung wird aufgerufen, sobald die nächste Aufgabe fällig ist oder (mit empfang_poll)
+    ein Steuerbefehl am MQTT-Socket ankommt. In der Wartezeit können andere asyncio-Tasks laufen,
+    sonst ruht die CPU in poll()."""
+    while steuerung.aktiv():
+        naechster = steuerung.step(time.ticks_ms())
+        wartezeit = max(0, time.ticks_diff(naechster, time.ticks_ms()))
+        sock = steuerung.empfangs_socket() if empfang_poll else None
+        if sock is None:
+            await asyncio.sleep(wartezeit / 1000)
+        elif await lesbar(sock, wartezeit):
+            steuerung.empfangen_jetzt()
+
+# Bootvorgang: WLAN und MQTT verbinden, Bildschirm aufbauen
+if steuerung.setup():
+    asyncio.run(hauptprogramm())
+
 # Verlassen der Hauptschleife
 
 # Bei Beendigung der Schleife wird folgendes auf den Bildschirm angezeigt
-txt.text(font, "Hauptschleife beendet", 80, 40, st7789.CYAN, st7789.BLACK)
\ No newline at end of file
+steuerung.beenden()
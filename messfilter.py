@@ -0,0 +1,96 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: messfilter
+#Aufgabe: Filtern von Messwerten, um Ausreißer zu entfernen
+#		  Gleitender Median, getrimmter Mittelwert oder exponentieller Mittelwert (EMA)
+#		  Feste Ringpuffer im array, pro Messwert wird kein neuer Speicher angelegt
+
+#=====Bibliotheken=====#
+from array import array
+#======================#
+
+#=====Filterarten=====#
+MEDIAN = 0
+GETRIMMT = 1 # Mittelwert ohne die kleinsten und größten Werte
+EMA = 2 # Exponentieller gleitender Mittelwert
+#=====================#
+
+
+class Messfilter:
+    """Gleitender Filter über die letzten "fenster" Messwerte.
+    Neben dem Ringpuffer wird eine sortierte Kopie mitgeführt, die bei jedem
+    neuen Wert durch Verschieben aktualisiert wird (Aufwand O(fenster))."""
+
+    def __init__(self, fenster=10, modus=GETRIMMT, abschneiden=1, alpha=0.2):
+        self.fenster = fenster
+        self.modus = modus
+        self.abschneiden = abschneiden # Anzahl der Werte, die an jedem Ende verworfen werden
+        self.alpha = alpha # Gewichtung des neuen Werts beim EMA
+        self.werte = array("f", [0] * fenster) # Ringpuffer in Reihenfolge der Messung
+        self.sortiert = array("f", [0] * fenster) # Gleiche Werte, aufsteigend sortiert
+        self.anzahl = 0
+        self.index = 0
+        self.ema = 0.0
+
+    def zuruecksetzen(self):
+        """Alle bisherigen Messwerte verwerfen"""
+        self.anzahl = 0
+        self.index = 0
+        self.ema = 0.0
+
+    def hinzufuegen(self, wert):
+        """Neuen Messwert aufnehmen. Ist der Puffer voll, fällt der älteste Wert heraus."""
+        if self.modus == EMA:
+            self.ema = wert if self.anzahl == 0 else self.ema + self.alpha * (wert - self.ema)
+            self.anzahl = min(self.anzahl + 1, self.fenster)
+            return
+
+        s = self.sortiert
+        if self.anzahl < self.fenster:
+            # Puffer noch nicht voll, der neue Wert wird hinten eingefügt
+            i = self.anzahl
+            self.anzahl += 1
+        else:
+            # Position des ältesten Werts in der sortierten Kopie suchen, er wird überschrieben
+            alt = self.werte[self.index]
+            i = 0
+            while s[i] != alt:
+                i += 1
+
+        # Wert mit der Genauigkeit des Puffers speichern, damit er später wiedergefunden wird
+        self.werte[self.index] = wert
+        wert = self.werte[self.index]
+        self.index += 1
+        if self.index == self.fenster:
+            self.index = 0
+
+        # Neuen Wert an die richtige Stelle schieben
+        ende = self.anzahl - 1
+        while i > 0 and s[i - 1] > wert:
+            s[i] = s[i - 1]
+            i -= 1
+        while i < ende and s[i + 1] < wert:
+            s[i] = s[i + 1]
+            i += 1
+        s[i] = wert
+
+    def wert(self):
+        """Gefilterter Wert aller Messwerte im Puffer. Ohne Messwerte 0."""
+        n = self.anzahl
+        if n == 0:
+            return 0
+        if self.modus == EMA:
+            return self.ema
+        s = self.sortiert
+        if self.modus == MEDIAN:
+            if n & 1:
+                return s[n // 2]
+            return (s[n // 2 - 1] + s[n // 2]) / 2
+
+        # Getrimmter Mittelwert. Bei zu wenigen Werten wird nichts verworfen
+        k = self.abschneiden
+        if n <= 2 * k:
+            k = 0
+        summe = 0.0
+        for i in range(k, n - k):
+            summe += s[i]
+        return summe / (n - 2 * k)
@@ -0,0 +1,139 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: modellregler
+#Aufgabe: Modellbasierte Regelung der Raumtemperatur als Alternative zur Zweipunkt-Regelung des Frostschutzes
+#		  Aus Temperatur und mittlerer Leistung wird laufend ein Raummodell erster Ordnung gelernt
+#		  (Zeitkonstante, Temperatur ohne Heizung, Erwärmung je Stufe). Gewählt wird die kleinste Stufe,
+#		  mit der die Temperatur am Ende des Horizonts die Solltemperatur hält
+#		  Pro Messung feste Rechenzeit (rekursive kleinste Quadrate über drei Parameter), kein Speicherzuwachs.
+#		  Ohne Hardware und ohne time, läuft unverändert auf dem PC über aufgezeichnete Verläufe
+
+#=====Bibliotheken=====#
+import math
+#======================#
+
+
+class Modellregler:
+    """Raummodell dT/dt = c - a*T + b*P, gelernt mit rekursiven kleinsten Quadraten
+    und Vergessensfaktor (T in °C, P in kW, Zeit in h). Daraus folgen die
+    Zeitkonstante 1/a und die Temperatur im eingeschwungenen Zustand (c + b*P) / a.
+
+    messung() wird nach jeder Temperaturmessung mit der mittleren Leistung seit der
+    vorherigen Messung aufgerufen und setzt stufe. Bis das Modell bereit() ist,
+    wird zweipunktgeregelt (höchste Stufe unter der Solltemperatur, Aus über
+    solltemperatur + schaltdifferenz), damit das Modell Heiz- und Abkühlphasen sieht.
+    Danach wird höchstens alle mindestlaufzeit_s Sekunden die Stufe gewechselt."""
+
+    def __init__(self, solltemperatur=20, leistungen=(0, 1000, 2000, 3000), horizont_s=300,
+                 mindestlaufzeit_s=300, schaltdifferenz=0.5, vergessen=0.998, min_proben=20,
+                 max_luecke_s=300, start_unsicherheit=1000.0):
+        self.solltemperatur = solltemperatur # in °C
+        self.leistungen = leistungen # Nennleistung in W je Stufe
+        self.horizont_s = horizont_s # Vorhersage so weit in die Zukunft, wie mindestlaufzeit_s bis zur nächsten Entscheidung
+        self.mindestlaufzeit_s = mindestlaufzeit_s # so lange bleibt eine gewählte Stufe mindestens
+        self.schaltdifferenz = schaltdifferenz # in K, Zweipunkt-Regelung solange das Modell nicht bereit ist
+        self.vergessen = vergessen # Gewicht der bisherigen Messungen pro neuer Messung
+        self.min_proben = min_proben # Messungen mit und ohne Heizung, bis das Modell verwendet wird
+        self.max_luecke_s = max_luecke_s # längere Abstände zwischen zwei Messungen werden nicht gelernt
+        self.start_unsicherheit = start_unsicherheit
+        self.zuruecksetzen()
+
+    def zuruecksetzen(self):
+        """Gelerntes Modell verwerfen"""
+        self.theta = [0.0, 0.0, 0.0] # c, -a, b
+        u = self.start_unsicherheit
+        self.kovarianz = [u, 0.0, 0.0, 0.0, u, 0.0, 0.0, 0.0, u] # 3x3 zeilenweise
+        self.proben_heizen = 0
+        self.proben_aus = 0
+        self.letzte = None # Temperatur der vorherigen Messung
+        self.zeit_s = 0.0 # Summe der Messabstände, für die Mindestlaufzeit
+        self.wechsel_s = None # Zeitpunkt des letzten Stufenwechsels
+        self.stufe = 0
+
+    #=====Modell=====#
+    def lernen(self, t_alt, t_neu, leistung, dauer_s):
+        """Eine Messung in das Modell aufnehmen. Die Steigung wird mit der Temperatur in der Mitte
+        des Abstands verglichen, dadurch hebt sich das Rauschen der beiden Messungen auf"""
+        dauer_h = dauer_s / 3600
+        x0, x1, x2 = 1.0, (t_alt + t_neu) / 2, leistung / 1000
+        y = (t_neu - t_alt) / dauer_h
+        p = self.kovarianz
+        # px = P * x
+        px0 = p[0] * x0 + p[1] * x1 + p[2] * x2
+        px1 = p[3] * x0 + p[4] * x1 + p[5] * x2
+        px2 = p[6] * x0 + p[7] * x1 + p[8] * x2
+        nenner = self.vergessen + x0 * px0 + x1 * px1 + x2 * px2
+        k0, k1, k2 = px0 / nenner, px1 / nenner, px2 / nenner
+        th = self.theta
+        fehler = y - (th[0] * x0 + th[1] * x1 + th[2] * x2)
+        th[0] += k0 * fehler
+        th[1] += k1 * fehler
+        th[2] += k2 * fehler
+        # P = (P - k * px^T) / vergessen. Ohne Anregung (z.B. lange konstante Temperatur) würde P
+        # immer weiter wachsen, ab der Startunsicherheit wird deshalb nicht mehr vergessen
+        teiler = self.vergessen if p[0] + p[4] + p[8] < 3 * self.start_unsicherheit else 1.0
+        k = (k0, k1, k2)
+        pxs = (px0, px1, px2)
+        for i in range(3):
+            for j in range(3):
+                p[i * 3 + j] = (p[i * 3 + j] - k[i] * pxs[j]) / teiler
+        if leistung > 0:
+            self.proben_heizen += 1
+        else:
+            self.proben_aus += 1
+
+    def bereit(self):
+        """Genug Messungen mit und ohne Heizung und ein physikalisch sinnvolles Modell (a > 0, b > 0)"""
+        return self.proben_heizen >= self.min_proben and self.proben_aus >= self.min_proben \
+            and self.theta[1] < 0 and self.theta[2] > 0
+
+    def tau_s(self):
+        """Zeitkonstante des Raums in s"""
+        return 3600 / -self.theta[1]
+
+    def gleichgewicht(self, leistung):
+        """Temperatur im eingeschwungenen Zustand bei leistung in W (ohne Heizung: Umgebung)"""
+        return (self.theta[0] + self.theta[2] * leistung / 1000) / -self.theta[1]
+
+    def vorhersage(self, temperatur, leistung, dauer_s):
+        """Temperatur nach dauer_s bei konstanter leistung in W"""
+        ende = self.gleichgewicht(leistung)
+        return ende + (temperatur - ende) * math.exp(self.theta[1] * dauer_s / 3600)
+
+    #=====Regelung=====#
+    def messung(self, temperatur, leistung, dauer_s):
+        """Neue Temperatur in °C und mittlere Leistung in W seit der vorherigen Messung (dauer_s).
+        Lernt das Modell und wählt die Stufe. Gibt die Stufe zurück."""
+        if self.letzte is not None and 0 < dauer_s <= self.max_luecke_s:
+            self.lernen(self.letzte, temperatur, leistung, dauer_s)
+        if dauer_s > 0:
+            self.zeit_s += dauer_s
+        self.letzte = temperatur
+
+        if not self.bereit():
+            if temperatur < self.solltemperatur:
+                stufe = len(self.leistungen) - 1
+            elif temperatur > self.solltemperatur + self.schaltdifferenz:
+                stufe = 0
+            else:
+                stufe = self.stufe
+        elif self.wechsel_s is not None and self.zeit_s - self.wechsel_s < self.mindestlaufzeit_s:
+            stufe = self.stufe
+        else:
+            # Kleinste Stufe, mit der die Solltemperatur am Ende des Horizonts erreicht ist
+            stufe = len(self.leistungen) - 1
+            for kandidat, leistung_stufe in enumerate(self.leistungen):
+                if self.vorhersage(temperatur, leistung_stufe, self.horizont_s) >= self.solltemperatur:
+                    stufe = kandidat
+                    break
+
+        if stufe != self.stufe:
+            self.stufe = stufe
+            self.wechsel_s = self.zeit_s
+        return stufe
+
+    def ausfall(self):
+        """Sensorfehler: Heizung aus, über die Lücke wird nicht gelernt"""
+        self.letzte = None
+        if self.stufe != 0:
+            self.stufe = 0
+            self.wechsel_s = self.zeit_s
@@ -0,0 +1,145 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: mqtt_sitzung
+#Aufgabe: Dauerhafte Verbindung zum MQTT-Broker für das Senden und Empfangen der Daten
+#		  Keepalive (PINGREQ) während Sendepausen
+#		  Automatischer Reconnect mit wachsender Wartezeit (Backoff)
+#		  Abonnierte Topics werden nach jedem Reconnect erneut abonniert
+
+#=====Bibliotheken=====#
+import time
+#======================#
+
+
+class MQTTSitzung:
+    """Hält eine MQTT-Verbindung dauerhaft offen, statt für jede Nachricht
+    neu zu verbinden. Bricht die Verbindung ab, wird beim nächsten Senden
+    transparent neu verbunden. Schlägt das fehl, wird erst nach einer
+    Wartezeit erneut versucht, die sich bis backoff_max_ms verdoppelt.
+    Mit abonnieren() trägt dieselbe Verbindung auch die Steuerbefehle, ein
+    zweiter Client mit eigenem Socket ist dann nicht nötig."""
+
+    def __init__(self, client, keepalive=60, backoff_min_ms=500, backoff_max_ms=30000):
+        # client: umqtt.simple.MQTTClient, mit dem gleichen keepalive (in s) erstellt
+        self.client = client
+        self.keepalive_ms = keepalive * 1000
+        self.backoff_min_ms = backoff_min_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.backoff_ms = backoff_min_ms
+        self.verbunden = False
+        self.letzte_aktivitaet = 0
+        self.naechster_versuch = 0
+        self.reconnects = 0
+        self.fehler = None
+        # Abonnements, werden bei jedem Verbinden erneut angemeldet (clean session)
+        self.topics = ()
+        self.callback = None
+        self.verbindungsdauer_ms = 0 # Dauer des letzten Verbindens mit Abonnieren
+
+    def verbinden(self):
+        """Verbindung zum Broker herstellen. Fehler werden an den Aufrufer weitergegeben."""
+        self.trennen()
+        start = time.ticks_ms()
+        self.client.connect()
+        if self.topics:
+            self._abonnieren()
+        self.verbunden = True
+        self.letzte_aktivitaet = time.ticks_ms()
+        self.verbindungsdauer_ms = time.ticks_diff(self.letzte_aktivitaet, start)
+        self.backoff_ms = self.backoff_min_ms
+        self.fehler = None
+
+    def abonnieren(self, topics, callback):
+        """Topics über diese Verbindung abonnieren. Eingehende Nachrichten ruft
+        callback(topic, msg) beim Empfangen oder Pflegen auf."""
+        self.topics = tuple(topics)
+        self.callback = callback
+        if self.verbunden:
+            self._abonnieren()
+
+    def _abonnieren(self):
+        self.client.set_callback(self.callback)
+        for topic in self.topics:
+            self.client.subscribe(topic)
+
+    def trennen(self):
+        """Verbindung schließen, ohne Fehler zu melden"""
+        if self.verbunden:
+            self.verbunden = False
+            try:
+                self.client.disconnect()
+            except Exception:
+                pass
+
+    def _verbindung_verloren(self, e):
+        """Verbindung als verloren markieren und den nächsten Versuch planen"""
+        self.verbunden = False
+        self.fehler = e
+        try:
+            self.client.sock.close()
+        except Exception:
+            pass
+
+    def _reconnect(self):
+        """Neu verbinden, sofern die Wartezeit abgelaufen ist. Gibt True bei Erfolg zurück."""
+        jetzt = time.ticks_ms()
+        if time.ticks_diff(jetzt, self.naechster_versuch) < 0:
+            return False
+        try:
+            self.verbinden()
+            self.reconnects += 1
+            return True
+        except Exception as e:
+            self._verbindung_verloren(e)
+            # Wartezeit bis zum nächsten Versuch verdoppeln
+            self.naechster_versuch = time.ticks_add(jetzt, self.backoff_ms)
+            self.backoff_ms = min(self.backoff_ms * 2, self.backoff_max_ms)
+            return False
+
+    def senden(self, topic, nachricht):
+        """Nachricht über die offene Verbindung senden.
+        Gibt False zurück, wenn gerade keine Verbindung hergestellt werden kann."""
+        for versuch in range(2):
+            if not self.verbunden and not self._reconnect():
+                return False
+            try:
+                self.client.publish(topic, nachricht)
+                self.letzte_aktivitaet = time.ticks_ms()
+                return True
+            except OSError as e:
+                # Verbindung ist abgebrochen, einmal sofort neu verbinden
+                self._verbindung_verloren(e)
+                self.naechster_versuch = time.ticks_ms()
+        return False
+
+    def empfangen(self):
+        """Eingegangene Nachrichten ohne Warten abholen. Ist die Verbindung abgebrochen,
+        wird (nach Ablauf der Wartezeit) neu verbunden und neu abonniert.
+        Gibt zurück, ob die Verbindung besteht."""
+        if not self.verbunden and not self._reconnect():
+            return False
+        try:
+            self.client.check_msg()
+            return True
+        except OSError as e:
+            # Verbindung ist abgebrochen, beim nächsten Aufruf sofort neu verbinden
+            self._verbindung_verloren(e)
+            self.naechster_versuch = time.ticks_ms()
+            return False
+
+    def pflegen(self):
+        """Muss regelmäßig aufgerufen werden. Sendet ein PINGREQ, wenn die Hälfte
+        der Keepalive-Zeit ohne Nachricht vergangen ist, und liest die PINGRESP
+        aus dem Socket, damit der Empfangspuffer nicht voll läuft."""
+        if not self.verbunden:
+            self._reconnect()
+            return
+        if self.keepalive_ms <= 0:
+            return
+        try:
+            if time.ticks_diff(time.ticks_ms(), self.letzte_aktivitaet) >= self.keepalive_ms // 2:
+                self.client.ping()
+                self.letzte_aktivitaet = time.ticks_ms()
+            # Antworten des Brokers (PINGRESP) ohne Warten abholen
+            self.client.check_msg()
+        except OSError as e:
+            self._verbindung_verloren(e)
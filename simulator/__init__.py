@@ -0,0 +1,7 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator
+#Aufgabe: Simulation der Hardware, damit das Hauptprogramm unverändert unter CPython läuft
+#		  Aufruf: python -m simulator --dauer 3600
+
+from simulator.simulation import Simulation
+from simulator.uhr import SimulationBeendet, VirtuelleUhr
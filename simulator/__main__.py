@@ -0,0 +1,52 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/__main__
+#Aufgabe: Hauptprogramm in der Simulation ausführen und eine Zusammenfassung ausgeben
+#Aufruf:  python -m simulator --dauer 3600 --befehl 60:1 --befehl 600:0
+
+#=====Bibliotheken=====#
+import argparse
+import time
+
+from simulator import Simulation
+#======================#
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hauptprogramm mit simulierter Hardware ausführen")
+    parser.add_argument("--dauer", type=float, default=3600, help="virtuelle Laufzeit in s")
+    parser.add_argument("--programm", default="main.py")
+    parser.add_argument("--aussen", type=float, default=5.0, help="Außentemperatur in °C")
+    parser.add_argument("--temperatur", type=float, default=20.0, help="Raumtemperatur beim Start in °C")
+    parser.add_argument("--befehl", action="append", default=[], metavar="ZEIT:STUFE",
+                        help="Steuerbefehl an Steuerung/Stufen zur virtuellen Zeit (in s)")
+    args = parser.parse_args()
+
+    sim = Simulation(temperatur=args.temperatur, aussen=args.aussen)
+    for befehl in args.befehl:
+        zeit, stufe = befehl.split(":")
+        sim.mqtt_senden(float(zeit), "Steuerung/Stufen", {"Strahler": int(stufe)})
+
+    start = time.perf_counter()
+    sim.starten(args.dauer, args.programm)
+    dauer = time.perf_counter() - start
+    sim.beenden()
+
+    print(f"Virtuelle Zeit {sim.uhr.sekunden():.1f} s in {dauer:.2f} s echter Zeit "
+          f"({sim.uhr.sekunden() / dauer:.0f}x schneller)")
+    print(f"Raumtemperatur {sim.raum.t:.1f} °C, Heizstrahler Stufe {sim.heizstrahler.stufe}")
+    print(f"IR-Frames: {len(sim.ir_frames)}")
+    for zeit_ms, adresse, code in sim.ir_frames:
+        print(f"  {zeit_ms / 1000:10.3f} s  Adresse {adresse}  Code 0x{code:02x}")
+    themen = {}
+    for _, topic, _ in sim.broker.nachrichten:
+        themen[topic] = themen.get(topic, 0) + 1
+    print(f"MQTT-Nachrichten: {themen}")
+    print(f"I2C-Transaktionen: {sim.bus.transaktionen}")
+    for display in sim.displays:
+        print(f"Bildschirm: {display.bytes_spi} Bytes über SPI, Aufrufe {display.aufrufe}")
+        for (x, y), text in sorted(display.text_zellen.items(), key=lambda e: (e[0][1], e[0][0])):
+            print(f"  ({x:3d},{y:3d}) {text}")
+
+
+if __name__ == "__main__":
+    main()
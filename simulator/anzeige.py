@@ -0,0 +1,204 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/anzeige
+#Aufgabe: Simulierter Bildschirm ST7789 (st7789py) und Schriftart vga1_8x16
+#		  Zeichnet alle Aufrufe auf und zählt die Bytes, die über SPI gehen würden
+
+#=====Farben wie in st7789py=====#
+BLACK = 0x0000
+BLUE = 0x001F
+RED = 0xF800
+GREEN = 0x07E0
+CYAN = 0x07FF
+MAGENTA = 0xF81F
+YELLOW = 0xFFE0
+WHITE = 0xFFFF
+#================================#
+
+
+def color565(rot, gruen=0, blau=0):
+    return (rot & 0xF8) << 8 | (gruen & 0xFC) << 3 | blau >> 3
+
+
+class Schriftart:
+    """Schnittstelle der Schrift-Module (vga1_8x16) von st7789py. In der ersten
+    Pixelzeile jedes Zeichens steht sein Code, das linke Pixel ist immer gesetzt.
+    So kann die Simulation Text aus dem Bildspeicher zurücklesen, egal ob er mit
+    text() oder als Bild (blit_buffer) geschrieben wurde. Das Leerzeichen ist leer
+    wie in einer echten Schrift, da sich Beschriftungen und Felder überlappen."""
+
+    WIDTH = 8
+    HEIGHT = 16
+    FIRST = 0x20
+    LAST = 0x7F
+    FONT = b"".join(bytes([0x80 | code if code != 0x20 else 0]) + bytes(15) for code in range(FIRST, LAST + 1))
+
+
+# Erste Pixelzeilen des Grad-Zeichens aus statusanzeige.GRAD_8X16
+GRAD_ZEILEN = [0x00, 0x38, 0x6C, 0x6C, 0x38]
+
+
+class SimST7789:
+    """Schnittstelle von st7789py.ST7789 mit Bildspeicher (RGB565, High-Byte zuerst
+    wie über SPI). texte() liest daraus den angezeigten Text zurück. Gezählt
+    werden Aufrufe, Fenster und Bytes über SPI."""
+
+    FENSTER_BYTES = 11 # CASET, RASET und RAMWR mit Parametern
+
+    def __init__(self, spi, width, height, reset=None, dc=None, cs=None, backlight=None,
+                 rotation=0, **kwargs):
+        self.spi = spi
+        self.width, self.height = (height, width) if rotation & 1 else (width, height)
+        self.aufrufe = {}
+        self.bytes_spi = 0
+        self.fenster = 0
+        self.zeilenbytes = self.width * 2
+        self.bild = bytearray(self.width * self.height * 2)
+        # Hardware-Scrolling (bei rotation=1 waagerecht): feste Spalten links, Scrollbereich, feste Spalten rechts
+        self.scrollbereich = (0, self.width, 0)
+        self.scroll_anfang = 0
+
+    def _zaehlen(self, name, pixel):
+        self.aufrufe[name] = self.aufrufe.get(name, 0) + 1
+        self.fenster += 1
+        self.bytes_spi += self.FENSTER_BYTES + 2 * pixel
+
+    def _begrenzen(self, x, y, breite, hoehe):
+        return max(0, x), max(0, y), min(self.width, x + breite), min(self.height, y + hoehe)
+
+    def _rechteck_fuellen(self, x, y, breite, hoehe, farbe):
+        x0, y0, x1, y1 = self._begrenzen(x, y, breite, hoehe)
+        if x1 <= x0:
+            return
+        zeile = bytes((farbe >> 8 & 0xFF, farbe & 0xFF)) * (x1 - x0)
+        for zy in range(y0, y1):
+            pos = zy * self.zeilenbytes + x0 * 2
+            self.bild[pos:pos + len(zeile)] = zeile
+
+    #=====Schnittstelle von st7789py=====#
+    def fill(self, farbe):
+        self._zaehlen("fill", self.width * self.height)
+        self._rechteck_fuellen(0, 0, self.width, self.height, farbe)
+
+    def fill_rect(self, x, y, breite, hoehe, farbe):
+        self._zaehlen("fill_rect", breite * hoehe)
+        self._rechteck_fuellen(x, y, breite, hoehe, farbe)
+
+    def text(self, schrift, text, x, y, vordergrund=WHITE, hintergrund=BLACK):
+        # st7789py schreibt jedes Zeichen in Fenstern von 8x8 Pixeln, Zeichen außerhalb der Schrift werden übersprungen
+        fenster = schrift.HEIGHT // 8 if schrift.WIDTH == 8 else 1
+        bytes_pro_zeile = (schrift.WIDTH + 7) // 8
+        for zeichen in text:
+            code = ord(zeichen)
+            if schrift.FIRST <= code < schrift.LAST:
+                for _ in range(fenster):
+                    self._zaehlen("text", schrift.WIDTH * schrift.HEIGHT // fenster)
+                start = (code - schrift.FIRST) * bytes_pro_zeile * schrift.HEIGHT
+                for zeile in range(schrift.HEIGHT):
+                    for spalte in range(schrift.WIDTH):
+                        bits = schrift.FONT[start + zeile * bytes_pro_zeile + spalte // 8]
+                        farbe = vordergrund if bits & (0x80 >> (spalte % 8)) else hintergrund
+                        self._pixel_setzen(x + spalte, y + zeile, farbe)
+                x += schrift.WIDTH
+
+    def _pixel_setzen(self, x, y, farbe):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            pos = y * self.zeilenbytes + x * 2
+            self.bild[pos] = farbe >> 8 & 0xFF
+            self.bild[pos + 1] = farbe & 0xFF
+
+    def pixel(self, x, y, farbe):
+        self._zaehlen("pixel", 1)
+        self._pixel_setzen(x, y, farbe)
+
+    def hline(self, x, y, laenge, farbe):
+        self._zaehlen("hline", laenge)
+        self._rechteck_fuellen(x, y, laenge, 1, farbe)
+
+    def vline(self, x, y, laenge, farbe):
+        self._zaehlen("vline", laenge)
+        self._rechteck_fuellen(x, y, 1, laenge, farbe)
+
+    def blit_buffer(self, puffer, x, y, breite, hoehe):
+        self._zaehlen("blit_buffer", breite * hoehe)
+        x0, y0, x1, y1 = self._begrenzen(x, y, breite, hoehe)
+        if x1 <= x0:
+            return
+        laenge = (x1 - x0) * 2
+        for zy in range(y0, y1):
+            quelle = ((zy - y) * breite + x0 - x) * 2
+            ziel = zy * self.zeilenbytes + x0 * 2
+            self.bild[ziel:ziel + laenge] = puffer[quelle:quelle + laenge]
+
+    def vscrdef(self, tfa, vsa, bfa):
+        self._befehl("vscrdef", 6)
+        self.scrollbereich = (tfa, vsa, bfa)
+
+    def vscsad(self, vssa):
+        self._befehl("vscsad", 2)
+        self.scroll_anfang = vssa
+
+    def _befehl(self, name, parameter):
+        # Befehl ohne Fenster: Befehlsbyte und Parameter
+        self.aufrufe[name] = self.aufrufe.get(name, 0) + 1
+        self.bytes_spi += 1 + parameter
+
+    def angezeigte_spalte(self, x):
+        """Spalte im Bildspeicher, die mit dem eingestellten Scrolling bei x zu sehen ist"""
+        tfa, vsa, _ = self.scrollbereich
+        if x < tfa or x >= tfa + vsa:
+            return x
+        return tfa + (x - tfa + self.scroll_anfang - tfa) % vsa
+
+    #=====Zurücklesen=====#
+    def _bits(self, x, y):
+        """8 Pixel ab (x, y) als Byte, gesetzt = nicht schwarz"""
+        if y < 0 or y >= self.height:
+            return 0
+        code = 0
+        pos = y * self.zeilenbytes + x * 2
+        for px in range(min(8, self.width - x)):
+            if self.bild[pos] or self.bild[pos + 1]:
+                code |= 0x80 >> px
+            pos += 2
+        return code
+
+    def _zeichen(self, x, y):
+        """Zeichen, dessen erste Pixelzeile bei (x, y) liegt, sonst None"""
+        if self._bits(x, y - 1) != 0:
+            return None
+        zeilen = [self._bits(x, y + z) for z in range(Schriftart.HEIGHT)]
+        if zeilen[0] & 0x80 and 0x20 < zeilen[0] & 0x7F < 0x7F and not any(zeilen[1:]):
+            return chr(zeilen[0] & 0x7F)
+        if zeilen[:len(GRAD_ZEILEN)] == GRAD_ZEILEN and not any(zeilen[len(GRAD_ZEILEN):]):
+            return "°"
+        return None
+
+    def texte(self):
+        """Zusammenhängende Zeichen einer Zeile als Text: {(x, y): Text}
+        Eine leere Zelle zwischen zwei Zeichen gilt als Leerzeichen"""
+        ergebnis = {}
+        leer = bytes(self.zeilenbytes)
+        for y in range(self.height):
+            pos = y * self.zeilenbytes
+            if self.bild[pos:pos + self.zeilenbytes] == leer:
+                continue
+            anfang, ende, x = None, None, 0
+            while x < self.width:
+                zeichen = self._zeichen(x, y)
+                if zeichen is None:
+                    x += 1
+                    continue
+                if x == ende:
+                    ergebnis[anfang] += zeichen
+                elif ende is not None and x == ende + Schriftart.WIDTH:
+                    ergebnis[anfang] += " " + zeichen
+                else:
+                    anfang = (x, y)
+                    ergebnis[anfang] = zeichen
+                x += Schriftart.WIDTH
+                ende = x
+        return ergebnis
+
+    @property
+    def text_zellen(self):
+        return self.texte()
@@ -0,0 +1,313 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/broker
+#Aufgabe: Lokaler Ersatz-Broker (MQTT 3.1.1, QoS 0/1) für Messungen auf dem PC
+#		  MQTT-Client mit der Schnittstelle von umqtt.simple für CPython
+
+#=====Bibliotheken=====#
+import socket
+import struct
+import threading
+import time
+#======================#
+
+
+def _laenge_kodieren(laenge):
+    """Restlänge im MQTT-Format (variable Länge, 7 Bit pro Byte)"""
+    daten = bytearray()
+    while True:
+        byte = laenge & 0x7F
+        laenge >>= 7
+        daten.append(byte | 0x80 if laenge else byte)
+        if not laenge:
+            return bytes(daten)
+
+
+def _str(text):
+    """Zeichenkette mit vorangestellter Länge (2 Byte)"""
+    if isinstance(text, str):
+        text = text.encode()
+    return struct.pack("!H", len(text)) + text
+
+
+def _genau_lesen(sock, anzahl):
+    """Genau anzahl Bytes lesen. Gibt b"" zurück, wenn die Verbindung geschlossen wurde."""
+    daten = b""
+    while len(daten) < anzahl:
+        teil = sock.recv(anzahl - len(daten))
+        if not teil:
+            return b""
+        daten += teil
+    return daten
+
+
+class MQTTBroker:
+    """Minimaler MQTT-Broker in einem Hintergrund-Thread. rtt_ms verzögert das
+    CONNACK um zwei Umlaufzeiten (TCP-Verbindungsaufbau und CONNECT), so wie es
+    ein Client im WLAN erleben würde."""
+
+    def __init__(self, host="127.0.0.1", port=0, rtt_ms=0):
+        self.rtt_ms = rtt_ms
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((host, port))
+        self.server.listen(16)
+        self.host, self.port = self.server.getsockname()
+        self.lock = threading.Lock()
+        self.abonnenten = {}  # Topic -> Liste von Sockets
+        self.nachrichten = []  # (Zeit in s, Topic, Nutzdaten)
+        self.verbindungen = 0
+        self.offen = set()  # Sockets der verbundenen Clients
+        self.pings = 0
+        self.aktiv = True
+        self.empfangen = threading.Condition(self.lock)
+        threading.Thread(target=self._annehmen, daemon=True).start()
+
+    def _annehmen(self):
+        while self.aktiv:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._bedienen, args=(conn,), daemon=True).start()
+
+    def _bedienen(self, conn):
+        senden_lock = threading.Lock()
+        with self.lock:
+            self.offen.add(conn)
+        try:
+            while True:
+                kopf = _genau_lesen(conn, 1)
+                if not kopf:
+                    return
+                laenge, faktor = 0, 1
+                while True:
+                    byte = _genau_lesen(conn, 1)[0]
+                    laenge += (byte & 0x7F) * faktor
+                    faktor <<= 7
+                    if not byte & 0x80:
+                        break
+                inhalt = _genau_lesen(conn, laenge) if laenge else b""
+                typ = kopf[0] >> 4
+                if typ == 1:  # CONNECT
+                    if self.rtt_ms:
+                        time.sleep(2 * self.rtt_ms / 1000)
+                    with self.lock:
+                        self.verbindungen += 1
+                    conn.sendall(b"\x20\x02\x00\x00")
+                elif typ == 3:  # PUBLISH
+                    qos = (kopf[0] >> 1) & 0x03
+                    tlaenge = struct.unpack("!H", inhalt[:2])[0]
+                    topic = inhalt[2:2 + tlaenge].decode()
+                    pos = 2 + tlaenge
+                    if qos:
+                        pid = inhalt[pos:pos + 2]
+                        pos += 2
+                        with senden_lock:
+                            conn.sendall(b"\x40\x02" + pid)
+                    self.veroeffentlichen(topic, inhalt[pos:])
+                elif typ == 8:  # SUBSCRIBE
+                    pid = inhalt[:2]
+                    pos, anzahl = 2, 0
+                    with self.lock:
+                        while pos < len(inhalt):
+                            tlaenge = struct.unpack("!H", inhalt[pos:pos + 2])[0]
+                            topic = inhalt[pos + 2:pos + 2 + tlaenge].decode()
+                            pos += 3 + tlaenge
+                            anzahl += 1
+                            self.abonnenten.setdefault(topic, []).append((conn, senden_lock))
+                    with senden_lock:
+                        conn.sendall(b"\x90" + _laenge_kodieren(2 + anzahl) + pid + b"\x00" * anzahl)
+                elif typ == 12:  # PINGREQ
+                    with self.lock:
+                        self.pings += 1
+                    with senden_lock:
+                        conn.sendall(b"\xd0\x00")
+                elif typ == 14:  # DISCONNECT
+                    return
+        except (OSError, IndexError):
+            return
+        finally:
+            with self.lock:
+                self.offen.discard(conn)
+                for liste in self.abonnenten.values():
+                    liste[:] = [a for a in liste if a[0] is not conn]
+            conn.close()
+
+    def veroeffentlichen(self, topic, nutzdaten):
+        """Nachricht speichern und an alle Abonnenten des Topics weiterleiten"""
+        if isinstance(nutzdaten, str):
+            nutzdaten = nutzdaten.encode()
+        inhalt = _str(topic) + nutzdaten
+        paket = b"\x30" + _laenge_kodieren(len(inhalt)) + inhalt
+        with self.lock:
+            self.nachrichten.append((time.perf_counter(), topic, bytes(nutzdaten)))
+            ziele = list(self.abonnenten.get(topic, ()))
+            self.empfangen.notify_all()
+        for conn, senden_lock in ziele:
+            try:
+                with senden_lock:
+                    conn.sendall(paket)
+            except OSError:
+                pass
+
+    def trennen(self):
+        """Alle Client-Verbindungen schließen, z.B. wie bei einem Neustart des Brokers"""
+        with self.lock:
+            offen = list(self.offen)
+        for conn in offen:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def warten_auf(self, anzahl, timeout=10):
+        """Warten, bis insgesamt anzahl Nachrichten angekommen sind"""
+        with self.lock:
+            return self.empfangen.wait_for(lambda: len(self.nachrichten) >= anzahl, timeout)
+
+    def beenden(self):
+        self.aktiv = False
+        self.server.close()
+
+
+class _Stream:
+    """Socket mit read/write wie unter MicroPython. Im nicht blockierenden
+    Modus gibt read() None zurück, wenn keine Daten anliegen."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.blockierend = True
+
+    def setblocking(self, flag):
+        self.blockierend = flag
+
+    def write(self, daten, laenge=None):
+        if laenge is not None:
+            daten = daten[:laenge]
+        self.sock.sendall(daten)
+        return len(daten)
+
+    def read(self, anzahl):
+        if not self.blockierend:
+            self.sock.setblocking(False)
+            try:
+                erstes = self.sock.recv(anzahl)
+            except BlockingIOError:
+                return None
+            finally:
+                self.sock.setblocking(True)
+            if not erstes or len(erstes) == anzahl:
+                return erstes
+            return erstes + _genau_lesen(self.sock, anzahl - len(erstes))
+        return _genau_lesen(self.sock, anzahl)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+
+class MQTTException(Exception):
+    pass
+
+
+class MQTTClient:
+    """MQTT-Client für CPython mit der gleichen Schnittstelle wie umqtt.simple"""
+
+    def __init__(self, client_id, server, port=0, user=None, password=None, keepalive=0,
+                 ssl=False, ssl_params={}):
+        self.client_id = client_id
+        self.server = server
+        self.port = port or 1883
+        self.user = user
+        self.pswd = password
+        self.keepalive = keepalive
+        self.sock = None
+        self.cb = None
+        self.pid = 0
+
+    def set_callback(self, f):
+        self.cb = f
+
+    def connect(self, clean_session=True):
+        sock = socket.create_connection((self.server, self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = _Stream(sock)
+        flags = 0x02 if clean_session else 0
+        nutzdaten = _str(self.client_id)
+        if self.user is not None:
+            flags |= 0xC0
+            nutzdaten += _str(self.user) + _str(self.pswd)
+        inhalt = b"\x00\x04MQTT\x04" + bytes([flags]) + struct.pack("!H", self.keepalive) + nutzdaten
+        self.sock.write(b"\x10" + _laenge_kodieren(len(inhalt)) + inhalt)
+        antwort = self.sock.read(4)
+        if len(antwort) != 4 or antwort[0] != 0x20 or antwort[1] != 0x02:
+            raise MQTTException("CONNACK")
+        if antwort[3] != 0:
+            raise MQTTException(antwort[3])
+        return antwort[2] & 1
+
+    def disconnect(self):
+        try:
+            self.sock.write(b"\xe0\x00")
+        finally:
+            self.sock.close()
+
+    def ping(self):
+        self.sock.write(b"\xc0\x00")
+
+    def publish(self, topic, msg, retain=False, qos=0):
+        if isinstance(msg, str):
+            msg = msg.encode()
+        inhalt = _str(topic)
+        if qos:
+            self.pid += 1
+            inhalt += struct.pack("!H", self.pid)
+        inhalt += msg
+        self.sock.write(bytes([0x30 | qos << 1 | retain]) + _laenge_kodieren(len(inhalt)) + inhalt)
+        if qos == 1:
+            while True:
+                if self.wait_msg() == 0x40:
+                    return
+
+    def subscribe(self, topic, qos=0):
+        self.pid += 1
+        inhalt = struct.pack("!H", self.pid) + _str(topic) + bytes([qos])
+        self.sock.write(b"\x82" + _laenge_kodieren(len(inhalt)) + inhalt)
+        while True:
+            if self.wait_msg() == 0x90:
+                return
+
+    def wait_msg(self):
+        res = self.sock.read(1)
+        self.sock.setblocking(True)
+        if res is None:
+            return None
+        if res == b"":
+            raise OSError(-1)
+        if res == b"\xd0":  # PINGRESP
+            self.sock.read(1)
+            return None
+        op = res[0]
+        laenge, faktor = 0, 1
+        while True:
+            byte = self.sock.read(1)[0]
+            laenge += (byte & 0x7F) * faktor
+            faktor <<= 7
+            if not byte & 0x80:
+                break
+        inhalt = self.sock.read(laenge) if laenge else b""
+        if op & 0xF0 != 0x30:
+            return op & 0xF0
+        tlaenge = struct.unpack("!H", inhalt[:2])[0]
+        topic = inhalt[2:2 + tlaenge]
+        pos = 2 + tlaenge
+        if op & 0x06:
+            pos += 2
+        self.cb(topic, inhalt[pos:])
+
+    def check_msg(self):
+        self.sock.setblocking(False)
+        return self.wait_msg()
@@ -0,0 +1,370 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/geraete
+#Aufgabe: Simulierte Hardware für das Modul "machine"
+#		  I2C-Bus mit AHT10 und CCS811, die das Registerprotokoll der echten Sensoren sprechen
+#		  ADC mit dem Signal des ACS712, Pins, SPI und IR-Sender (NEC über ir_tx oder RMT)
+
+#=====Bibliotheken=====#
+import math
+#======================#
+
+
+class I2CBus:
+    """Gemeinsamer Bus aller I2C-Objekte der Simulation, zählt die Transaktionen"""
+
+    def __init__(self):
+        self.geraete = {}
+        self.transaktionen = 0
+
+    def geraet(self, adresse):
+        self.transaktionen += 1
+        geraet = self.geraete.get(adresse)
+        if geraet is None:
+            raise OSError(19) # ENODEV, wie unter MicroPython
+        return geraet
+
+
+class SimI2C:
+    """Schnittstelle von machine.I2C / machine.SoftI2C"""
+
+    def __init__(self, bus, *args, **kwargs):
+        self.bus = bus
+
+    def scan(self):
+        return sorted(self.bus.geraete)
+
+    def writeto(self, adresse, daten, stop=True):
+        self.bus.geraet(adresse).schreiben(bytes(daten))
+        return len(daten)
+
+    def readfrom(self, adresse, anzahl, stop=True):
+        return self.bus.geraet(adresse).lesen(anzahl)
+
+    def readfrom_into(self, adresse, puffer, stop=True):
+        puffer[:] = self.bus.geraet(adresse).lesen(len(puffer))
+
+    def writeto_mem(self, adresse, register, daten, addrsize=8):
+        self.bus.geraet(adresse).schreiben(bytes([register]) + bytes(daten))
+
+    def readfrom_mem(self, adresse, register, anzahl, addrsize=8):
+        # Register setzen und lesen mit Repeated Start: eine Transaktion
+        geraet = self.bus.geraet(adresse)
+        geraet.schreiben(bytes([register]))
+        return geraet.lesen(anzahl)
+
+    def readfrom_mem_into(self, adresse, register, puffer, addrsize=8):
+        puffer[:] = self.readfrom_mem(adresse, register, len(puffer))
+
+
+class SimAHT10:
+    """AHT10: 0xE1 initialisiert, 0xAC startet eine Wandlung (ca. 75 ms).
+    Lesen liefert Status (Bit 7 = busy, Bit 3 = kalibriert) und 5 Datenbytes.
+    defekt = True: der Sensor antwortet nicht mehr (OSError wie bei fehlendem ACK)."""
+
+    WANDLUNG_US = 75000
+
+    def __init__(self, uhr, raum):
+        self.uhr = uhr
+        self.raum = raum
+        self.start_us = None
+        self.daten = bytes(6)
+        self.wandlungen = 0
+        self.defekt = False
+
+    def schreiben(self, daten):
+        if self.defekt:
+            raise OSError(19)
+        if daten[:1] == b"\xac":
+            self.start_us = self.uhr.jetzt_us
+            self.wandlungen += 1
+            feuchte = int(self.raum.luftfeuchtigkeit() / 100 * 1048576) & 0xFFFFF
+            temperatur = int((self.raum.temperatur() + 50) / 200 * 1048576) & 0xFFFFF
+            self.daten = bytes([
+                0,
+                feuchte >> 12,
+                (feuchte >> 4) & 0xFF,
+                (feuchte & 0x0F) << 4 | temperatur >> 16,
+                (temperatur >> 8) & 0xFF,
+                temperatur & 0xFF,
+                ])
+
+    def lesen(self, anzahl):
+        if self.defekt:
+            raise OSError(19)
+        busy = self.start_us is not None and self.uhr.jetzt_us - self.start_us < self.WANDLUNG_US
+        status = 0x08 | (0x80 if busy else 0)
+        return (bytes([status]) + self.daten[1:] + bytes(max(0, anzahl - 6)))[:anzahl]
+
+
+class SimCCS811:
+    """CCS811 im Drive Mode 1: nach APP_START (0xF4) jede Sekunde eine Messung.
+    Register: STATUS 0x00, MEAS_MODE 0x01, ALG_RESULT_DATA 0x02, ENV_DATA 0x05,
+    BASELINE 0x11, HW_ID 0x20. Das Lesen von ALG_RESULT_DATA löscht DATA_READY."""
+
+    MESSTAKT_US = 1000000
+
+    def __init__(self, uhr, raum):
+        self.uhr = uhr
+        self.raum = raum
+        self.zeiger = 0
+        self.app_start_us = None
+        self.gelesen = 0 # Nummer der zuletzt gelesenen Messung
+        self.register = {0x01: b"\x00", 0x05: bytes(4), 0x11: b"\x00\x00"}
+        self.eco2 = 0
+        self.tvoc = 0
+
+    def _messung(self):
+        if self.app_start_us is None:
+            return 0
+        return (self.uhr.jetzt_us - self.app_start_us) // self.MESSTAKT_US
+
+    def _status(self):
+        status = 0x10 # APP_VALID
+        if self.app_start_us is not None:
+            status |= 0x80 # FW_MODE
+            if self._messung() > self.gelesen:
+                status |= 0x08 # DATA_READY
+        return status
+
+    def schreiben(self, daten):
+        self.zeiger = daten[0]
+        if self.zeiger == 0xF4:
+            self.app_start_us = self.uhr.jetzt_us
+        elif len(daten) > 1:
+            self.register[self.zeiger] = daten[1:]
+
+    def lesen(self, anzahl):
+        if self.zeiger == 0x20:
+            daten = b"\x81"
+        elif self.zeiger == 0x00:
+            daten = bytes([self._status()])
+        elif self.zeiger == 0x02:
+            status = self._status()
+            if status & 0x08:
+                self.gelesen = self._messung()
+                self.eco2 = self.raum.eco2()
+                self.tvoc = self.raum.etvoc()
+            daten = bytes([self.eco2 >> 8, self.eco2 & 0xFF, self.tvoc >> 8, self.tvoc & 0xFF,
+                           status, 0, 0, 0])
+        else:
+            daten = self.register.get(self.zeiger, b"")
+        return (daten + bytes(anzahl))[:anzahl]
+
+
+class ACS712Signal:
+    """Ausgang des ACS712 am ADC: Nullpunkt plus 50-Hz-Sinus des Heizstroms.
+    Wie bei der echten Schaltung wird über 3,3 V abgeschnitten."""
+
+    def __init__(self, heizstrahler, spannung=230, mv_pro_a=100, offset_mv=2500, frequenz=50,
+                 rauschen_mv=3, zufall=None):
+        self.heizstrahler = heizstrahler
+        self.spannung = spannung
+        self.mv_pro_a = mv_pro_a
+        self.offset_mv = offset_mv
+        self.omega = 2 * math.pi * frequenz
+        self.rauschen_mv = rauschen_mv
+        self.zufall = zufall
+
+    def __call__(self, zeit_us):
+        strom = self.heizstrahler.leistung() / self.spannung
+        mv = self.offset_mv + strom * math.sqrt(2) * self.mv_pro_a * math.sin(self.omega * zeit_us / 1000000)
+        if self.zufall is not None:
+            mv += self.zufall.gauss(0, self.rauschen_mv)
+        return max(0, min(4095, int(mv / 3300 * 4095)))
+
+
+class SimPin:
+    """Schnittstelle von machine.Pin"""
+
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, pins, nummer, modus=-1, pull=-1, value=None, **kwargs):
+        self.nummer = nummer
+        self.wert = value or 0
+        self.handler = None
+        pins[nummer] = self
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def value(self, wert=None):
+        if wert is None:
+            return self.wert
+        self.wert = int(bool(wert))
+
+    def __call__(self, wert=None):
+        return self.value(wert)
+
+    def on(self):
+        self.wert = 1
+
+    def off(self):
+        self.wert = 0
+
+    def irq(self, handler=None, trigger=IRQ_FALLING, hard=False):
+        self.handler = handler
+
+    def ausloesen(self):
+        """Flanke an diesem Pin simulieren"""
+        if self.handler is not None:
+            self.handler(self)
+
+
+class SimADC:
+    """Schnittstelle von machine.ADC. Jede Wandlung kostet kosten_us Rechenzeit."""
+
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_12BIT = 3
+
+    def __init__(self, uhr, signal, kosten_us=20):
+        self.uhr = uhr
+        self.signal = signal
+        self.kosten_us = kosten_us
+        self.wandlungen = 0
+
+    def atten(self, attn):
+        pass
+
+    def width(self, bits):
+        pass
+
+    def read(self):
+        self.uhr.jetzt_us += self.kosten_us
+        self.wandlungen += 1
+        return self.signal(self.uhr.jetzt_us)
+
+    def read_u16(self):
+        return self.read() << 4
+
+    def read_uv(self):
+        return self.read() * 3300000 // 4095
+
+
+class SimSPI:
+    """Schnittstelle von machine.SPI / machine.SoftSPI, zählt die gesendeten Bytes"""
+
+    def __init__(self, *args, **kwargs):
+        self.bytes_gesendet = 0
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def write(self, daten):
+        self.bytes_gesendet += len(daten)
+
+    def read(self, anzahl, write=0):
+        return bytes(anzahl)
+
+    def write_readinto(self, daten, puffer):
+        self.bytes_gesendet += len(daten)
+
+
+class SimPWM:
+    def __init__(self, pin, *args, **kwargs):
+        self.pin = pin
+
+    def freq(self, f=None):
+        return 0
+
+    def duty(self, d=None):
+        return 0
+
+    def deinit(self):
+        pass
+
+
+class SimNEC:
+    """Schnittstelle von ir_tx.nec.NEC. Jeder Frame wird mit Zeitstempel
+    aufgezeichnet und an den simulierten Heizstrahler weitergegeben."""
+
+    def __init__(self, uhr, heizstrahler, frames, pin=None, freq=38000, verbose=False):
+        self.uhr = uhr
+        self.heizstrahler = heizstrahler
+        self.frames = frames
+        self.pin = pin
+
+    def transmit(self, adresse, daten, toggle=0, validate=False):
+        self.frames.append((self.uhr.jetzt_us / 1000, adresse, daten))
+        self.heizstrahler.empfangen(adresse, daten)
+
+
+def nec_dekodieren(dauern, toleranz=0.2):
+    """(Adresse, Code) aus den Pulsdauern (µs, beginnend mit Träger an) eines NEC-Frames.
+    None, wenn Anzahl, Zeiten oder Prüfbyte nicht passen. Bei einer 8-Bit-Adresse steht
+    im zweiten Byte die invertierte Adresse, sonst ist es eine 16-Bit-Adresse."""
+    def passt(dauer, soll):
+        return abs(dauer - soll) <= soll * toleranz
+
+    if len(dauern) != 67 or not (passt(dauern[0], 9000) and passt(dauern[1], 4500)) or not passt(dauern[66], 562.5):
+        return None
+    wert = 0
+    for bit in range(32):
+        an, aus = dauern[2 + 2 * bit], dauern[3 + 2 * bit]
+        if not passt(an, 562.5):
+            return None
+        if passt(aus, 1687.5):
+            wert |= 1 << bit
+        elif not passt(aus, 562.5):
+            return None
+    code = wert >> 16 & 0xFF
+    if code ^ (wert >> 24) != 0xFF:
+        return None
+    adresse = wert & 0xFF if (wert >> 8 & 0xFF) == (wert & 0xFF) ^ 0xFF else wert & 0xFFFF
+    return adresse, code
+
+
+class SimRMT:
+    """Schnittstelle von esp32.RMT zum Senden. Jede Pulsfolge wird als Wellenform
+    aufgezeichnet (Startzeit in µs, Anfangspegel, Dauern in µs), als NEC-Frame
+    dekodiert und am Ende des Frames an den simulierten Heizstrahler gegeben.
+    In frames stehen auch Pulsfolgen, die kein gültiger Frame sind (Code None)."""
+
+    def __init__(self, uhr, heizstrahler, frames, kanal, pin=None, clock_div=8, idle_level=False,
+                 tx_carrier=None):
+        self.uhr = uhr
+        self.heizstrahler = heizstrahler
+        self.frames = frames
+        self.kanal = kanal
+        self.pin = pin
+        self.tick_us = clock_div / 80 # APB-Takt 80 MHz
+        self.tx_carrier = tx_carrier
+        self.wellenformen = []
+        self.ende_us = 0
+
+    def wait_done(self, timeout=0):
+        rest = self.ende_us - self.uhr.jetzt_us
+        if rest > 0 and timeout:
+            self.uhr.vorlaufen(min(rest, timeout * 1000))
+        return self.uhr.jetzt_us >= self.ende_us
+
+    def write_pulses(self, duration, data=True):
+        # Wie auf dem ESP32 wartet write_pulses(), bis die vorherige Pulsfolge gesendet ist
+        if self.uhr.jetzt_us < self.ende_us:
+            self.uhr.vorlaufen(self.ende_us - self.uhr.jetzt_us)
+        start = self.uhr.jetzt_us
+        dauern = tuple(dauer * self.tick_us for dauer in duration)
+        self.wellenformen.append((start, bool(data), dauern))
+        self.ende_us = start + math.ceil(sum(dauern))
+
+        # Ohne 38-kHz-Träger oder mit falschem Pegel erkennt der Empfänger nichts
+        traeger = self.tx_carrier is not None and 36000 <= self.tx_carrier[0] <= 40000
+        frame = nec_dekodieren(dauern) if traeger and data else None
+        adresse, code = frame if frame is not None else (None, None)
+        self.frames.append((start / 1000, adresse, code))
+        if frame is not None:
+            self.uhr.planen(self.ende_us, lambda: self.heizstrahler.empfangen(adresse, code))
+
+    def loop(self, aktiv):
+        pass
+
+    def deinit(self):
+        pass
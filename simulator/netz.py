@@ -0,0 +1,52 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/netz
+#Aufgabe: Simuliertes WLAN (network.WLAN) für die Simulation
+
+STA_IF = 0
+AP_IF = 1
+AUTH_OPEN = 0
+
+
+class WLANZustand:
+    """Gemeinsamer Zustand aller WLAN-Objekte. verfuegbar = False simuliert einen Ausfall."""
+
+    def __init__(self):
+        self.verfuegbar = True
+        self.verbunden = False
+        self.verbindungen = 0
+
+
+class SimWLAN:
+    """Schnittstelle von network.WLAN"""
+
+    def __init__(self, zustand, interface=STA_IF):
+        self.zustand = zustand
+        self.interface = interface
+        self.aktiv = False
+
+    def active(self, aktiv=None):
+        if aktiv is None:
+            return self.aktiv
+        self.aktiv = bool(aktiv)
+
+    def connect(self, ssid=None, passwort=None):
+        if self.zustand.verfuegbar:
+            self.zustand.verbunden = True
+            self.zustand.verbindungen += 1
+
+    def disconnect(self):
+        self.zustand.verbunden = False
+
+    def isconnected(self):
+        if not self.zustand.verfuegbar:
+            self.zustand.verbunden = False
+        return self.interface == STA_IF and self.zustand.verbunden
+
+    def ifconfig(self, *args):
+        return ("192.168.4.2", "255.255.255.0", "192.168.4.1", "192.168.4.1")
+
+    def config(self, *args, **kwargs):
+        return None
+
+    def status(self, *args):
+        return 1010 if self.isconnected() else 1000
@@ -0,0 +1,96 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/raum
+#Aufgabe: Modell von Heizstrahler und Raum für die Simulation
+#		  Der Heizstrahler reagiert auf die IR-Codes wie das echte Gerät
+#		  Die Raumtemperatur folgt einem Modell erster Ordnung
+
+#=====Bibliotheken=====#
+import math
+import random
+#======================#
+
+# IR-Codes des Heizstrahlers und die zugehörige Stufe
+STUFEN_CODES = {0x1a: 0, 0x04: 1, 0x06: 2, 0x0a: 3}
+
+# Stufen, aus denen der Heizstrahler eine Stufe annimmt (None = aus jeder Stufe)
+VORGAENGER = {0: None, 1: None, 2: (1, 3), 3: (2,)}
+
+
+class Heizstrahler:
+    """Heizstrahler mit IR-Empfänger. Ungültige Übergänge werden wie beim
+    echten Gerät ignoriert, z.B. direkt von Aus auf Stufe 3.
+    verlustrate: Anteil der Frames, die nicht ankommen (Reichweite, Störlicht)."""
+
+    def __init__(self, uhr, adresse=80, leistung_pro_stufe=1000, verlustrate=0.0, seed=1):
+        self.uhr = uhr
+        self.adresse = adresse
+        self.leistung_pro_stufe = leistung_pro_stufe
+        self.verlustrate = verlustrate
+        self.zufall = random.Random(seed)
+        self.stufe = 0
+        self.raum = None
+        self.empfangen_frames = [] # (Zeit in ms, Adresse, Code, angenommen)
+        self.verloren = 0
+
+    def empfangen(self, adresse, code):
+        """IR-Frame empfangen. Gibt True zurück, wenn die Stufe gewechselt wurde."""
+        if self.verlustrate and self.zufall.random() < self.verlustrate:
+            self.verloren += 1
+            return False
+        stufe = STUFEN_CODES.get(code)
+        vorgaenger = VORGAENGER.get(stufe, ())
+        angenommen = (adresse == self.adresse and stufe is not None
+                      and (vorgaenger is None or self.stufe in vorgaenger))
+        self.empfangen_frames.append((self.uhr.jetzt_us // 1000, adresse, code, angenommen))
+        if angenommen:
+            # Raum bis jetzt mit der alten Leistung rechnen
+            if self.raum is not None:
+                self.raum.aktualisieren()
+            self.stufe = stufe
+        return angenommen
+
+    def leistung(self):
+        """Leistung in W"""
+        return self.stufe * self.leistung_pro_stufe
+
+
+class Raum:
+    """Raum mit Wärmeverlust nach außen (Zeitkonstante tau) und Heizleistung.
+    dT/dt = (T_aussen - T) / tau + verstaerkung * P"""
+
+    def __init__(self, uhr, heizstrahler, temperatur=20.0, aussen=5.0, tau_s=3600.0,
+                 kelvin_pro_kw=8.0, feuchte=45.0, co2=450, tvoc=10, seed=1):
+        self.uhr = uhr
+        self.heizstrahler = heizstrahler
+        heizstrahler.raum = self
+        self.t = temperatur
+        self.aussen = aussen
+        self.tau_s = tau_s
+        self.kelvin_pro_kw = kelvin_pro_kw # Erwärmung im eingeschwungenen Zustand pro kW
+        self.feuchte = feuchte
+        self.co2 = co2
+        self.tvoc = tvoc
+        self.zufall = random.Random(seed)
+        self.zeitpunkt = uhr.jetzt_us
+
+    def aktualisieren(self):
+        """Temperatur bis zur aktuellen Zeit fortschreiben (exakte Lösung bei konstanter Leistung)"""
+        dauer = (self.uhr.jetzt_us - self.zeitpunkt) / 1000000
+        if dauer <= 0:
+            return
+        ziel = self.aussen + self.kelvin_pro_kw * self.heizstrahler.leistung() / 1000
+        self.t = ziel + (self.t - ziel) * math.exp(-dauer / self.tau_s)
+        self.zeitpunkt = self.uhr.jetzt_us
+
+    def temperatur(self):
+        self.aktualisieren()
+        return self.t + self.zufall.gauss(0, 0.05)
+
+    def luftfeuchtigkeit(self):
+        return self.feuchte + self.zufall.gauss(0, 0.2)
+
+    def eco2(self):
+        return max(400, int(self.co2 + self.zufall.gauss(0, 3)))
+
+    def etvoc(self):
+        return max(0, int(self.tvoc + self.zufall.gauss(0, 1)))
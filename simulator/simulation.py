@@ -0,0 +1,282 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/simulation
+#Aufgabe: Zusammenstellen der simulierten Hardware und Ausführen des unveränderten Hauptprogramms
+#		  Die Module machine, esp32, network, umqtt.simple, ir_tx.nec, st7789py, vga1_8x16, Start und ntptime
+#		  werden durch die Simulation ersetzt, time läuft in virtueller Zeit
+
+#=====Bibliotheken=====#
+import asyncio
+import contextlib
+import errno
+import importlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import types
+
+from simulator import anzeige, netz
+from simulator.broker import MQTTBroker, MQTTClient
+from simulator.geraete import (I2CBus, SimI2C, SimAHT10, SimCCS811, ACS712Signal, SimPin,
+                               SimADC, SimSPI, SimPWM, SimNEC, SimRMT)
+from simulator.raum import Heizstrahler, Raum
+from simulator.uhr import VirtuelleUhr, VirtuellePolicy, SimulationBeendet, zeit_modul
+#======================#
+
+PROJEKT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module, die in der Simulation ersetzt werden
+ERSETZTE_MODULE = ("time", "machine", "esp32", "network", "umqtt", "umqtt.simple", "ir_tx", "ir_tx.nec",
+                   "st7789py", "vga1_8x16", "Start", "ntptime")
+
+
+class Simulation:
+    """Virtuelle Umgebung für das Hauptprogramm. Alle Geräte und Messwerte
+    sind nach dem Lauf über die Attribute abrufbar, z.B. ir_frames oder
+    broker.nachrichten. Das Programm läuft in einem eigenen Verzeichnis (Flash),
+    das zwischen mehreren Läufen erhalten bleibt und mit beenden() gelöscht wird."""
+
+    def __init__(self, seed=1, temperatur=20.0, aussen=5.0):
+        self.uhr = VirtuelleUhr()
+        self.zufall = random.Random(seed)
+        self.heizstrahler = Heizstrahler(self.uhr)
+        self.raum = Raum(self.uhr, self.heizstrahler, temperatur=temperatur, aussen=aussen, seed=seed)
+        self.bus = I2CBus()
+        self.aht10 = SimAHT10(self.uhr, self.raum)
+        self.ccs811 = SimCCS811(self.uhr, self.raum)
+        self.bus.geraete[0x38] = self.aht10
+        self.bus.geraete[0x5A] = self.ccs811
+        self.adc_signale = {4: ACS712Signal(self.heizstrahler, zufall=self.zufall)}
+        self.wlan = netz.WLANZustand()
+        self.broker = MQTTBroker()
+        self.broker_erreichbar = True # False: connect() und publish() der Clients schlagen fehl
+        self.pins = {}
+        self.adcs = []
+        self.spis = []
+        self.displays = []
+        self.mqtt_clients = []
+        self.ir_frames = [] # (Zeit in ms mit Nachkommastellen, Adresse, Code)
+        self.rmts = [] # RMT-Kanäle mit den aufgezeichneten Wellenformen
+        self.mqtt_gesendet = [] # vom Programm veröffentlicht: (Zeit in µs, Topic, Bytes)
+        self.beobachter = None # wird um jeden Durchlauf des Eventloops aufgerufen, siehe VirtuellerSelektor
+        self.wlan_ssid = "Simulation"
+        self.wlan_passwort = "12345678"
+        self.broker_ip = self.broker.host
+        self.flash = tempfile.mkdtemp(prefix="simulation_")
+
+    #=====Ablauf=====#
+    def planen(self, zeit_s, funktion):
+        """Funktion zur virtuellen Zeit zeit_s (in s) ausführen"""
+        self.uhr.planen(int(zeit_s * 1000000), funktion)
+
+    def mqtt_senden(self, zeit_s, topic, daten):
+        """Zur virtuellen Zeit zeit_s eine Nachricht über den Broker senden, z.B. einen Steuerbefehl"""
+        nutzdaten = daten if isinstance(daten, (bytes, str)) else json.dumps(daten)
+        self.planen(zeit_s, lambda: self.broker.veroeffentlichen(topic, nutzdaten))
+
+    def zeit_ms(self):
+        return self.uhr.jetzt_us // 1000
+
+    #=====Ersatzmodule=====#
+    def module(self):
+        """Ersatzmodule für das simulierte Programm"""
+        sim = self
+        module = {}
+
+        def modul(name, **inhalt):
+            m = types.ModuleType(name)
+            m.__dict__.update(inhalt)
+            module[name] = m
+            return m
+
+        module["time"] = zeit_modul(self.uhr)
+
+        # machine
+        class Pin(SimPin):
+            def __init__(self, nummer, *args, **kwargs):
+                super().__init__(sim.pins, nummer, *args, **kwargs)
+
+        class SoftI2C(SimI2C):
+            def __init__(self, *args, **kwargs):
+                super().__init__(sim.bus)
+
+        class ADC(SimADC):
+            def __init__(self, pin, *args, **kwargs):
+                nummer = pin.nummer if isinstance(pin, SimPin) else pin
+                super().__init__(sim.uhr, sim.adc_signale.get(nummer, lambda zeit_us: 0))
+                sim.adcs.append(self)
+
+        class SoftSPI(SimSPI):
+            def __init__(self, *args, **kwargs):
+                super().__init__()
+                sim.spis.append(self)
+
+        modul("machine", Pin=Pin, SoftI2C=SoftI2C, I2C=SoftI2C, ADC=ADC, SoftSPI=SoftSPI, SPI=SoftSPI,
+              PWM=SimPWM, lightsleep=self.uhr.sleep_ms, idle=lambda: None,
+              freq=lambda *args: 240000000)
+
+        # esp32: RMT zeichnet die Wellenformen auf
+        class RMT(SimRMT):
+            def __init__(self, kanal, **kwargs):
+                super().__init__(sim.uhr, sim.heizstrahler, sim.ir_frames, kanal, **kwargs)
+                sim.rmts.append(self)
+
+        modul("esp32", RMT=RMT)
+
+        # network
+        modul("network", WLAN=lambda interface=netz.STA_IF: netz.SimWLAN(sim.wlan, interface),
+              STA_IF=netz.STA_IF, AP_IF=netz.AP_IF, AUTH_OPEN=netz.AUTH_OPEN)
+
+        # umqtt.simple, die Clients verbinden sich immer mit dem Ersatz-Broker
+        class SimMQTTClient(MQTTClient):
+            def __init__(self, client_id, server, port=0, *args, **kwargs):
+                super().__init__(client_id, sim.broker.host, sim.broker.port, *args, **kwargs)
+                sim.mqtt_clients.append(self)
+
+            def connect(self, *args, **kwargs):
+                if not sim.broker_erreichbar:
+                    raise OSError(errno.EHOSTUNREACH)
+                return super().connect(*args, **kwargs)
+
+            def publish(self, topic, msg, retain=False, qos=0):
+                if not sim.broker_erreichbar:
+                    raise OSError(errno.ECONNRESET)
+                super().publish(topic, msg, retain, qos)
+                sim.mqtt_gesendet.append((sim.uhr.jetzt_us, topic, len(msg.encode() if isinstance(msg, str) else msg)))
+
+        simple = modul("umqtt.simple", MQTTClient=SimMQTTClient)
+        modul("umqtt", simple=simple, __path__=[])
+
+        # ir_tx.nec
+        nec = modul("ir_tx.nec", NEC=lambda pin, *args, **kwargs: SimNEC(
+            sim.uhr, sim.heizstrahler, sim.ir_frames, pin, *args, **kwargs))
+        modul("ir_tx", nec=nec, __path__=[])
+
+        # st7789py und Schrift
+        class ST7789(anzeige.SimST7789):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                sim.displays.append(self)
+
+        modul("st7789py", ST7789=ST7789, color565=anzeige.color565,
+              **{name: getattr(anzeige, name) for name in
+                 ("BLACK", "BLUE", "RED", "GREEN", "CYAN", "MAGENTA", "YELLOW", "WHITE")})
+        schrift = anzeige.Schriftart
+        modul("vga1_8x16", WIDTH=schrift.WIDTH, HEIGHT=schrift.HEIGHT, FIRST=schrift.FIRST,
+              LAST=schrift.LAST, FONT=schrift.FONT)
+
+        # ntptime: die virtuelle Uhr läuft bereits
+        modul("ntptime", settime=lambda: None)
+
+        # Start: Netzwerkeinstellungen, die sonst über den Access Point eingegeben werden
+        modul("Start", wlan_ssid=self.wlan_ssid, wlan_passwort=self.wlan_passwort,
+              broker_ip=self.broker_ip)
+        return module
+
+    @contextlib.contextmanager
+    def aktiv(self):
+        """Ersatzmodule, virtuelle Zeit und Flash-Verzeichnis einrichten. Projektmodule,
+        die innerhalb des with-Blocks importiert werden, nutzen die simulierte Hardware.
+        Das Erreichen der Simulationsdauer beendet den Block ohne Fehler."""
+        gesichert = {name: sys.modules.get(name) for name in ERSETZTE_MODULE}
+        verzeichnis = os.getcwd()
+        policy = asyncio.get_event_loop_policy()
+        self._projektmodule_entfernen()
+        sys.modules.update(self.module())
+        if PROJEKT not in sys.path:
+            sys.path.insert(0, PROJEKT)
+        asyncio.set_event_loop_policy(VirtuellePolicy(self.uhr, self.beobachter))
+        os.chdir(self.flash)
+        try:
+            yield self
+        except SimulationBeendet:
+            pass
+        finally:
+            os.chdir(verzeichnis)
+            asyncio.set_event_loop_policy(policy)
+            for name, alt in gesichert.items():
+                if alt is None:
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = alt
+            # Die Projektmodule hängen an der virtuellen Uhr und werden beim nächsten Import neu geladen
+            self._projektmodule_entfernen()
+
+    def starten(self, dauer_s, programm="main.py"):
+        """Programm unverändert ausführen, bis dauer_s virtuelle Sekunden vergangen sind.
+        Gibt die globalen Variablen des Programms zurück."""
+        pfad = os.path.join(PROJEKT, programm)
+        with open(pfad, encoding="utf-8") as f:
+            code = compile(f.read(), pfad, "exec")
+
+        self.uhr.ende_us = self.uhr.jetzt_us + int(dauer_s * 1000000)
+        namensraum = {"__name__": "__main__", "__file__": pfad}
+        with self.aktiv():
+            exec(code, namensraum)
+        return namensraum
+
+    def steuerung(self, nummer=0, mqtt_gemeinsam=True, ir_rmt=False, **einstellungen):
+        """Steuerung mit eigener simulierter Hardware erstellen, verdrahtet wie in main.py.
+        Nur innerhalb von "with sim.aktiv()" aufrufen. Mehrere Steuerungen teilen sich
+        Raum, Heizstrahler, I2C-Bus und Broker, jede hat eigene Clients, Bildschirm und Zählerdatei.
+        mqtt_gemeinsam=False: zusätzlicher Subscribe-Client wie bisher.
+        ir_rmt=True: IR-Frames über ir_sender.IRSender (RMT) statt ir_tx.nec."""
+        machine = sys.modules["machine"]
+        Pin = machine.Pin
+        i2c = machine.SoftI2C(scl=Pin(1), sda=Pin(2))
+        strom_sensor = machine.ADC(Pin(4))
+        spi = machine.SoftSPI(baudrate=2000000, polarity=1, phase=0, sck=Pin(42), mosi=Pin(41), miso=Pin(0))
+
+        mqtt_sitzung = importlib.import_module("mqtt_sitzung")
+        strommessung = importlib.import_module("strommessung")
+        energiezaehler = importlib.import_module("energiezaehler")
+        client = sys.modules["umqtt.simple"].MQTTClient
+        ccs811 = importlib.import_module("CCS811").CCS811(i2c=i2c, addr=90)
+        txt = sys.modules["st7789py"].ST7789(spi, 240, 320, rotation=1)
+        steuerung = importlib.import_module("steuerung")
+        if ir_rmt:
+            ir_tx = importlib.import_module("ir_sender").IRSender(
+                Pin(5, Pin.OUT), einstellungen.get("ir_keys", steuerung.IR_KEYS).values(),
+                einstellungen.get("ir_adresse", 80))
+        else:
+            ir_tx = sys.modules["ir_tx.nec"].NEC(Pin(5, Pin.OUT))
+        if isinstance(einstellungen.get("warteschlange"), bool):
+            # warteschlange=True: Warteschlange mit eigener Datei im Flash
+            warteschlange = importlib.import_module("warteschlange")
+            einstellungen["warteschlange"] = warteschlange.Warteschlange(f"warteschlange_{nummer}.bin") \
+                if einstellungen["warteschlange"] else None
+        if isinstance(einstellungen.get("zeitreihe"), bool):
+            # zeitreihe=True: Zeitreihe mit eigenen Segment-Dateien im Flash
+            zeitreihe = importlib.import_module("zeitreihe")
+            einstellungen["zeitreihe"] = zeitreihe.Zeitreihe(f"zeitreihe_{nummer}") \
+                if einstellungen["zeitreihe"] else None
+        if isinstance(einstellungen.get("bildpuffer"), bool):
+            # bildpuffer=True: Bildpuffer über den ganzen Bildschirm wie in main.py
+            bildpuffer = importlib.import_module("bildpuffer")
+            einstellungen["bildpuffer"] = bildpuffer.Bildpuffer(txt, txt.width, txt.height) if einstellungen["bildpuffer"] else None
+        return steuerung.Steuerung(
+            importlib.import_module("aht10").AHT10(i2c),
+            ccs811,
+            strommessung.EffektivwertMessung(strom_sensor),
+            energiezaehler.Energiezaehler(f"energie_{nummer}.bin"),
+            ir_tx,
+            txt,
+            sys.modules["vga1_8x16"],
+            sys.modules["network"].WLAN(netz.STA_IF),
+            mqtt_sitzung.MQTTSitzung(client(f"pb_{nummer}", self.broker_ip, keepalive=60), 60),
+            None if mqtt_gemeinsam else client(f"sb_{nummer}", self.broker_ip),
+            self.wlan_ssid, self.wlan_passwort,
+            **einstellungen)
+
+    @staticmethod
+    def _projektmodule_entfernen():
+        for name, modul in list(sys.modules.items()):
+            datei = getattr(modul, "__file__", None) or ""
+            if os.path.dirname(os.path.abspath(datei)) == PROJEKT:
+                del sys.modules[name]
+
+    def beenden(self):
+        self.broker.beenden()
+        shutil.rmtree(self.flash, ignore_errors=True)
@@ -0,0 +1,177 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: simulator/uhr
+#Aufgabe: Virtuelle Uhr für die Simulation
+#		  Ersatz für das time-Modul von MicroPython (ticks_ms, sleep, ...)
+#		  asyncio-Eventloop, der in virtueller Zeit läuft
+
+#=====Bibliotheken=====#
+import asyncio
+import math
+import selectors
+import time as _time
+import types
+#======================#
+
+# Die ticks-Werte laufen wie auf dem ESP32 nach 2**30 über
+TICKS_PERIODE = 1 << 30
+TICKS_HAELFTE = TICKS_PERIODE // 2
+
+
+class SimulationBeendet(SystemExit):
+    """Wird ausgelöst, wenn die eingestellte Simulationsdauer erreicht ist.
+    Abgeleitet von SystemExit, damit weder "except Exception" im Programm noch
+    ein asyncio-Task die Meldung abfängt."""
+
+
+class VirtuelleUhr:
+    """Zeit der Simulation in Mikrosekunden. Die Zeit läuft nur weiter, wenn
+    das Programm wartet (sleep, Eventloop) oder Rechenzeit verbraucht.
+    Jeder Aufruf von ticks_us/ticks_ms kostet "kosten_us", damit Warteschleifen
+    wie "while ticks_diff(ticks_us(), ziel) < 0: pass" ein Ende finden."""
+
+    def __init__(self, start_us=0, kosten_us=1):
+        self.jetzt_us = start_us
+        self.kosten_us = kosten_us
+        self.ende_us = None
+        self.beendet = False
+        self.ereignisse = [] # (Zeit in µs, Funktion), nach Zeit sortiert
+
+    def sekunden(self):
+        return self.jetzt_us / 1000000
+
+    def planen(self, zeit_us, funktion):
+        """Funktion zum Zeitpunkt zeit_us (virtuell) ausführen"""
+        self.ereignisse.append((zeit_us, funktion))
+        self.ereignisse.sort(key=lambda e: e[0])
+
+    def vorlaufen(self, dauer_us):
+        """Zeit weiterlaufen lassen. Fällige Ereignisse werden unterwegs ausgeführt.
+        Beim Erreichen der Simulationsdauer wird SimulationBeendet ausgelöst."""
+        ziel = self.jetzt_us + max(0, math.ceil(dauer_us))
+        while self.ereignisse and self.ereignisse[0][0] <= ziel:
+            zeit, funktion = self.ereignisse.pop(0)
+            self.jetzt_us = max(self.jetzt_us, zeit)
+            funktion()
+        self.jetzt_us = ziel
+        self.pruefen_ende()
+
+    def pruefen_ende(self):
+        if self.ende_us is not None and self.jetzt_us >= self.ende_us and not self.beendet:
+            self.beendet = True
+            raise SimulationBeendet()
+
+    #=====Schnittstelle von time unter MicroPython=====#
+    def ticks_us(self):
+        self.jetzt_us += self.kosten_us
+        return self.jetzt_us % TICKS_PERIODE
+
+    def ticks_ms(self):
+        self.jetzt_us += self.kosten_us
+        return (self.jetzt_us // 1000) % TICKS_PERIODE
+
+    def ticks_cpu(self):
+        return self.ticks_us()
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return (ticks + delta) % TICKS_PERIODE
+
+    @staticmethod
+    def ticks_diff(neu, alt):
+        return ((neu - alt + TICKS_HAELFTE) % TICKS_PERIODE) - TICKS_HAELFTE
+
+    def sleep(self, sekunden):
+        self.vorlaufen(sekunden * 1000000)
+
+    def sleep_ms(self, ms):
+        self.vorlaufen(ms * 1000)
+
+    def sleep_us(self, us):
+        self.vorlaufen(us)
+
+    def time(self):
+        return self.jetzt_us // 1000000
+
+    def time_ns(self):
+        return self.jetzt_us * 1000
+
+
+def zeit_modul(uhr):
+    """Modul "time" für das simulierte Programm. Alles, was MicroPython anders
+    macht, kommt von der virtuellen Uhr, der Rest vom echten time-Modul."""
+    modul = types.ModuleType("time")
+    for name in ("ticks_us", "ticks_ms", "ticks_cpu", "ticks_add", "ticks_diff",
+                 "sleep", "sleep_ms", "sleep_us", "time", "time_ns"):
+        setattr(modul, name, getattr(uhr, name))
+    modul.__getattr__ = lambda name: getattr(_time, name)
+    return modul
+
+
+class VirtuellerSelektor(selectors.DefaultSelector):
+    """Selektor für den Eventloop. Liegen keine Socket-Ereignisse an, wird nicht
+    gewartet, sondern die virtuelle Uhr bis zum nächsten Timer vorgestellt.
+    Ein Beobachter (Methoden start und ende) wird um jeden Durchlauf des
+    Eventloops aufgerufen: start nach dem Warten, ende nach den fälligen Tasks."""
+
+    def __init__(self, uhr, beobachter=None):
+        super().__init__()
+        self.uhr = uhr
+        self.beobachter = beobachter
+
+    def select(self, timeout=None):
+        ereignisse = self._warten(timeout)
+        if self.beobachter is not None:
+            self.beobachter.start()
+        return ereignisse
+
+    def _warten(self, timeout):
+        ereignisse = super().select(0)
+        if ereignisse or timeout == 0 or self.uhr.beendet:
+            return ereignisse
+        if timeout is None:
+            # Kein Timer aktiv: bis zum nächsten geplanten Ereignis oder zum Ende springen
+            if self.uhr.ereignisse:
+                timeout = (self.uhr.ereignisse[0][0] - self.uhr.jetzt_us) / 1000000
+            elif self.uhr.ende_us is not None:
+                timeout = (self.uhr.ende_us - self.uhr.jetzt_us) / 1000000
+            else:
+                return super().select(None)
+        # Von Ereignis zu Ereignis vorlaufen: erzeugt ein Ereignis Socket-Daten (z.B. eine MQTT-Nachricht),
+        # wacht der Eventloop zu dessen Zeit auf und nicht erst am Ende der Wartezeit
+        ende_us = self.uhr.jetzt_us + max(0, math.ceil(timeout * 1000000))
+        while self.uhr.ereignisse and self.uhr.ereignisse[0][0] < ende_us:
+            self.uhr.vorlaufen(self.uhr.ereignisse[0][0] - self.uhr.jetzt_us)
+            ereignisse = super().select(0)
+            if ereignisse:
+                return ereignisse
+        self.uhr.vorlaufen(ende_us - self.uhr.jetzt_us)
+        return super().select(0)
+
+
+class VirtuelleEventLoop(asyncio.SelectorEventLoop):
+    """asyncio-Eventloop, dessen Zeit die virtuelle Uhr ist"""
+
+    def __init__(self, uhr, beobachter=None):
+        super().__init__(VirtuellerSelektor(uhr, beobachter))
+        self.uhr = uhr
+        self.beobachter = beobachter
+
+    def time(self):
+        return self.uhr.jetzt_us / 1000000
+
+    def _run_once(self):
+        super()._run_once()
+        if self.beobachter is not None:
+            self.beobachter.ende()
+
+
+class VirtuellePolicy(asyncio.DefaultEventLoopPolicy):
+    """Sorgt dafür, dass asyncio.run() im simulierten Programm die virtuelle Zeit nutzt"""
+
+    def __init__(self, uhr, beobachter=None):
+        super().__init__()
+        self.uhr = uhr
+        self.beobachter = beobachter
+
+    def new_event_loop(self):
+        return VirtuelleEventLoop(self.uhr, self.beobachter)
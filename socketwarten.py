@@ -0,0 +1,34 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: socketwarten
+#Aufgabe: In asyncio warten, bis auf einem Socket Daten anliegen oder eine Zeit abgelaufen ist
+#		  Der Eventloop wartet dabei in poll() und belegt die CPU nicht
+#		  Unter MicroPython über die IO-Warteschlange von asyncio, unter CPython (Simulation) über add_reader
+
+#=====Bibliotheken=====#
+import asyncio
+#======================#
+
+if hasattr(asyncio, "core"):
+    # MicroPython: der Task wartet in der IO-Warteschlange, wie in asyncio.Stream.read()
+    def _lesbar(sock):
+        yield asyncio.core._io_queue.queue_read(sock)
+
+else:
+    async def _lesbar(sock):
+        loop = asyncio.get_running_loop()
+        fertig = loop.create_future()
+        loop.add_reader(sock, lambda: fertig.done() or fertig.set_result(None))
+        try:
+            await fertig
+        finally:
+            loop.remove_reader(sock)
+
+
+async def lesbar(sock, timeout_ms):
+    """Wartet höchstens timeout_ms. Gibt True zurück, sobald sock lesbar ist
+    (auch bei einem Verbindungsabbruch), sonst False."""
+    try:
+        await asyncio.wait_for(_lesbar(sock), timeout_ms / 1000)
+        return True
+    except asyncio.TimeoutError:
+        return False
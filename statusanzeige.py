@@ -0,0 +1,208 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: statusanzeige
+#Aufgabe: Anzeige der Messwerte auf dem ST7789 mit möglichst wenig Daten über SPI
+#		  Jedes Feld merkt sich, was auf dem Bildschirm steht. Bei einer Änderung werden nur
+#		  die geänderten Zeichen neu geschrieben, aus vorgerasterten Zeichen in einem Fenster
+#		  Zahlen werden ohne f-String direkt in den Zeichenpuffer des Feldes geschrieben
+
+# Farben wie in st7789py
+SCHWARZ = 0x0000
+CYAN = 0x07FF
+
+# Das Grad-Zeichen fehlt in den Schriften von st7789py (nur ASCII), es wird hier mitgeliefert
+GRAD = 0xB0
+GRAD_8X16 = b"\x00\x38\x6c\x6c\x38\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+
+# Diese Zeichen werden beim Start gerastert, alle anderen beim ersten Gebrauch
+VORRAT = "0123456789.- "
+
+
+class Glyphen:
+    """Zwischenspeicher der gerasterten Zeichen einer Schrift.
+    Jedes Zeichen liegt als RGB565-Bild (High-Byte zuerst, wie es st7789py sendet) vor."""
+
+    def __init__(self, font, vordergrund=CYAN, hintergrund=SCHWARZ, vorrat=VORRAT):
+        self.font = font
+        self.breite = font.WIDTH
+        self.hoehe = font.HEIGHT
+        self.zeilenbytes = 2 * font.WIDTH # Bytes einer Pixelzeile eines Zeichens
+        self.farben = (bytes((hintergrund >> 8, hintergrund & 0xFF)), bytes((vordergrund >> 8, vordergrund & 0xFF)))
+        self.cache = {}
+        for zeichen in vorrat:
+            self.glyph(ord(zeichen))
+
+    def glyph(self, code):
+        """Gerastertes Zeichen (breite * hoehe * 2 Bytes)"""
+        bild = self.cache.get(code)
+        if bild is None:
+            bild = self._rastern(code)
+            self.cache[code] = bild
+        return bild
+
+    def _rastern(self, code):
+        font = self.font
+        bytes_pro_zeile = (self.breite + 7) // 8
+        if font.FIRST <= code < font.LAST:
+            bitmap = font.FONT
+            start = (code - font.FIRST) * bytes_pro_zeile * self.hoehe
+        elif code == GRAD and self.breite == 8 and self.hoehe == 16:
+            bitmap = GRAD_8X16
+            start = 0
+        else:
+            # Zeichen, die die Schrift nicht enthält, bleiben leer
+            return memoryview(self.farben[0] * (self.breite * self.hoehe))
+
+        bild = bytearray(self.hoehe * self.zeilenbytes)
+        aus, ein = self.farben
+        pos = 0
+        for zeile in range(self.hoehe):
+            for spalte in range(self.breite):
+                bits = bitmap[start + zeile * bytes_pro_zeile + spalte // 8]
+                farbe = ein if bits & (0x80 >> (spalte % 8)) else aus
+                bild[pos] = farbe[0]
+                bild[pos + 1] = farbe[1]
+                pos += 2
+        # Ausschnitte einer memoryview werden beim Kopieren nicht dupliziert
+        return memoryview(bild)
+
+
+class Statusanzeige:
+    """Felder mit fester Position und Breite (in Zeichen) auf dem Bildschirm.
+
+    setzen(feld, wert) schreibt Wert und Einheit in den Zeichenpuffer des Feldes
+    und vergleicht mit dem, was angezeigt wird. Nur die Spanne vom ersten bis
+    zum letzten geänderten Zeichen wird mit einem einzigen blit_buffer()
+    gesendet. bytes_spi zählt alle gesendeten Bytes, letzte_bytes die der
+    letzten Änderung (jeweils Pixel plus Fensterbefehle)."""
+
+    FENSTER_BYTES = 11 # CASET, RASET und RAMWR mit Parametern
+
+    def __init__(self, txt, font, vordergrund=CYAN, hintergrund=SCHWARZ, max_zeichen=12):
+        self.txt = txt
+        self.glyphen = Glyphen(font, vordergrund, hintergrund)
+        self.max_zeichen = max_zeichen
+        self.felder = [] # [x, y, zeichen, einheit, nachkommastellen, angezeigt, neu]
+        # Ein Puffer für alle Felder, groß genug für das breiteste Feld
+        self.puffer = bytearray(max_zeichen * self.glyphen.zeilenbytes * self.glyphen.hoehe)
+        self.ziffern = bytearray(12)
+        self.bytes_spi = 0
+        self.fenster = 0
+        self.letzte_bytes = 0
+
+    def feld(self, x, y, einheit="", zeichen=None, nachkommastellen=0):
+        """Feld anlegen. Gibt die Nummer des Feldes für setzen() zurück.
+        Im Text der Einheit steht "°" für das Grad-Zeichen."""
+        zeichen = zeichen or self.max_zeichen
+        if zeichen > self.max_zeichen:
+            raise ValueError("Feld breiter als max_zeichen")
+        einheit = bytes(GRAD if z == "°" else ord(z) for z in einheit)
+        # 0xFF kommt in keiner Anzeige vor, dadurch wird das erste setzen() vollständig gezeichnet
+        self.felder.append([x, y, zeichen, einheit, nachkommastellen,
+                            bytearray(b"\xff" * zeichen), bytearray(zeichen)])
+        return len(self.felder) - 1
+
+    def neu_zeichnen(self):
+        """Beim nächsten setzen() alle Felder vollständig zeichnen, z.B. nach txt.fill()"""
+        for feld in self.felder:
+            angezeigt = feld[5]
+            for i in range(len(angezeigt)):
+                angezeigt[i] = 0xFF
+
+    def setzen(self, nummer, wert):
+        """Wert anzeigen. Gibt die über SPI gesendeten Bytes zurück (0, wenn sich nichts geändert hat)"""
+        x, y, zeichen, einheit, nachkommastellen, angezeigt, neu = self.felder[nummer]
+
+        # Text des Feldes: Wert, Leerzeichen, Einheit, mit Leerzeichen aufgefüllt
+        pos = self._wert_schreiben(neu, wert, nachkommastellen)
+        if einheit and pos < zeichen:
+            neu[pos] = 0x20
+            pos += 1
+            for code in einheit:
+                if pos >= zeichen:
+                    break
+                neu[pos] = code
+                pos += 1
+        while pos < zeichen:
+            neu[pos] = 0x20
+            pos += 1
+
+        # Geänderte Spanne suchen
+        erstes = 0
+        while erstes < zeichen and neu[erstes] == angezeigt[erstes]:
+            erstes += 1
+        if erstes == zeichen:
+            self.letzte_bytes = 0
+            return 0
+        letztes = zeichen - 1
+        while neu[letztes] == angezeigt[letztes]:
+            letztes -= 1
+
+        # Zeichen der Spanne zeilenweise in den Puffer kopieren und in einem Fenster senden
+        anzahl = letztes - erstes + 1
+        glyphen = self.glyphen
+        zb = glyphen.zeilenbytes
+        stride = anzahl * zb
+        puffer = self.puffer
+        for i in range(anzahl):
+            code = neu[erstes + i]
+            angezeigt[erstes + i] = code
+            bild = glyphen.glyph(code)
+            ziel = i * zb
+            quelle = 0
+            for _ in range(glyphen.hoehe):
+                puffer[ziel:ziel + zb] = bild[quelle:quelle + zb]
+                ziel += stride
+                quelle += zb
+
+        groesse = stride * glyphen.hoehe
+        self.txt.blit_buffer(memoryview(puffer)[:groesse], x + erstes * glyphen.breite, y,
+                             anzahl * glyphen.breite, glyphen.hoehe)
+        self.fenster += 1
+        self.letzte_bytes = self.FENSTER_BYTES + groesse
+        self.bytes_spi += self.letzte_bytes
+        return self.letzte_bytes
+
+    def _wert_schreiben(self, neu, wert, nachkommastellen):
+        """Wert als ASCII an den Anfang von neu schreiben, gibt die Anzahl der Zeichen zurück"""
+        zeichen = len(neu)
+        if isinstance(wert, str):
+            pos = 0
+            for z in wert:
+                if pos >= zeichen:
+                    break
+                neu[pos] = GRAD if z == "°" else ord(z) & 0xFF
+                pos += 1
+            return pos
+
+        # Zahl: Ziffern von hinten in den Zwischenspeicher, dann vorwärts kopieren
+        if isinstance(wert, float):
+            zahl = int(round(wert * 10 ** nachkommastellen))
+            stellen = nachkommastellen
+        else:
+            zahl = int(wert)
+            stellen = 0
+        negativ = zahl < 0
+        if negativ:
+            zahl = -zahl
+        ziffern = self.ziffern
+        n = 0
+        while n < len(ziffern) - 2:
+            if stellen and n == stellen:
+                ziffern[n] = 0x2E # Dezimalpunkt
+                n += 1
+            ziffern[n] = 0x30 + zahl % 10
+            zahl //= 10
+            n += 1
+            # Vor dem Dezimalpunkt steht immer mindestens eine Ziffer
+            if zahl == 0 and n > stellen:
+                break
+        if negativ:
+            ziffern[n] = 0x2D
+            n += 1
+
+        pos = 0
+        while n > 0 and pos < zeichen:
+            n -= 1
+            neu[pos] = ziffern[n]
+            pos += 1
+        return pos
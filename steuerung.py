@@ -0,0 +1,1079 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: steuerung
+#Aufgabe: Ablauf der Heizungssteuerung als Objekt
+#		  Messung und Auswertung der Sensordaten, Kommunikation mit dem MQTT-Broker,
+#		  Steuern des Heizstrahlers und Anzeige auf dem Bildschirm
+#		  Die Hardware wird übergeben, beim Erstellen passiert nichts. setup() verbindet,
+#		  step(jetzt) führt alle fälligen Aufgaben aus und kehrt ohne Warten zurück
+#		  Mit einem Bildpuffer wird der Bildschirm im RAM gezeichnet und gesammelt gesendet
+#		  Mit einer Trendanzeige läuft rechts neben den Werten der Verlauf von Temperatur und Leistung
+#		  Ohne Subscribe-Client laufen Senden und Steuerbefehle über die eine Verbindung der MQTT-Sitzung
+#		  Mit einem Modellregler ersetzt eine modellbasierte Regelung auf die Solltemperatur den Frostschutz
+#		  Mit einer Zeitreihe wird der Verlauf der Messwerte im Flash gespeichert
+
+#=====Bibliotheken=====#
+import time
+import json
+from messfilter import Messfilter # Filtern von Messwerten, um Ausreißer zu entfernen
+from statusanzeige import Statusanzeige # Anzeige der Werte, nur geänderte Zeichen werden gesendet
+from telemetrie import Telemetrie # Senden bei merklicher Änderung, mit Lebenszeichen
+import binaerformat # Kompaktes Binärformat für Sensorwerte und Feedback
+#======================#
+
+#=====Farben wie in st7789py=====#
+SCHWARZ = 0x0000
+CYAN = 0x07FF
+#================================#
+
+# IR-Codes zur Steuerung des Heizstrahlers
+IR_KEYS = { 0: 0x1a, # Aus
+            1: 0x04, # 1kW
+            2: 0x06, # 2kW
+            3: 0x0a} # 3kW
+
+# Stufen, die der Heizstrahler aus einer Stufe per IR annimmt. Aus und Stufe 1 gehen immer,
+# Stufe 2 nur aus Stufe 1 oder 3, Stufe 3 nur aus Stufe 2
+STUFENWECHSEL = {0: (0, 1),
+                 1: (0, 1, 2),
+                 2: (0, 1, 3),
+                 3: (0, 1, 2)}
+
+# Gemessene Leistung in W je Stufe zum Prüfen der Stufe. Ab Stufe 2 schneidet der ADC (3,3 V)
+# die Spitzen des Sinus ab, gemessen werden dann weniger als 2 bzw. 3 kW
+STUFEN_LEISTUNGEN = (0, 1000, 1780, 2360)
+
+# Felder der Nachrichten an den Broker, in dieser Reihenfolge
+SENSORFELDER = ("Temperatur", "Luftfeuchtigkeit", "CO2_Wert", "TVOC_Wert", "Momentane_Leistung", "Gesamte_Leistung")
+FEEDBACKFELDER = ("Strahlerfeedback", "Frostschutzfeedback", "Frostschutzschwellwert", "FrostschutzAus")
+
+# Totbänder (absolut, relativ) der Sensorwerte. Nicht aufgeführte Felder werden bei jeder Änderung gesendet
+SENSOR_TOTBAENDER = {
+    "Temperatur": (0.2, 0), # °C
+    "Luftfeuchtigkeit": (1, 0), # %
+    "CO2_Wert": (20, 0.03), # ppm
+    "TVOC_Wert": (5, 0.05), # ppb
+    "Momentane_Leistung": (20, 0.02), # W
+    "Gesamte_Leistung": (0.01, 0), # kWh
+    }
+
+
+def stufenplan(von, nach, stufenwechsel=STUFENWECHSEL):
+    """Kürzeste Folge von Stufen (je ein IR-Frame), um von Stufe von zur Stufe nach zu kommen.
+    Breitensuche über die erlaubten Stufenwechsel. Ist die Stufe schon erreicht, ist die Folge leer."""
+    wege = {von: ()}
+    offen = [von]
+    for stufe in offen:
+        for ziel in stufenwechsel.get(stufe, ()):
+            if ziel not in wege:
+                wege[ziel] = wege[stufe] + (ziel,)
+                offen.append(ziel)
+    return wege.get(nach, ())
+
+
+class Steuerung:
+    """Heizungssteuerung mit übergebener Hardware.
+
+    setup() führt den Bootvorgang aus (WLAN, MQTT, Bildschirm) und gibt zurück,
+    ob die Hauptschleife laufen kann. Danach wird step(jetzt) mit der aktuellen
+    Zeit in ms (ticks_ms) aufgerufen. Jede Aufgabe hat ihr eigenes Intervall,
+    step() führt nur die fälligen aus und gibt den Zeitpunkt der nächsten
+    fälligen Aufgabe zurück. Mehrere Objekte können nebeneinander laufen."""
+
+    def __init__(self, aht10, ccs811, strom_messung, energiezaehler, ir_tx, txt, font, wlan,
+                 pb_sitzung, subscribe_client, ssid, password,
+                 subscribe_topics=("Steuerung/Stufen", "Steuerung/FrostEIN", "Steuerung/FrostAUS"),
+                 ccs811_interrupt=False, messloops=10, aht10_abfrageintervall=10, aht10_timeout=300,
+                 frostschutzschwellwert=5, frostschutzaus=7, frostschutz_stufenabstaende=(5000, 5000),
+                 mess_umwelt_intervall=30000, mess_strom_intervall=1000, mess_ccs811_intervall=1000,
+                 ccs811_int_intervall=100, task_intervall_empfangen=50, task_intervall_senden=200,
+                 task_intervall_anzeige=500, task_intervall_frostschutz=1000, task_intervall_trend=1000,
+                 max_versuche=60, boot_anzeigezeit=2000, ir_adresse=80, ir_keys=IR_KEYS, bildpuffer=None,
+                 trendanzeige=None, sensor_totbaender=SENSOR_TOTBAENDER, feedback_totbaender=None,
+                 telemetrie_max_stille=60000, telemetrie_einzeltopics=False, warteschlange=None,
+                 task_intervall_nachsenden=200, uhr_stellen=None, telemetrie_binaer=False,
+                 stufenwechsel=STUFENWECHSEL, strahler_stufenabstand=1000, stufe_pruefen=False,
+                 stufen_leistungen=STUFEN_LEISTUNGEN, pruef_toleranz=250, pruef_wartezeit=500, pruef_perioden=2,
+                 pruef_wiederholungen=3, ir_mindestabstand=300, regler=None, zeitreihe=None,
+                 task_intervall_zeitreihe=30000, task_intervall_zeitreihe_sichern=5000):
+        # Hardware
+        self.sensoraht10 = aht10
+        self.sensorccs811 = ccs811
+        self.strom_messung = strom_messung
+        self.energiezaehler = energiezaehler
+        self.ir_tx = ir_tx
+        # Mit Bildpuffer wird alles dorthin gezeichnet, anzeigen() sendet die Änderungen
+        self.bildpuffer = bildpuffer
+        self.txt = bildpuffer if bildpuffer is not None else txt
+        self.font = font
+        # Der Verlauf zeichnet direkt auf den Bildschirm, Texte bleiben links davon
+        self.trendanzeige = trendanzeige
+        self.rechter_rand = trendanzeige.x if trendanzeige is not None else 320
+        self.wlan = wlan
+        self.pb_sitzung = pb_sitzung
+        self.subscribe_client = subscribe_client # None: Steuerbefehle kommen über pb_sitzung
+        # Nicht gesendete Nachrichten werden hier abgelegt und nach dem Reconnect nachgesendet
+        self.warteschlange = warteschlange
+        self.uhr_stellen = uhr_stellen # z.B. ntptime.settime, damit die abgelegten Zeiten stimmen
+        # Modellregler (modellregler.Modellregler) statt der Zweipunkt-Regelung des Frostschutzes, None = Frostschutz
+        self.regler = regler
+        # Verlauf der Messwerte im Flash (zeitreihe.Zeitreihe), None = nur die aktuellen Werte
+        self.zeitreihe = zeitreihe
+
+        # Einstellungen
+        self.ssid = ssid
+        self.password = password
+        self.subscribe_topics = subscribe_topics
+        self.ccs811_interrupt = ccs811_interrupt
+        self.messloops = messloops
+        self.aht10_abfrageintervall = aht10_abfrageintervall
+        self.aht10_timeout = aht10_timeout
+        self.frostschutzschwellwert = frostschutzschwellwert # Wert wenn er aktiviert wird
+        self.frostschutzaus = frostschutzaus # Wert wenn er wieder ausgeschaltet wird
+        self.frostschutz_stufenabstaende = frostschutz_stufenabstaende # in ms, Wartezeit nach Stufe 1 und nach Stufe 2
+        self.mess_umwelt_intervall = mess_umwelt_intervall
+        self.max_versuche = max_versuche
+        self.boot_anzeigezeit = boot_anzeigezeit
+        self.ir_adresse = ir_adresse
+        self.ir_keys = ir_keys
+        self.stufenwechsel = stufenwechsel
+        self.strahler_stufenabstand = strahler_stufenabstand # in ms, zwischen den IR-Frames eines Stufenwechsels
+        self.ir_mindestabstand = ir_mindestabstand # in ms, zwischen zwei IR-Frames, auch bei schnell folgenden Befehlen
+        # Prüfen der Stufe: pruef_wartezeit nach jedem Frame wird über pruef_perioden Netzperioden die Leistung
+        # gemessen und der nächsten Stufe aus stufen_leistungen zugeordnet (höchstens pruef_toleranz daneben)
+        self.stufe_pruefen = stufe_pruefen
+        self.stufen_leistungen = stufen_leistungen
+        self.pruef_toleranz = pruef_toleranz
+        self.pruef_wartezeit = pruef_wartezeit
+        self.pruef_perioden = pruef_perioden
+        self.pruef_wiederholungen = pruef_wiederholungen
+
+        # Gleitende Messfilter, die letzten "messloops" Werte werden gefiltert
+        self.raumtemp = Messfilter(messloops)
+        self.raumluft = Messfilter(messloops)
+        self.co2_list = Messfilter(messloops)
+        self.tvoc_list = Messfilter(messloops)
+
+        # Messwerte und Zustand
+        self.raumtemperatur = 0
+        self.luftfeuchtigkeit = 0
+        self.umwelt_gemessen = False # Erst nach der ersten Messung darf der Frostschutz auswerten
+        self.co2_wert = 0
+        self.tvoc_wert = 0
+        self.momt_leistung = 0
+        self.ges_verbrauch = 0
+        self.neu_strahlersteuerung = 0
+        self.alt_strahlersteuerung = 0
+        self.strahlerfeedback = 0 # Mit Prüfung die gemessene Stufe, sonst die zuletzt gesendete
+        self.strahlerstufe = 0 # Zuletzt gesendete oder gemessene Stufe, von hier aus wird geplant
+        self.frostschutzfeedback = 0
+        self.frostschutzfeedbackstring = 0
+        self.mqttpb_verbunden = False
+        self.mqttsb_verbunden = False
+        self.bootvorgang = True
+        self.pb_fehleranzeige = False
+        self.ccs811_fehler = False
+
+        # Senden an den Broker, jedes Feld mit eigenem Totband
+        self.sensor_telemetrie = Telemetrie(
+            self.publish_senden, "Raum/Sensorwerte",
+            [(name,) + sensor_totbaender.get(name, (0, 0)) for name in SENSORFELDER],
+            telemetrie_max_stille, telemetrie_einzeltopics)
+        self.feedback_telemetrie = Telemetrie(
+            self.publish_senden, "Raum/Feedback",
+            [(name,) + (feedback_totbaender or {}).get(name, (0, 0)) for name in FEEDBACKFELDER],
+            telemetrie_max_stille, telemetrie_einzeltopics)
+        # Kompaktes Binärformat statt JSON für die ganzen Nachrichten (nicht für Einzeltopics)
+        self.binaerformate = {"Raum/Sensorwerte": binaerformat.SENSORWERTE,
+                              "Raum/Feedback": binaerformat.FEEDBACK} if telemetrie_binaer else {}
+
+        # Felder der Messwerte auf dem Bildschirm, rechts neben den Beschriftungen aus setup()
+        self.statusanzeige = Statusanzeige(self.txt, font, CYAN, SCHWARZ)
+        self.feld_temperatur = self.feld_anlegen(120, 40, "°C")
+        self.feld_luftfeuchtigkeit = self.feld_anlegen(168, 63, "%")
+        self.feld_co2 = self.feld_anlegen(103, 86, "ppm")
+        self.feld_tvoc = self.feld_anlegen(112, 109, "ppb")
+        self.feld_leistung = self.feld_anlegen(175, 132, "W")
+        self.feld_verbrauch = self.feld_anlegen(167, 155, "kWh", nachkommastellen=2)
+        self.feld_frostschutz = self.feld_anlegen(223, 178, "°C")
+
+        # Laufende AHT10-Messreihe
+        self.umwelt_start = 0
+        self.aht10_messungen = -1 # -1 = keine Messreihe aktiv
+        self.aht10_trigger = 0
+
+        # Mittlere Nennleistung für den Modellregler seit der vorherigen Messung (in W*ms aufsummiert)
+        self.regler_energie = 0
+        self.regler_zeit = None
+        self.regler_summiert = None
+        self.regler_gefahren = None # zuletzt vom Regler angeforderte Stufe
+
+        # Auftrag an task_strahler (Zielstufe, Wartezeiten), nur der letzte zählt. None = kein neuer Auftrag
+        self.strahler_auftrag = None
+        # Fahrplan des Heizstrahlers: Stufen, die noch gesendet werden, und die Wartezeiten danach
+        self.strahler_fahrplan = []
+        self.strahler_ziel = 0
+        self.strahler_abstaende = None # None = strahler_stufenabstand nach jeder Stufe
+        self.strahler_termin = 0 # frühester Zeitpunkt für den nächsten Frame
+        self.frostschutz_rampe = False # Der Fahrplan ist die Einschalt-Rampe des Frostschutzes
+        # Prüfung der zuletzt gesendeten Stufe, None = keine Prüfung offen
+        self.strahler_pruefstufe = None
+        self.strahler_pruefungen = 0 # Messungen der offenen Prüfung
+        self.strahler_wiederholungen = 0 # Wiederholungen für den aktuellen Fahrplan
+        self.strahler_fehler = 0 # Fahrpläne, deren Stufe auch nach allen Wiederholungen nicht stimmte
+        # Kennzahlen: empfangene Stufenbefehle, ersetzte Aufträge vor ihrem ersten Frame, gesendete Frames
+        self.ir_befehle = 0
+        self.ir_zusammengefasst = 0
+        self.ir_frames = 0
+        self.ir_letzter_frame = 0
+        self.frostschutz_abbrueche = 0
+
+        # Aufgaben: [Intervall in ms, nächster Start (None = sofort), Funktion]
+        # Gibt eine Aufgabe einen Zeitpunkt zurück, startet sie dann erneut, sonst im festen Takt
+        # task_empfangen steht vorne, empfangen_jetzt() setzt ihren Start zurück
+        # task_strahler direkt danach, damit ein empfangener Befehl im selben step() gesendet wird.
+        # Ohne Fahrplan läuft sie nur selten, strahler_fahren() setzt ihren Start auf None (sofort),
+        # step() führt sie dann direkt nach der aufrufenden Aufgabe aus
+        self.aufgabe_strahler = [60000, None, self.task_strahler]
+        self.aufgaben = [
+            [task_intervall_empfangen, None, self.task_empfangen],
+            self.aufgabe_strahler,
+            [task_intervall_frostschutz, None, self.task_frostschutz],
+            [mess_umwelt_intervall, None, self.task_umwelt],
+            [ccs811_int_intervall if ccs811_interrupt else mess_ccs811_intervall, None, self.task_ccs811],
+            [mess_strom_intervall, None, self.task_strom],
+            [task_intervall_senden, None, self.task_senden],
+            [task_intervall_anzeige, None, self.task_anzeige],
+            ]
+        if trendanzeige is not None:
+            self.aufgaben.append([task_intervall_trend, None, self.task_trend])
+        if warteschlange is not None:
+            self.aufgaben.append([task_intervall_nachsenden, None, self.task_nachsenden])
+        if zeitreihe is not None:
+            # Anhängen nur im RAM, geschrieben wird in einer eigenen Aufgabe am Ende der Liste
+            self.aufgaben.append([task_intervall_zeitreihe, None, self.task_zeitreihe])
+            self.aufgaben.append([task_intervall_zeitreihe_sichern, None, self.task_zeitreihe_sichern])
+
+    #=====Ablauf=====#
+    def aktiv(self):
+        """Die Hauptschleife läuft nur so lange, wie beide MQTT-Verbindungen bestehen.
+        Die gemeinsame Verbindung ohne Subscribe-Client wird nach einem Abbruch neu verbunden"""
+        return self.mqttpb_verbunden and self.mqttsb_verbunden
+
+    def step(self, jetzt):
+        """Alle fälligen Aufgaben ausführen. jetzt ist die aktuelle Zeit in ms (ticks_ms).
+        Gibt den Zeitpunkt (ticks_ms) zurück, zu dem die nächste Aufgabe fällig ist."""
+        strahler = self.aufgabe_strahler
+        for aufgabe in self.aufgaben:
+            if aufgabe[1] is None or time.ticks_diff(jetzt, aufgabe[1]) >= 0:
+                self.ausfuehren(aufgabe, jetzt)
+                if strahler[1] is None and aufgabe is not strahler:
+                    # strahler_fahren() aus dieser Aufgabe (z.B. Frostschutz, Sensorfehler): den IR-Frame
+                    # gleich senden, nicht erst nach den übrigen Aufgaben (Strommessung) oder im nächsten step()
+                    self.ausfuehren(strahler, jetzt)
+
+        # Erst nach allen Aufgaben, eine Aufgabe kann eine andere neu geplant haben
+        naechster = None
+        for aufgabe in self.aufgaben:
+            termin = aufgabe[1] if aufgabe[1] is not None else jetzt
+            if naechster is None or time.ticks_diff(termin, naechster) < 0:
+                naechster = termin
+        return naechster
+
+    def ausfuehren(self, aufgabe, jetzt):
+        """Eine Aufgabe ausführen und ihren nächsten Start setzen"""
+        start = aufgabe[1] if aufgabe[1] is not None else jetzt
+        termin = aufgabe[2](jetzt)
+        if termin is None:
+            # Fester Takt. Ist die Aufgabe zu spät dran, wird sofort neu begonnen
+            termin = time.ticks_add(start, aufgabe[0])
+            if time.ticks_diff(termin, jetzt) < 0:
+                termin = jetzt
+        aufgabe[1] = termin
+
+    def empfangs_socket(self):
+        """Socket, auf dem die Steuerbefehle ankommen, None ohne Verbindung.
+        Die Hauptschleife kann darauf warten (poll), statt task_empfangen ständig abfragen zu lassen"""
+        if self.subscribe_client is None:
+            return self.pb_sitzung.client.sock if self.pb_sitzung.verbunden else None
+        return self.subscribe_client.sock if self.mqttsb_verbunden else None
+
+    def empfangen_jetzt(self):
+        """Auf dem Empfangs-Socket liegen Daten an: task_empfangen beim nächsten step() sofort ausführen"""
+        self.aufgaben[0][1] = None
+
+    def feld_anlegen(self, x, y, einheit, nachkommastellen=0):
+        """Feld der Statusanzeige, höchstens bis zum rechten Rand der Texte"""
+        zeichen = min(self.statusanzeige.max_zeichen, (self.rechter_rand - x) // self.font.WIDTH)
+        return self.statusanzeige.feld(x, y, einheit, zeichen, nachkommastellen)
+
+    def anzeigen(self):
+        """Im Bildpuffer gezeichnete Änderungen zum Bildschirm senden (ohne Bildpuffer ist alles schon angezeigt)"""
+        if self.bildpuffer is not None:
+            self.bildpuffer.senden()
+
+    #=====Bootvorgang=====#
+    def setup(self):
+        """Einmalige Einrichtungen: Zählerstand laden, WLAN und MQTT verbinden, Bildschirm aufbauen.
+        Gibt zurück, ob die Hauptschleife gestartet werden kann."""
+        txt, font = self.txt, self.font
+
+        #Bildschirm auf Schwarz setzen
+        txt.fill(SCHWARZ)
+        txt.text(font, "Boot Vorgang gestartet", 72, 109, CYAN, SCHWARZ)
+        self.anzeigen()
+        self.bootvorgang = True
+
+        # Gesamten Verbrauch aus dem Flash wiederherstellen
+        self.energiezaehler.laden()
+        self.ges_verbrauch = self.energiezaehler.kwh()
+
+        # Vor dem Neustart nicht gesendete Nachrichten aus dem Flash wiederfinden
+        if self.warteschlange is not None:
+            self.warteschlange.laden()
+
+        # Verlauf der Messwerte nach dem Neustart weiterschreiben
+        if self.zeitreihe is not None:
+            self.zeitreihe.laden()
+
+        # WLAN-Verbindung herstellen
+        self.wlan.active(True)
+        self.wifi_verbindung()
+
+        # Uhrzeit stellen, sie steht in den nachgesendeten Nachrichten
+        if self.wlan.isconnected() and self.uhr_stellen is not None:
+            try:
+                self.uhr_stellen()
+            except Exception:
+                pass
+
+        # Publish Client
+        if self.wlan.isconnected():
+            # Verbindung zum Broker herstellen. Sie bleibt für das Senden der Daten offen.
+            try:
+                if self.subscribe_client is None:
+                    # Gemeinsame Verbindung: die Steuerungs-Topics werden bei jedem (Re)connect abonniert
+                    self.pb_sitzung.abonnieren(self.subscribe_topics, self.callback_strahler)
+                self.pb_sitzung.verbinden()
+
+                # Der Wert wird auf True gesetzt, wenn der Test erfolgreich war. Nur bei einem erfolgreichen Test kann die Hauptschleife gestartet werden.
+                self.mqttpb_verbunden = True
+                if self.subscribe_client is None:
+                    self.mqttsb_verbunden = True
+
+            except Exception as e:
+                # Anzeige des Fehlertexts
+                txt.fill_rect(72, 109, 170, 15, SCHWARZ)
+                txt.text(font, "Boot Vorgang abgebrochen", 72, 86, CYAN, SCHWARZ)
+                txt.text(font, "Fehler beim Verbinden mit", 60, 109, CYAN, SCHWARZ)
+                txt.text(font, "MQTT-Broker-Publish", 85, 132, CYAN, SCHWARZ)
+                txt.text(font, f"Fehler {e}", 30, 155, CYAN, SCHWARZ)
+
+        # Subscribe Client
+        if self.wlan.isconnected() and self.subscribe_client is not None:
+            try:
+                # Callback-Funktion wird festgelegt. Bei Empfang von Nachrichten wird die Funktion durch den Subscribe-Client aufgerufen wird.
+                self.subscribe_client.set_callback(self.callback_strahler)
+
+                # Verbindung zum Subscribe Broker herstellen und Topics abonnieren
+                self.subscribe_verbinden()
+
+                # Der Wert wird auf True gesetzt, wenn der Test erfolgreich war. Nur bei einem erfolgreichen Test kann die Hauptschleife gestartet werden.
+                self.mqttsb_verbunden = True
+
+            except Exception as e:
+                # Anzeige des Fehlertexts
+                txt.fill_rect(72, 109, 170, 15, SCHWARZ)
+                txt.text(font, "Boot Vorgang abgebrochen", 72, 86, CYAN, SCHWARZ)
+                txt.text(font, "Fehler beim Verbinden mit", 60, 109, CYAN, SCHWARZ)
+
+                # Falls beim MQTT-Publish bereits ein Fehler ist, wird die Nachricht darunter eingefügt
+                if self.mqttpb_verbunden:
+                    txt.text(font, "MQTT-Broker-Subscribe", 80, 132, CYAN, SCHWARZ)
+                    txt.text(font, f"Fehler {e}", 30, 155, CYAN, SCHWARZ)
+
+                else:
+                    txt.text(font, "MQTT-Broker-Subscribe", 80, 178, CYAN, SCHWARZ)
+                    txt.text(font, f"Fehler {e}", 30, 201, CYAN, SCHWARZ)
+
+        # Bildschirmtexte einfügen nach erfolgreichen Boot Vorgang
+        if self.wlan.isconnected() and self.aktiv():
+            txt.fill_rect(72, 109, 170, 15, SCHWARZ)
+            txt.text(font, "Boot Vorgang erfolgreich", 72, 109, CYAN, SCHWARZ)
+
+            # Merker für Fehlertexte falls nach den Boot Vorgang Fehler Texte auf Bildschirm geschrieben werden
+            self.bootvorgang = False
+
+            # Kurze Wartezeit zum Lesen
+            self.anzeigen()
+            time.sleep_ms(self.boot_anzeigezeit)
+            txt.fill_rect(72, 109, 195, 15, SCHWARZ)
+
+            # Bildschirm Texte einfügen für die Sensorwerte und Einstellungen
+            txt.text(font, "Temperatur: ", 30, 40, CYAN, SCHWARZ)
+            txt.text(font, "Luftfeuchtigkeit: ", 30, 63, CYAN, SCHWARZ)
+            txt.text(font, "CO2-Wert: ", 30, 86, CYAN, SCHWARZ)
+            txt.text(font, "TVOC-Wert: ", 30, 109, CYAN, SCHWARZ)
+            txt.text(font, "Aktuelle Leistung: ", 30, 132, CYAN, SCHWARZ)
+            txt.text(font, "Gesamte Leistung: ", 30, 155, CYAN, SCHWARZ)
+            txt.text(font, "Frostschutz Einschalten: ", 30, 178, CYAN, SCHWARZ)
+
+            # Verlauf rechts neben den Werten
+            if self.trendanzeige is not None:
+                self.trendanzeige.starten()
+
+        self.anzeigen()
+        return self.aktiv()
+
+    def beenden(self):
+        """Anzeige nach dem Verlassen der Hauptschleife"""
+        # Ohne Scrolling stehen die Fehlertexte wieder an ihrer Stelle
+        if self.trendanzeige is not None:
+            self.trendanzeige.beenden()
+        self.txt.text(self.font, "Hauptschleife beendet", 80, 40, CYAN, SCHWARZ)
+        self.anzeigen()
+        # Gesammelte Datensätze des Verlaufs nicht verlieren
+        if self.zeitreihe is not None:
+            try:
+                self.zeitreihe.schreiben()
+            except OSError:
+                pass
+
+    #=====Verbindungen=====#
+    def wifi_verbindung(self):
+        """ Funktion um sich mit den Wlan Netzwerk zu Verbinden.
+        Abbruch, sobald die maximal gesetzte Anzahl an Versuchen überschritten ist. """
+        wlan, txt, font = self.wlan, self.txt, self.font
+
+        # Wenn bereits verbunden, abbrechen
+        if wlan.isconnected():
+            return
+
+        # Verbindung mit WLAN herstellen
+        wlan.connect(self.ssid, self.password)
+        versuche = 0
+
+        # Versuche, so lange mit WLAN zu verbinden, bis entweder eine Verbindung hergestellt wird oder die maximale Anzahl an Versuchen erreicht ist
+        while not wlan.isconnected() and versuche < self.max_versuche:
+            try:
+                time.sleep(1)
+                versuche += 1
+
+            except Exception as e:
+                # Fehlerbehandlung im Falle eines Fehlers bei der Verbindung
+
+                # Im Betrieb bleiben die Messwerte stehen, der Fehler steht in der Fehlerzeile
+                if not self.bootvorgang:
+                    self.fehlerzeile_anzeigen("Fehler Verbindung Wlan")
+                    return
+
+                # Anzeige eines Fehlertexts beim Bootvorgang
+                txt.text(font, "Boot Vorgang abgebrochen", 72, 109, CYAN, SCHWARZ)
+
+                # Anzeige des Fehlertexts
+                txt.text(font, "Fehler beim Verbindungsversuch", 45, 132, CYAN, SCHWARZ)
+                txt.text(font, "mit den Wlan Netzwerk", 80, 155, CYAN, SCHWARZ)
+
+                return
+
+        if not wlan.isconnected():
+            # Wenn die Verbindung nicht erfolgreich war, Fehlernachricht anzeigen
+
+            # Im Betrieb bleiben die Messwerte stehen, der Fehler steht in der Fehlerzeile
+            if not self.bootvorgang:
+                self.fehlerzeile_anzeigen("Verbindung Wlan fehlgeschlagen")
+                return
+
+            # Anzeige eines Fehlertexts beim Bootvorgang
+            txt.fill(SCHWARZ)
+            txt.text(font, "Boot Vorgang abgebrochen", 72, 109, CYAN, SCHWARZ)
+
+            # Anzeige des Fehlertexts
+            txt.text(font, "Verbindung Wlan fehlgeschlagen", 50, 132, CYAN, SCHWARZ)
+            txt.text(font, "Zu viele Versuche", 90, 155, CYAN, SCHWARZ)
+
+    def subscribe_verbinden(self):
+        """Subscribe-Client verbinden und die Steuerungs-Topics abonnieren"""
+        self.subscribe_client.connect()
+        for topic in self.subscribe_topics:
+            self.subscribe_client.subscribe(topic)
+
+    def publish_senden(self, topic, daten):
+        """Funktion zum Senden der Daten über die dauerhafte Verbindung zum MQTT-Broker.
+        Gibt zurück, ob gesendet wurde. Mit Warteschlange wird eine nicht gesendete Nachricht
+        mit der aktuellen Zeit abgelegt und gilt ebenfalls als gesendet."""
+        nutzdaten = None
+        try:
+            # Sollte die Wlan Verbindung verloren sein, wird sie wieder hergestellt
+            if not self.wlan.isconnected():
+                self.wifi_verbindung()
+
+            # Dictionary wird im Binärformat (fester Puffer) oder im JSON-Format umgeschrieben
+            binaer = self.binaerformate.get(topic)
+            nutzdaten = binaer.kodieren(daten) if binaer is not None else json.dumps(daten)
+
+            # Daten werden über die offene Verbindung gesendet
+            # Ist die Verbindung abgebrochen, wird automatisch neu verbunden
+            gesendet = self.pb_sitzung.senden(topic, nutzdaten)
+
+        except Exception as e:
+            self.pb_sitzung.fehler = e
+            gesendet = False
+
+        if gesendet:
+            # Fehlertext entfernen, sobald wieder gesendet werden kann
+            if self.pb_fehleranzeige:
+                self.publish_fehler_anzeigen(None)
+        else:
+            # Anzeige des Fehlertexts, die Hauptschleife läuft weiter
+            # Ohne WLAN bleibt der Fehlertext aus wifi_verbindung() stehen
+            if self.wlan.isconnected():
+                self.publish_fehler_anzeigen(self.pb_sitzung.fehler)
+            if self.warteschlange is not None and nutzdaten is not None:
+                # Abgelegt wird immer JSON, der Nachtrag ist eine JSON-Liste
+                gesendet = self.warteschlange.ablegen(topic, json.dumps(daten))
+        return gesendet
+
+    def publish_fehler_anzeigen(self, fehler):
+        """Anzeige oder Entfernen des Fehlertexts zur MQTT-Publish-Verbindung"""
+        self.fehlerzeile_anzeigen(f"MQTT-Publish Fehler {fehler}" if fehler is not None else None)
+
+    def fehlerzeile_anzeigen(self, text):
+        """Anzeige oder Entfernen eines Fehlertexts in der Zeile unter den Messwerten.
+        Der Text wird entfernt, sobald wieder gesendet werden kann."""
+        breite = self.rechter_rand - 30
+        self.txt.fill_rect(30, 201, breite, 15, SCHWARZ)
+        if text is not None:
+            self.txt.text(self.font, text[:breite // self.font.WIDTH], 30, 201, CYAN, SCHWARZ)
+        self.pb_fehleranzeige = text is not None
+
+    #=====Messungen=====#
+    def messungccs811(self):
+        """Messung Luftqualität
+        Die Messwerte kommen aus dem Ringpuffer, den task_ccs811 mit jeder neuen Messung des Sensors füllt"""
+        # Meldet der Sensor einen Fehler, werden keine Werte angezeigt
+        if self.ccs811_fehler:
+            self.co2_wert = "Fehler"
+            self.tvoc_wert = "Fehler"
+            return
+
+        # Mittelwertfilter anwenden
+        self.co2_wert = int(self.co2_list.wert())
+        self.tvoc_wert = int(self.tvoc_list.wert())
+
+    def abtastung_ccs811(self):
+        """Neue Messung des CCS811 mit einem einzigen Lesezugriff abholen und in den Ringpuffer schreiben"""
+        try:
+            if self.sensorccs811.read_results():
+                self.co2_list.hinzufuegen(self.sensorccs811.eCO2)
+                self.tvoc_list.hinzufuegen(self.sensorccs811.tVOC)
+
+            # Fehler-ID aus dem Status des Sensors übernehmen
+            self.ccs811_fehler = self.sensorccs811.error is not False
+
+        except Exception as e:
+            self.ccs811_fehler = True
+
+    def messungacs712(self):
+        """Messung des Stroms des Heizstrahlers und Umrechnung in Watt
+        Es werden ganze Netzperioden abgetastet und der Effektivwert berechnet"""
+        try:
+            # Abtastung und Berechnung von Effektivstrom und Leistung
+            strom_A, leistung = self.strom_messung.messen()
+
+            # Momentanleistung
+            self.momt_leistung = int(leistung)
+
+        except Exception as e:
+            # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
+            self.momt_leistung = "Fehler"
+
+    #=====Heizstrahler=====#
+    def callback_strahler(self, topic, msg):
+        """Abrufen der Steuerungsdaten für den Heizstrahler """
+        befehl = False
+        try:
+            #Aus der MQTT-Nachricht den Werte für "Strahler" extrahieren
+            sub_daten = json.loads(msg)
+
+            # Überprüfen, ob der Wert für "Strahler" in den empfangenen Daten vorhanden ist
+            # Wenn der Wert existiert und nicht None ist, wird der neue Wert gesetzt
+            if sub_daten.get("Strahler") is not None:
+                self.neu_strahlersteuerung = sub_daten.get("Strahler")
+                befehl = True
+
+            # Überprüfen, ob der Wert für "FrostEIN" in den empfangenen Daten vorhanden ist
+            if sub_daten.get("FrostEIN") is not None:
+                self.frostschutzschwellwert = sub_daten.get("FrostEIN")
+
+            # Überprüfen, ob der Wert für "FrostAUS" in den empfangenen Daten vorhanden ist
+            if sub_daten.get("FrostAUS") is not None:
+                self.frostschutzaus = sub_daten.get("FrostAUS")
+
+            # Überprüfen, ob der Wert für "Solltemperatur" vorhanden ist (nur mit Modellregler)
+            if sub_daten.get("Solltemperatur") is not None and self.regler is not None:
+                self.regler.solltemperatur = sub_daten.get("Solltemperatur")
+
+        except Exception as e:
+            # Bei einen Fehler immer 0.
+            # 0 Entspricht Heizstrahler Aus
+            self.neu_strahlersteuerung = 0
+            befehl = True
+
+        # Kennzahl: empfangene Stufenbefehle
+        if befehl:
+            self.ir_befehle += 1
+
+        # Ein Steuerbefehl während der Frostschutz-Rampe beendet sie und wird immer ausgeführt,
+        # auch wenn er dem letzten Befehl entspricht (z.B. "Aus" nach "Aus")
+        if befehl and self.frostschutz_abbrechen():
+            self.alt_strahlersteuerung = None
+
+        # Nur ein IR-Code Änderung wenn es eine Änderung gibt
+        if self.neu_strahlersteuerung != self.alt_strahlersteuerung:
+            self.alt_strahlersteuerung = self.neu_strahlersteuerung
+            # Funktion zur Steuerung des Strahler aufrufen
+            self.steuerung_strahler()
+
+    def steuerung_strahler(self):
+        """Heizstrahler auf die angeforderte Stufe fahren
+        Ist der direkte Wechsel nicht erlaubt (z.B. Aus auf Stufe 3), wird über die Zwischenstufen gefahren.
+        Eine unbekannte Stufe schaltet den Heizstrahler aus."""
+        neu = self.neu_strahlersteuerung
+        self.strahler_fahren(neu if neu in self.stufenwechsel else 0)
+
+    def strahler_fahren(self, ziel, abstaende=None, frostschutz=False):
+        """Auftrag an task_strahler, den Heizstrahler zur Stufe ziel zu fahren. Gesendet wird nie hier
+        (z.B. im MQTT-Callback), sondern in task_strahler mit ir_mindestabstand zwischen den Frames.
+        Ein Auftrag, der noch nicht begonnen hat, wird ersetzt: bei schnell folgenden Befehlen zählt nur der letzte.
+        abstaende: Wartezeit in ms nach Stufe 1 und nach Stufe 2, sonst strahler_stufenabstand"""
+        if self.strahler_auftrag is not None:
+            self.ir_zusammengefasst += 1
+        self.strahler_auftrag = (ziel, abstaende)
+        self.frostschutz_rampe = frostschutz
+        self.aufgabe_strahler[1] = None # sofort fällig, step() führt task_strahler direkt nach dem Aufrufer aus
+
+    def stufe_aus_leistung(self, leistung):
+        """Stufe, deren Leistung am nächsten liegt. None, wenn auch sie weiter als pruef_toleranz entfernt ist.
+        Überlappen sich die Toleranzfenster zweier Stufen, entscheidet der kleinere Abstand"""
+        naechste = None
+        for stufe, soll in enumerate(self.stufen_leistungen):
+            if naechste is None or abs(leistung - soll) < abs(leistung - self.stufen_leistungen[naechste]):
+                naechste = stufe
+        if naechste is None or abs(leistung - self.stufen_leistungen[naechste]) > self.pruef_toleranz:
+            return None
+        return naechste
+
+    def strahler_pruefen(self, jetzt):
+        """Leistung in einem kurzen Messfenster messen und die Stufe mit der gesendeten vergleichen.
+        Stimmt sie nicht, wird von der gemessenen Stufe aus neu geplant und sofort gesendet.
+        Gibt den Zeitpunkt einer weiteren Messung zurück, sonst None (Prüfung beendet)."""
+        soll = self.strahler_pruefstufe
+        try:
+            strom_A, leistung = self.strom_messung.messen(self.pruef_perioden)
+            gemessen = self.stufe_aus_leistung(leistung)
+        except Exception as e:
+            gemessen = None
+        self.strahler_pruefungen += 1
+
+        # Gemessene Stufe stimmt: Feedback für die Node-Red-Dashboard Anzeige
+        if gemessen == soll:
+            self.strahler_pruefstufe = None
+            self.strahlerfeedback = soll
+            return None
+
+        # Leistung passt zu keiner Stufe (Messfehler, Heizstrahler schaltet gerade): noch einmal messen
+        if gemessen is None:
+            if self.strahler_pruefungen <= self.pruef_wiederholungen:
+                return time.ticks_add(jetzt, self.pruef_wartezeit)
+            # Die Stufe lässt sich nicht messen, es bleibt bei der gesendeten Stufe
+            self.strahler_pruefstufe = None
+            self.strahlerfeedback = soll
+            return None
+
+        # Andere Stufe: der Frame ist nicht angekommen oder der Wechsel wurde nicht angenommen
+        self.strahler_pruefstufe = None
+        self.strahlerstufe = gemessen
+        self.strahlerfeedback = gemessen
+        if self.strahler_wiederholungen < self.pruef_wiederholungen:
+            self.strahler_wiederholungen += 1
+            self.strahler_fahrplan = list(stufenplan(gemessen, self.strahler_ziel, self.stufenwechsel))
+            self.strahler_termin = jetzt
+        else:
+            self.strahler_fahrplan = []
+            self.strahler_fehler += 1
+        return None
+
+    #=====Aufgaben=====#
+    # Jede Aufgabe bekommt die aktuelle Zeit und kehrt ohne Warten zurück.
+    # Rückgabe None: nächster Start im festen Takt, sonst der Zeitpunkt des nächsten Starts
+
+    def task_strahler(self, jetzt):
+        """Aufträge und Fahrplan abarbeiten: ein neuer Auftrag ersetzt Fahrplan und offene Prüfung und wird
+        von der aktuellen Stufe aus geplant. Nächste Stufe senden, mit stufe_pruefen nach pruef_wartezeit prüfen
+        (strahler_pruefen()), nach der Wartezeit der Stufe die nächste senden.
+        Zwischen zwei Frames liegen immer mindestens ir_mindestabstand ms."""
+        frei = time.ticks_add(self.ir_letzter_frame, self.ir_mindestabstand) if self.ir_frames else jetzt
+        if self.strahler_auftrag is not None:
+            if time.ticks_diff(frei, jetzt) > 0:
+                return frei # weitere Befehle bis dahin ersetzen den Auftrag
+            ziel, self.strahler_abstaende = self.strahler_auftrag
+            self.strahler_auftrag = None
+            self.strahler_fahrplan = list(stufenplan(self.strahlerstufe, ziel, self.stufenwechsel))
+            self.strahler_ziel = ziel
+            self.strahler_pruefstufe = None
+            self.strahler_wiederholungen = 0
+            self.strahler_termin = jetzt
+
+        if self.strahler_pruefstufe is not None:
+            termin = self.strahler_pruefen(jetzt)
+            if termin is not None:
+                return termin
+        if not self.strahler_fahrplan:
+            self.frostschutz_rampe = False
+            return None
+        termin = self.strahler_termin if time.ticks_diff(self.strahler_termin, frei) > 0 else frei
+        if time.ticks_diff(termin, jetzt) > 0:
+            return termin
+
+        stufe = self.strahler_fahrplan.pop(0)
+        self.ir_tx.transmit(self.ir_adresse, self.ir_keys.get(stufe))
+        self.ir_frames += 1
+        self.ir_letzter_frame = jetzt
+        self.strahlerstufe = stufe
+        abstand = self.strahler_abstaende[stufe - 1] if self.strahler_abstaende and 0 < stufe <= len(self.strahler_abstaende) \
+            else self.strahler_stufenabstand
+        self.strahler_termin = time.ticks_add(jetzt, abstand)
+        if self.stufe_pruefen:
+            self.strahler_pruefstufe = stufe
+            self.strahler_pruefungen = 0
+            return time.ticks_add(jetzt, self.pruef_wartezeit)
+
+        self.strahlerfeedback = stufe # Feedback für die Node-Red-Dashboard Anzeige
+        if not self.strahler_fahrplan:
+            self.frostschutz_rampe = False
+            return None
+        return self.strahler_termin
+
+    def task_umwelt(self, jetzt):
+        """Messung von Temperatur, Luftfeuchtigkeit und Luftqualität
+        Die Messreihe des AHT10 läuft über mehrere Aufrufe: Wandlung starten,
+        Busy-Bit abfragen, nächste Wandlung. In der Zwischenzeit laufen die anderen Aufgaben weiter."""
+        try:
+            if self.aht10_messungen < 0:
+                # Neue Messreihe beginnen
+                self.umwelt_start = jetzt
+                self.aht10_messungen = 0
+                self.sensoraht10.trigger()
+                self.aht10_trigger = jetzt
+                return time.ticks_add(jetzt, self.aht10_abfrageintervall)
+
+            if not self.sensoraht10.poll():
+                if time.ticks_diff(jetzt, self.aht10_trigger) > self.aht10_timeout:
+                    raise OSError("AHT10 Timeout")
+                return time.ticks_add(jetzt, self.aht10_abfrageintervall)
+
+            self.raumtemp.hinzufuegen(self.sensoraht10.last_temperature())
+            self.raumluft.hinzufuegen(self.sensoraht10.last_humidity())
+            self.aht10_messungen += 1
+
+            if self.aht10_messungen < self.messloops:
+                # Nächste Wandlung der Messreihe starten
+                self.sensoraht10.trigger()
+                self.aht10_trigger = jetzt
+                return time.ticks_add(jetzt, self.aht10_abfrageintervall)
+
+            # Mittelwertfilter anwenden
+            self.raumtemperatur = int(self.raumtemp.wert())
+            self.luftfeuchtigkeit = int(self.raumluft.wert())
+            self.umwelt_gemessen = True
+            if self.regler is not None:
+                self.regler_messen(jetzt)
+
+        except Exception as e:
+            # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
+            self.raumtemperatur = "Fehler"
+            self.luftfeuchtigkeit = "Fehler"
+            # Ohne Temperatur wird nicht weiter hochgeschaltet, eine laufende Frostschutz-Rampe schaltet aus
+            self.frostschutz_abbrechen(ausschalten=True)
+            if self.regler is not None:
+                self.regler.ausfall()
+                self.regler_zeit = None
+
+        # Messreihe beendet
+        self.aht10_messungen = -1
+
+        # Luftqualität aus den gesammelten Messungen berechnen
+        try:
+            # Wird nur ausgeführt wenn beide Varibalen vom AHT10 ein Integer sind. Ist es ein String liegt ein Fehler vor
+            if isinstance(self.raumtemperatur, int) and isinstance(self.luftfeuchtigkeit, int):
+
+                # Umweltdaten einspeisen um Messwerte zu verbessern.
+                self.sensorccs811.put_envdata(self.luftfeuchtigkeit, self.raumtemperatur)
+
+            # Funktion zur Messung der Luftqualität
+            self.messungccs811()
+
+        except Exception as e:
+            # Fehlerbehandlung, Texte werden auf den Bildschirm angezeigt
+            self.co2_wert = "Fehler"
+            self.tvoc_wert = "Fehler"
+
+        # Die nächste Messreihe beginnt im Takt, gerechnet vom Beginn dieser Messreihe
+        return time.ticks_add(self.umwelt_start, self.mess_umwelt_intervall)
+
+    def task_ccs811(self, jetzt):
+        """Abtastung des CCS811
+        Mit nINT-Pin wird der Bus nur gelesen, wenn der Sensor neue Daten meldet.
+        Ohne Pin wird im Messtakt des Sensors gelesen und das Status-Byte ausgewertet."""
+        if not self.ccs811_interrupt or self.sensorccs811.data_pending:
+            self.abtastung_ccs811()
+
+    def task_strom(self, jetzt):
+        """Messung der Leistung und Aufsummieren des Verbrauchs"""
+        # Leistung messen sobald der Heizstrahler eingeschaltet ist, auch wenn der Frostschutz ihn eingeschaltet hat
+        if self.neu_strahlersteuerung in [1, 2, 3] or self.strahlerfeedback in [1, 2, 3]:
+
+            # Funktion zur Messung des Stroms und Berechnung der Leistung
+            self.messungacs712()
+
+        # Ist der Heizstrahler ausgeschaltet, wird keine Leistung verbraucht
+        else:
+            self.momt_leistung = 0
+
+        # Energie mit jeder Messung aufsummieren (Trapezregel). Bei einem Messfehler wird nichts addiert
+        if isinstance(self.momt_leistung, int):
+            self.energiezaehler.hinzufuegen(self.momt_leistung, jetzt)
+        self.ges_verbrauch = self.energiezaehler.kwh()
+
+        # Zählerstand im Flash sichern. Nach dem Ausschalten sobald möglich, sonst im Speicherintervall
+        self.energiezaehler.sichern(erzwingen=self.momt_leistung == 0)
+
+    def task_frostschutz(self, jetzt):
+        """Frostschutz-Funktion
+        Automatisches Ein- und Ausschalten des Heizstrahlers zur Aufrechterhaltung einer konstanten Raumtemperatur.
+        Beim Einschalten läuft eine Rampe: Stufe 1, 2 und 3 mit den Wartezeiten aus frostschutz_stufenabstaende,
+        um große Einschaltströme zu verhindern. task_strahler sendet die Stufen, die anderen Aufgaben laufen
+        in der Zwischenzeit weiter. Ein Steuerbefehl oder ein Sensorfehler beendet die Rampe sofort
+        (frostschutz_abbrechen()). Mit Modellregler regelt stattdessen regeln() auf die Solltemperatur."""
+
+        if self.regler is not None:
+            return self.regeln(jetzt)
+
+        # Frostschutz wird nur ausgeführt wenn es ein Integer ist. Sollte es ein String sein hat der Sensor ein Fehler
+        # Der Schwellwert muss immer kleiner sein als der Ausschaltwert
+        # Vor der ersten Messung steht die Raumtemperatur noch auf 0 und würde den Frostschutz auslösen
+        if self.umwelt_gemessen and isinstance(self.raumtemperatur, int) and self.frostschutzschwellwert < self.frostschutzaus:
+
+            # Heizstrahler wird eingeschaltet wenn die Temperatur unter den eingestellten Wert ist und er nicht eingeschaltet ist
+            if self.raumtemperatur < self.frostschutzschwellwert and self.strahlerstufe == 0 \
+                    and not self.strahler_fahrplan and self.strahler_auftrag is None:
+                self.strahler_fahren(3, self.frostschutz_stufenabstaende, frostschutz=True) # Rampe bis Stufe 3
+                self.frostschutzfeedback = 1
+
+            # Heizstrahler wird ausgeschaltet wenn die Temperatur über den eingestellten Wert ist und die Frostschutzfunktion aktiv ist
+            elif self.raumtemperatur > self.frostschutzaus and self.frostschutzfeedback == 1:
+                self.strahler_fahren(0) # Heizstrahler wird ausgeschaltet, auch während der Rampe
+                self.frostschutzfeedback = 0
+
+        else:
+            return None
+
+        # Setzt das Frostschutzfeedback für die Anzeige im Node-Red-Dashboard, um den Status des Frostschutzmechanismus (aktiv oder inaktiv) anzuzeigen.
+        if self.frostschutzfeedback == 0:
+            self.frostschutzfeedbackstring = "Aus" #Bei inaktivem Frostschutz
+
+        elif self.frostschutzfeedback == 1:
+            self.frostschutzfeedbackstring = "Aktiv" #Bei aktivem Frostschutz
+
+    def frostschutz_abbrechen(self, ausschalten=False):
+        """Laufende Einschalt-Rampe des Frostschutzes sofort beenden
+        Der Heizstrahler bleibt auf der erreichten Stufe, mit ausschalten=True wird er ausgeschaltet.
+        Gibt zurück, ob eine Rampe lief."""
+        if not (self.frostschutz_rampe and (self.strahler_auftrag is not None or self.strahler_fahrplan
+                                            or self.strahler_pruefstufe is not None)):
+            return False
+        self.strahler_auftrag = None
+        self.strahler_fahrplan = []
+        self.strahler_pruefstufe = None
+        self.frostschutz_rampe = False
+        self.frostschutz_abbrueche += 1
+        self.frostschutzfeedback = 0
+        self.frostschutzfeedbackstring = "Aus"
+        if ausschalten:
+            self.strahler_fahren(0)
+        return True
+
+    def regler_messen(self, jetzt):
+        """Neue Temperatur mit der mittleren Leistung seit der vorherigen Messung an den Modellregler geben.
+        Die Leistung wird in regeln() aus der Nennleistung der Stufe aufsummiert, die gemessene Leistung
+        ist ab Stufe 2 abgeschnitten und würde die Erwärmung der hohen Stufen zu klein lernen"""
+        if self.regler_zeit is None:
+            self.regler.messung(self.raumtemp.wert(), 0, 0) # erste Messung, noch keine Steigung
+        else:
+            dauer = time.ticks_diff(jetzt, self.regler_zeit)
+            leistung = self.regler_energie / dauer if dauer > 0 else 0
+            self.regler.messung(self.raumtemp.wert(), leistung, dauer / 1000)
+        self.regler_energie = 0
+        self.regler_zeit = jetzt
+
+    def regeln(self, jetzt):
+        """Heizstrahler auf die Stufe des Modellreglers fahren, aus Aus über die Rampe wie beim Frostschutz.
+        Gesendet wird nur, wenn der Regler eine andere Stufe wählt. Ein Stufenbefehl vom Dashboard
+        hat Vorrang, nach einem Aus-Befehl übernimmt der Regler wieder."""
+        # Nennleistung der Stufe seit dem letzten Aufruf aufsummieren, regler_messen() bildet den Mittelwert
+        if self.regler_summiert is not None:
+            self.regler_energie += self.regler.leistungen[self.strahlerfeedback] * time.ticks_diff(jetzt, self.regler_summiert)
+        self.regler_summiert = jetzt
+
+        if not self.umwelt_gemessen or self.neu_strahlersteuerung in [1, 2, 3]:
+            self.regler_gefahren = None
+            return None
+        stufe = self.regler.stufe
+        if stufe != self.regler_gefahren:
+            if self.strahler_auftrag is not None:
+                ziel = self.strahler_auftrag[0]
+            else:
+                ziel = self.strahler_ziel if self.strahler_fahrplan else self.strahlerstufe
+            if stufe != ziel:
+                self.strahler_fahren(stufe, self.frostschutz_stufenabstaende if self.strahlerstufe == 0 else None)
+            self.regler_gefahren = stufe
+
+        # Frostschutzfeedback: Aktiv, solange der Regler heizt
+        self.frostschutzfeedback = 1 if stufe > 0 else 0
+        self.frostschutzfeedbackstring = "Aktiv" if stufe > 0 else "Aus"
+        return None
+
+    def sensordaten_eintragen(self):
+        """Sensordaten in die Plätze der Telemetrie schreiben (Reihenfolge wie SENSORFELDER)"""
+        sensoren = self.sensor_telemetrie
+        sensoren.setzen(0, self.raumtemperatur)
+        sensoren.setzen(1, self.luftfeuchtigkeit)
+        sensoren.setzen(2, self.co2_wert)
+        sensoren.setzen(3, self.tvoc_wert)
+        sensoren.setzen(4, self.momt_leistung)
+        sensoren.setzen(5, self.ges_verbrauch)
+
+    def feedbackdaten_eintragen(self):
+        """Feedback vom Strahler in die Plätze der Telemetrie schreiben (Reihenfolge wie FEEDBACKFELDER)"""
+        feedback = self.feedback_telemetrie
+        feedback.setzen(0, self.strahlerfeedback)
+        feedback.setzen(1, self.frostschutzfeedbackstring)
+        feedback.setzen(2, self.frostschutzschwellwert)
+        feedback.setzen(3, self.frostschutzaus)
+
+    def task_senden(self, jetzt):
+        """Daten an den MQTT-Broker senden
+        Gesendet wird, wenn ein Wert sein Totband verlässt, spätestens nach telemetrie_max_stille"""
+        if self.aktiv():
+            self.sensordaten_eintragen()
+            self.sensor_telemetrie.pruefen(jetzt)
+            self.feedbackdaten_eintragen()
+            self.feedback_telemetrie.pruefen(jetzt)
+
+        # Publish-Verbindung offen halten (Keepalive und Reconnect)
+        self.pb_sitzung.pflegen()
+
+    def task_nachsenden(self, jetzt):
+        """Abgelegte Nachrichten nach dem Reconnect nachsenden, pro Aufruf ein Stapel.
+        Nur bei bestehender Verbindung, damit kein zusätzlicher Reconnect-Versuch entsteht"""
+        if self.aktiv() and self.pb_sitzung.verbunden and len(self.warteschlange):
+            try:
+                self.warteschlange.nachsenden(self.pb_sitzung.senden)
+            except OSError as e:
+                # Fehler beim Lesen der Datei, beim nächsten Aufruf erneut versuchen
+                self.pb_sitzung.fehler = e
+
+    def task_anzeige(self, jetzt):
+        """Geänderte Werte auf dem Bildschirm anzeigen
+        Die Statusanzeige sendet nur die Zeichen, die sich seit der letzten Anzeige geändert haben.
+        Mit Bildpuffer gehen alle Änderungen seit dem letzten Aufruf (auch Fehlertexte) gesammelt raus"""
+        anzeige = self.statusanzeige
+        anzeige.setzen(self.feld_temperatur, self.raumtemperatur)
+        anzeige.setzen(self.feld_luftfeuchtigkeit, self.luftfeuchtigkeit)
+        anzeige.setzen(self.feld_co2, self.co2_wert)
+        anzeige.setzen(self.feld_tvoc, self.tvoc_wert)
+        anzeige.setzen(self.feld_leistung, self.momt_leistung)
+        anzeige.setzen(self.feld_verbrauch, self.ges_verbrauch)
+        anzeige.setzen(self.feld_frostschutz, self.frostschutzschwellwert)
+        self.anzeigen()
+
+    def task_trend(self, jetzt):
+        """Eine neue Spalte im Verlauf von Temperatur und Leistung"""
+        self.trendanzeige.hinzufuegen((self.raumtemperatur, self.momt_leistung))
+
+    def task_zeitreihe(self, jetzt):
+        """Aktuelle Messwerte mit Uhrzeit an den Verlauf anhängen (Reihenfolge wie zeitreihe.MESSWERTE).
+        Temperatur und Luftfeuchtigkeit ungerundet aus den Filtern, Fehler werden als fehlende Werte gespeichert.
+        Kodiert nur in den RAM, nur wenn task_zeitreihe_sichern zu selten läuft, wird hier geschrieben"""
+        if not self.umwelt_gemessen:
+            return None
+        umwelt = isinstance(self.raumtemperatur, int)
+        try:
+            self.zeitreihe.anhaengen(time.time(), (self.raumtemp.wert() if umwelt else None,
+                                                   self.raumluft.wert() if umwelt else None,
+                                                   self.co2_wert, self.tvoc_wert, self.momt_leistung), jetzt)
+        except OSError:
+            # Flash voll oder Dateifehler: dieser Datensatz fehlt im Verlauf, die Steuerung läuft weiter
+            pass
+        return None
+
+    def task_zeitreihe_sichern(self, jetzt):
+        """Verlauf in den Flash schreiben, wenn es fällig ist (höchstens einmal pro Schreibabstand).
+        Nicht, solange der Heizstrahler gefahren oder geprüft wird, dann im nächsten Intervall"""
+        if self.strahler_auftrag is not None or self.strahler_fahrplan or self.strahler_pruefstufe is not None:
+            return None
+        try:
+            self.zeitreihe.sichern(jetzt)
+        except OSError:
+            # Flash voll oder Dateifehler: der Puffer bleibt erhalten, nächster Versuch im nächsten Intervall
+            pass
+        return None
+
+    def task_empfangen(self, jetzt):
+        """Daten vom Broker empfangen"""
+        txt, font = self.txt, self.font
+
+        # Gemeinsame Verbindung: Abbrüche führen zum Reconnect mit Backoff und erneutem Abonnieren,
+        # die Hauptschleife läuft weiter
+        if self.subscribe_client is None:
+            if self.aktiv():
+                self.pb_sitzung.empfangen()
+            return
+
+        # Nach neuen Nachrichten Abfragen
+        if self.wlan.isconnected() and self.mqttsb_verbunden:
+            try:
+                self.subscribe_client.check_msg()
+
+            except OSError as e:
+                # Fehlerbehandlung bei Netzwerkfehler
+                try:
+                    # Überprüfen ob eine Verbindung zum Wlan Netzwerkvorhanden ist
+                    if not self.wlan.isconnected():
+                        self.wifi_verbindung() # Wlan-Verbindung wieder herstellen, sollte keine da sein
+
+                    # Reconntecten und Subscriben
+                    self.subscribe_verbinden()
+
+                    # Erneut nach neuen Nachrichten Abfragen
+                    self.subscribe_client.check_msg()
+
+                except Exception as e2:
+                    # Fehlernachricht falls das Reconnecten nicht funktioniert
+                    txt.fill(SCHWARZ)
+                    txt.text(font, "Fehler beim Reconnect mit", 60, 132, CYAN, SCHWARZ)
+                    txt.text(font, "MQTT-Broker-Subscribe-", 85, 155, CYAN, SCHWARZ)
+                    txt.text(font, f"Fehler {e2}", 30, 178, CYAN, SCHWARZ)
+
+                    # Der Wert wird auf False gesetzt um die Hauptschleife kontrolliert zu beenden
+                    self.mqttsb_verbunden = False
+
+            except Exception as e:
+                # Anzeige des Fehler Textes
+                txt.fill(SCHWARZ)
+                txt.text(font, "Fehler beim Verbinden mit", 60, 132, CYAN, SCHWARZ)
+                txt.text(font, "MQTT-Broker-Subscribe", 85, 155, CYAN, SCHWARZ)
+                txt.text(font, f"Fehler {e}", 30, 178, CYAN, SCHWARZ)
+
+                # Der Wert wird auf False gesetzt um die Hauptschleife kontrolliert zu beenden
+                self.mqttsb_verbunden = False
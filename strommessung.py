@@ -0,0 +1,96 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: strommessung
+#Aufgabe: Echte Effektivwertmessung (True-RMS) des Stroms mit dem ACS712 (DeboSens20A)
+#		  Abtastung ganzer Netzperioden mit fester Abtastrate in einen festen Puffer
+#		  Berechnung von Effektivstrom und Leistung in einem Durchlauf ohne neuen Speicher
+#		  Für kurze Messfenster (Prüfen der Stufe) können weniger Perioden abgetastet werden
+
+#=====Bibliotheken=====#
+import time
+from array import array
+from math import sqrt
+
+try:
+    import micropython
+    native = micropython.native # Schnellere Schleifen auf dem ESP32
+except ImportError:
+    native = lambda funktion: funktion # Unter CPython ohne Änderung
+#======================#
+
+
+class EffektivwertMessung:
+    """Tastet den ADC über ganze Netzperioden ab und berechnet den Effektivwert.
+    Der Gleichanteil (Nullpunkt des Sensors) wird aus den Messwerten selbst
+    bestimmt, da über ganze Perioden der Mittelwert des Wechselstroms 0 ist."""
+
+    def __init__(self, adc, abtastrate=2000, perioden=5, netzfrequenz=50,
+                 mv_pro_a=100, offset_mv=2500, spannung=230, adc_max=4095, adc_mv=3300):
+        self.adc = adc
+        self.abtastrate = abtastrate # in Hz
+        self.perioden = perioden # Anzahl der Netzperioden pro Messung
+        self.netzfrequenz = netzfrequenz
+        self.anzahl = abtastrate * perioden // netzfrequenz
+        self.intervall_us = 1000000 // abtastrate
+        self.puffer = array("H", [0] * self.anzahl)
+        self.mv_pro_a = mv_pro_a
+        self.spannung = spannung
+        self.mv_pro_stufe = adc_mv / adc_max
+        # Erwarteter Nullpunkt in ADC-Stufen. Die Quadrate bleiben dadurch klein (Small Int)
+        self.nullpunkt = int(offset_mv / self.mv_pro_stufe)
+        self.dauer_us = 0 # Tatsächliche Dauer der letzten Abtastung
+
+    def anzahl_fuer(self, perioden):
+        """Anzahl der Abtastungen für perioden ganze Netzperioden, höchstens die Größe des Puffers"""
+        if perioden is None:
+            return self.anzahl
+        return min(self.anzahl, self.abtastrate * perioden // self.netzfrequenz)
+
+    @native
+    def erfassen(self, anzahl=0):
+        """Abtastung mit fester Abtastrate in den Puffer (anzahl=0: ganzer Puffer)"""
+        lesen = self.adc.read
+        puffer = self.puffer
+        intervall = self.intervall_us
+        ticks_us = time.ticks_us
+        ticks_diff = time.ticks_diff
+        ticks_add = time.ticks_add
+        start = ticks_us()
+        naechster = start
+        for i in range(anzahl or self.anzahl):
+            # Warten bis zum nächsten Abtastzeitpunkt
+            while ticks_diff(ticks_us(), naechster) < 0:
+                pass
+            puffer[i] = lesen()
+            naechster = ticks_add(naechster, intervall)
+        self.dauer_us = ticks_diff(ticks_us(), start)
+
+    @native
+    def _summen(self, anzahl):
+        """Summe und Quadratsumme der Abweichungen vom erwarteten Nullpunkt"""
+        puffer = self.puffer
+        nullpunkt = self.nullpunkt
+        summe = 0
+        quadrate = 0
+        for i in range(anzahl):
+            d = puffer[i] - nullpunkt
+            summe += d
+            quadrate += d * d
+        return summe, quadrate
+
+    def auswerten(self, anzahl=0):
+        """Effektivwert des Stroms in A aus dem letzten Puffer (die ersten anzahl Werte)"""
+        n = anzahl or self.anzahl
+        summe, quadrate = self._summen(n)
+        # Varianz um den gemessenen Mittelwert = Quadrat des Effektivwerts ohne Gleichanteil
+        varianz = quadrate / n - (summe / n) ** 2
+        if varianz < 0:
+            varianz = 0
+        return sqrt(varianz) * self.mv_pro_stufe / self.mv_pro_a
+
+    def messen(self, perioden=None):
+        """Abtasten und auswerten. Gibt (Effektivstrom in A, Leistung in W) zurück.
+        perioden: kürzeres Messfenster in Netzperioden, sonst die eingestellten Perioden"""
+        anzahl = self.anzahl_fuer(perioden)
+        self.erfassen(anzahl)
+        strom = self.auswerten(anzahl)
+        return strom, strom * self.spannung
@@ -0,0 +1,97 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: telemetrie
+#Aufgabe: Messwerte nur bei einer merklichen Änderung an den MQTT-Broker senden
+#		  Jedes Feld hat ein eigenes Totband (absolut und relativ zum zuletzt gesendeten Wert)
+#		  Spätestens nach max_stille ms wird trotzdem gesendet (Lebenszeichen)
+#		  Die Werte liegen in festen Plätzen, pro Durchlauf wird kein neues Dictionary erstellt
+
+#=====Bibliotheken=====#
+import time
+#======================#
+
+
+class Telemetrie:
+    """Sendet die Felder eines Topics, wenn ein Wert sein Totband verlässt.
+
+    felder: je Feld (Name, absolutes Totband, relatives Totband). Ein Wert gilt
+    als geändert, wenn er sich vom zuletzt gesendeten um mehr als das größere
+    der beiden Totbänder unterscheidet (relativ: Anteil des gesendeten Werts).
+    Totband 0 bedeutet: jede Änderung wird gesendet. Werte, die keine Zahlen
+    sind (z.B. Texte), werden nur auf Gleichheit geprüft.
+
+    Ohne einzeltopics geht bei einer Änderung die ganze Nachricht als JSON an
+    topic, wie bisher. Mit einzeltopics wird jedes geänderte Feld einzeln an
+    topic/Name gesendet. Nach max_stille ms ohne Nachricht werden alle Felder
+    gesendet. senden(topic, daten) gibt zurück, ob gesendet wurde; nur dann
+    gelten die Werte als gesendet."""
+
+    def __init__(self, senden, topic, felder, max_stille=60000, einzeltopics=False):
+        self.senden = senden
+        self.topic = topic
+        self.namen = tuple(name for name, _, _ in felder)
+        self.absolut = tuple(absolut for _, absolut, _ in felder)
+        self.relativ = tuple(relativ for _, _, relativ in felder)
+        self.max_stille = max_stille
+        self.einzeltopics = einzeltopics
+        self.topics = tuple(topic + "/" + name for name in self.namen)
+
+        # Feste Plätze: aktuelle und zuletzt gesendete Werte, Nachricht mit festen Schlüsseln
+        self.werte = [None] * len(felder)
+        self.gesendet = [None] * len(felder)
+        self.nachricht = {name: None for name in self.namen}
+        self.letzte_sendung = None # ticks_ms, None = noch nie gesendet
+
+        # Zähler für die Auswertung
+        self.pruefungen = 0
+        self.nachrichten = 0
+
+    def setzen(self, nummer, wert):
+        """Aktuellen Wert eines Feldes eintragen (Nummer in der Reihenfolge der Felder)"""
+        self.werte[nummer] = wert
+
+    def geaendert(self, nummer):
+        """Hat der Wert sein Totband gegenüber dem gesendeten Wert verlassen?"""
+        neu = self.werte[nummer]
+        alt = self.gesendet[nummer]
+        if alt is None or neu is None or isinstance(neu, str) or isinstance(alt, str):
+            return neu != alt
+        if neu == alt:
+            return False
+        grenze = self.relativ[nummer] * abs(alt)
+        if grenze < self.absolut[nummer]:
+            grenze = self.absolut[nummer]
+        return abs(neu - alt) > grenze
+
+    def pruefen(self, jetzt):
+        """Geänderte Felder senden, nach max_stille alle. Gibt die Anzahl der gesendeten Nachrichten zurück."""
+        alle = self.letzte_sendung is None or time.ticks_diff(jetzt, self.letzte_sendung) >= self.max_stille
+        anzahl = 0
+
+        if self.einzeltopics:
+            for nummer in range(len(self.werte)):
+                if alle or self.geaendert(nummer):
+                    if self.senden(self.topics[nummer], self.werte[nummer]):
+                        self.gesendet[nummer] = self.werte[nummer]
+                        anzahl += 1
+                    else:
+                        break
+        else:
+            senden = alle
+            nummer = 0
+            while not senden and nummer < len(self.werte):
+                senden = self.geaendert(nummer)
+                nummer += 1
+            if senden:
+                nachricht = self.nachricht
+                for nummer, name in enumerate(self.namen):
+                    nachricht[name] = self.werte[nummer]
+                if self.senden(self.topic, nachricht):
+                    for nummer in range(len(self.werte)):
+                        self.gesendet[nummer] = self.werte[nummer]
+                    anzahl = 1
+
+        self.pruefungen += 1
+        if anzahl:
+            self.letzte_sendung = jetzt
+            self.nachrichten += anzahl
+        return anzahl
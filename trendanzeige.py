@@ -0,0 +1,148 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: trendanzeige
+#Aufgabe: Verlauf von Messwerten (z.B. Temperatur und Leistung) als Streifenschreiber auf dem ST7789
+#		  Der Bildschirm verschiebt den Verlauf selbst (Hardware-Scrolling mit VSCRDEF/VSCSAD),
+#		  pro Messung wird nur eine neue Spalte in einem Fenster gesendet
+#		  Bei rotation=1 (quer) scrollt der Bildschirm waagerecht, der Bereich geht über die ganze Höhe
+
+#=====Bibliotheken=====#
+from array import array
+#======================#
+
+# Farben wie in st7789py
+SCHWARZ = 0x0000
+GRAU = 0x4208
+
+LUECKE = float("nan") # fehlender Messwert (z.B. "Fehler"), wird als Lücke gezeichnet
+
+
+class Messring:
+    """Ring fester Größe mit den letzten Messwerten, der älteste wird überschrieben.
+    Werte, die keine Zahl sind (z.B. "Fehler"), werden als LUECKE gespeichert"""
+
+    def __init__(self, groesse):
+        self.werte = array("f", [0.0] * groesse)
+        self.groesse = groesse
+        self.kopf = 0 # nächster Schreibplatz
+        self.anzahl = 0
+
+    def hinzufuegen(self, wert):
+        self.werte[self.kopf] = wert if isinstance(wert, (int, float)) else LUECKE
+        self.kopf = (self.kopf + 1) % self.groesse
+        if self.anzahl < self.groesse:
+            self.anzahl += 1
+
+    def __len__(self):
+        return self.anzahl
+
+    def __getitem__(self, i):
+        """i = 0 ist der älteste gespeicherte Wert"""
+        return self.werte[(self.kopf - self.anzahl + i) % self.groesse]
+
+
+class Trendanzeige:
+    """Streifenschreiber im Bereich x bis x + breite über die ganze Höhe des Bildschirms.
+
+    kurven: je Kurve (y, hoehe, minimum, maximum, farbe). Werte außerhalb von
+    minimum bis maximum werden auf den Rand gesetzt. Der Bereich wird als
+    Scrollbereich definiert, links und rechts davon bleibt der Bildschirm fest.
+    hinzufuegen() schreibt die neue Spalte an die nächste Stelle im Bildspeicher
+    (ein blit_buffer) und verschiebt den Scroll-Anfang, sodass sie am rechten
+    Rand erscheint. gespiegelt=True, wenn der Bildschirm die Zeilen in der
+    eingestellten Drehung von rechts nach links ausgibt."""
+
+    def __init__(self, txt, x, breite, hoehe=240, kurven=(), hintergrund=SCHWARZ, trennlinie=GRAU,
+                 bildschirmbreite=320, gespiegelt=False):
+        self.txt = txt
+        self.x = x
+        self.breite = breite
+        self.hoehe = hoehe
+        self.kurven = kurven
+        self.bildschirmbreite = bildschirmbreite
+        self.gespiegelt = gespiegelt
+        self.ringe = [Messring(breite) for _ in kurven]
+        self.letzte = [None] * len(kurven) # y der letzten Spalte je Kurve, zum Verbinden
+        self.kopf = 0 # Platz der nächsten Spalte im Scrollbereich
+        self.aktiv = False
+
+        # Spalte ohne Kurven: Hintergrund mit Trennlinie über jeder Kurve außer der ersten
+        vorlage = bytearray(bytes((hintergrund >> 8, hintergrund & 0xFF)) * hoehe)
+        for y, _, _, _, _ in kurven[1:]:
+            if 0 < y <= hoehe:
+                vorlage[2 * (y - 1)] = trennlinie >> 8
+                vorlage[2 * (y - 1) + 1] = trennlinie & 0xFF
+        self.vorlage = bytes(vorlage)
+        self.spalte = bytearray(vorlage)
+
+        # Scrollbereich in Zeilen des Bildspeichers
+        self.anfang = bildschirmbreite - x - breite if gespiegelt else x
+        self.bytes_spi = 0
+        self.fenster = 0
+
+    def starten(self):
+        """Scrollbereich festlegen und den Verlauf aus den Ringen neu zeichnen"""
+        self.txt.vscrdef(self.anfang, self.breite, self.bildschirmbreite - self.anfang - self.breite)
+        self.aktiv = True
+        self.kopf = 0
+        self.letzte = [None] * len(self.kurven)
+        anzahl = len(self.ringe[0]) if self.ringe else 0
+        for _ in range(self.breite - anzahl):
+            # Noch leere Plätze links von den vorhandenen Werten
+            self._spalte_senden(None)
+        for i in range(anzahl):
+            self._spalte_senden(i)
+        self._scrollen()
+
+    def beenden(self):
+        """Scrollen aufheben, der Bildspeicher wird wieder unverschoben angezeigt"""
+        if self.aktiv:
+            self.txt.vscrdef(0, self.bildschirmbreite, 0)
+            self.txt.vscsad(0)
+            self.aktiv = False
+
+    def hinzufuegen(self, werte):
+        """Neue Messwerte (einer je Kurve) speichern und als Spalte anzeigen"""
+        for ring, wert in zip(self.ringe, werte):
+            ring.hinzufuegen(wert)
+        if self.aktiv:
+            self._spalte_senden(len(self.ringe[0]) - 1)
+            self._scrollen()
+
+    def _spalte_senden(self, index):
+        """Spalte mit den Werten ringe[..][index] (None = leer) an den Platz kopf senden"""
+        spalte = self.spalte
+        spalte[:] = self.vorlage
+        if index is not None:
+            for nummer, (y, hoehe, minimum, maximum, farbe) in enumerate(self.kurven):
+                wert = self.ringe[nummer][index]
+                if wert != wert:
+                    # Lücke (NaN): kein Punkt, die nächste Linie beginnt neu
+                    self.letzte[nummer] = None
+                    continue
+                anteil = (wert - minimum) / (maximum - minimum) if maximum != minimum else 0
+                anteil = 0 if anteil < 0 else 1 if anteil > 1 else anteil
+                punkt = y + hoehe - 1 - int(anteil * (hoehe - 1) + 0.5)
+
+                # Linie vom Punkt der vorherigen Spalte, damit steile Änderungen zusammenhängen
+                von = self.letzte[nummer]
+                von = punkt if von is None else von
+                self.letzte[nummer] = punkt
+                oben, unten = (von, punkt) if von < punkt else (punkt, von)
+                hi, lo = farbe >> 8, farbe & 0xFF
+                for zeile in range(oben, unten + 1):
+                    spalte[2 * zeile] = hi
+                    spalte[2 * zeile + 1] = lo
+
+        zeile = self.anfang + self.kopf
+        x = self.bildschirmbreite - 1 - zeile if self.gespiegelt else zeile
+        self.txt.blit_buffer(spalte, x, 0, 1, self.hoehe)
+        self.fenster += 1
+        self.bytes_spi += 11 + 2 * self.hoehe
+        self.kopf = (self.kopf + 1) % self.breite
+
+    def _scrollen(self):
+        """Scroll-Anfang so setzen, dass die zuletzt gesendete Spalte am rechten Rand steht"""
+        neueste = (self.kopf - 1) % self.breite
+        versatz = neueste if self.gespiegelt else (neueste + 1) % self.breite
+        self.txt.vscsad(self.anfang + versatz)
+        self.bytes_spi += 3
@@ -0,0 +1,235 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: warteschlange
+#Aufgabe: Nachrichten zwischenspeichern, solange der MQTT-Broker oder das WLAN nicht erreichbar ist
+#		  Die Nachrichten liegen zuerst in einem Ring im RAM. Ist er voll, wird er in einem Stück
+#		  in einen Ring aus festen Datensätzen im Flash geschrieben
+#		  Ist die Verbindung wieder da, werden die Nachrichten in Stapeln mit ihrer ursprünglichen
+#		  Zeit nachgesendet
+
+#=====Bibliotheken=====#
+import struct
+import time
+#======================#
+
+#=====Datensatz=====#
+# Kennung (2 Byte), laufende Nummer (4 Byte), Zeit in s (4 Byte), Länge des Topics (1 Byte),
+# Länge der Nachricht (2 Byte), Prüfsumme (2 Byte), danach Topic und Nachricht (JSON)
+KOPF_FORMAT = "<HIIBHH"
+KOPF_GROESSE = struct.calcsize(KOPF_FORMAT) # 15 Byte
+SATZ_GROESSE = 256
+MAX_NUTZDATEN = SATZ_GROESSE - KOPF_GROESSE # Topic und Nachricht zusammen
+SATZ_KENNUNG = 0x5EA7
+LEER_STUECK = 16 # Datensätze pro Schreibvorgang beim Anlegen der Datei (4 kB RAM statt des ganzen Rings)
+#===================#
+
+# MicroPython zählt die Zeit ab 2000, der Nachtrag enthält Unix-Zeit
+UNIX_VERSATZ = 946684800 if time.gmtime(0)[0] == 2000 else 0
+
+
+def _pruefsumme(puffer, start):
+    """Summe der Bytes von Kopf (ohne Prüfsumme), Topic und Nachricht eines Datensatzes,
+    erkennt z.B. einen abgebrochenen Schreibvorgang. sum() über die memoryview läuft ohne Kopie."""
+    laenge_topic, laenge = struct.unpack_from("<BH", puffer, start + KOPF_GROESSE - 5)
+    daten = memoryview(puffer)
+    return (sum(daten[start:start + KOPF_GROESSE - 2])
+            + sum(daten[start + KOPF_GROESSE:start + KOPF_GROESSE + laenge_topic + laenge])) & 0xFFFF
+
+
+class Warteschlange:
+    """Nachrichten, die nicht gesendet werden konnten, mit Zeit und Topic.
+
+    ablegen() schreibt in den nächsten Platz des RAM-Rings (ram_plaetze
+    Datensätze). Ist er voll, wird er mit einem oder zwei Schreibvorgängen an
+    den Flash-Ring (flash_plaetze Datensätze in datei) angehängt. Ist auch der
+    Flash-Ring voll oder der Flash nicht beschreibbar, wird die älteste
+    Nachricht überschrieben (verloren zählt mit). nachsenden() schickt die ältesten bis zu stapel Nachrichten als
+    eine JSON-Liste an topic_nachtrag:
+    [{"Zeit": Unix-Zeit, "Topic": ..., "Daten": ...}, ...]
+    Daten ist die ursprüngliche Nachricht als JSON, auch wenn direkt im
+    Binärformat gesendet wird. Der Flow "Nachtrag in Datenbank schreiben" in
+    Node-Red-Flows.json übernimmt daraus die Sensorwerte.
+    Nachgesendete Datensätze im Flash werden ungültig gemacht, damit sie nach
+    einem Neustart nicht noch einmal gesendet werden."""
+
+    def __init__(self, datei="warteschlange.bin", ram_plaetze=32, flash_plaetze=1024,
+                 topic_nachtrag="Raum/Nachtrag", stapel=32):
+        self.datei = datei
+        self.ram_plaetze = ram_plaetze
+        self.flash_plaetze = flash_plaetze
+        self.topic_nachtrag = topic_nachtrag
+        self.stapel = stapel
+
+        # RAM-Ring im gleichen Format wie der Flash, damit er unverändert geschrieben werden kann
+        self.ram = bytearray(ram_plaetze * SATZ_GROESSE)
+        self.ram_anfang = 0 # laufende Nummer des ältesten Datensatzes im RAM
+        self.nummer = 0 # laufende Nummer des nächsten Datensatzes
+        # Flash-Ring: Datensätze flash_anfang bis flash_ende - 1, Platz = Nummer % flash_plaetze
+        self.flash_anfang = 0
+        self.flash_ende = 0
+        self.satz = bytearray(SATZ_GROESSE)
+
+        # Zähler für die Auswertung
+        self.abgelegt = 0
+        self.nachgesendet = 0
+        self.verloren = 0
+        self.zu_gross = 0
+        self.flash_bytes = 0 # in den Flash geschrieben, mit dem Ungültigmachen
+
+    def __len__(self):
+        return (self.flash_ende - self.flash_anfang) + (self.nummer - self.ram_anfang)
+
+    def laden(self):
+        """Noch nicht gesendete Datensätze im Flash nach einem Neustart wiederfinden.
+        Gibt die Anzahl zurück."""
+        erste = letzte = None
+        anzahl = 0
+        try:
+            with open(self.datei, "rb") as f:
+                for _ in range(self.flash_plaetze):
+                    if f.readinto(self.satz) != SATZ_GROESSE:
+                        break
+                    if self._gueltig(self.satz, 0):
+                        nummer = struct.unpack_from("<I", self.satz, 2)[0]
+                        erste = nummer if erste is None or nummer < erste else erste
+                        letzte = nummer if letzte is None or nummer > letzte else letzte
+                        anzahl += 1
+        except OSError:
+            # Noch keine Datei vorhanden
+            return 0
+        if anzahl:
+            self.flash_anfang = erste
+            self.flash_ende = letzte + 1
+            self.nummer = self.ram_anfang = self.flash_ende
+        return anzahl
+
+    @staticmethod
+    def _gueltig(puffer, start):
+        kennung, _, _, laenge_topic, laenge, summe = struct.unpack_from(KOPF_FORMAT, puffer, start)
+        if kennung != SATZ_KENNUNG or laenge_topic + laenge > MAX_NUTZDATEN:
+            return False
+        return summe == _pruefsumme(puffer, start)
+
+    #=====Ablegen=====#
+    def ablegen(self, topic, nachricht, zeit=None):
+        """Nachricht (JSON als str oder bytes) zum Nachsenden speichern.
+        zeit in s (time.time()), ohne Angabe die aktuelle Zeit.
+        Gibt False zurück, wenn Topic und Nachricht nicht in einen Datensatz passen."""
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(nachricht, str):
+            nachricht = nachricht.encode()
+        laenge_topic, laenge = len(topic), len(nachricht)
+        if laenge_topic > 255 or laenge_topic + laenge > MAX_NUTZDATEN:
+            self.zu_gross += 1
+            return False
+        if self.nummer - self.ram_anfang >= self.ram_plaetze and not self._auslagern():
+            # Flash nicht beschreibbar: die älteste Nachricht im RAM wird überschrieben
+            self.ram_anfang += 1
+            self.verloren += 1
+
+        start = (self.nummer % self.ram_plaetze) * SATZ_GROESSE
+        daten = start + KOPF_GROESSE
+        ram = self.ram
+        struct.pack_into(KOPF_FORMAT, ram, start, SATZ_KENNUNG, self.nummer,
+                         time.time() if zeit is None else zeit, laenge_topic, laenge, 0)
+        ram[daten:daten + laenge_topic] = topic
+        ram[daten + laenge_topic:daten + laenge_topic + laenge] = nachricht
+        struct.pack_into("<H", ram, start + KOPF_GROESSE - 2, _pruefsumme(ram, start))
+        self.nummer += 1
+        self.abgelegt += 1
+        return True
+
+    def _auslagern(self):
+        """Den vollen RAM-Ring an den Flash-Ring anhängen.
+        Gibt False zurück, wenn die Datei nicht geschrieben werden konnte (z.B. Flash voll)."""
+        ram = memoryview(self.ram)
+        try:
+            try:
+                f = open(self.datei, "r+b")
+            except OSError:
+                f = self._anlegen()
+            with f:
+                nummer = self.ram_anfang
+                while nummer < self.nummer:
+                    # Zusammenhängende Stücke bis zum Ende des RAM-Rings oder des Flash-Rings
+                    ram_platz = nummer % self.ram_plaetze
+                    flash_platz = nummer % self.flash_plaetze
+                    stueck = min(self.nummer - nummer, self.ram_plaetze - ram_platz, self.flash_plaetze - flash_platz)
+                    f.seek(flash_platz * SATZ_GROESSE)
+                    f.write(ram[ram_platz * SATZ_GROESSE:(ram_platz + stueck) * SATZ_GROESSE])
+                    self.flash_bytes += stueck * SATZ_GROESSE
+                    nummer += stueck
+        except (OSError, MemoryError):
+            return False
+
+        if self.flash_anfang == self.flash_ende:
+            self.flash_anfang = self.ram_anfang
+        self.flash_ende = self.nummer
+        if self.flash_ende - self.flash_anfang > self.flash_plaetze:
+            # Die ältesten Datensätze wurden überschrieben
+            self.verloren += self.flash_ende - self.flash_plaetze - self.flash_anfang
+            self.flash_anfang = self.flash_ende - self.flash_plaetze
+        self.ram_anfang = self.nummer
+        return True
+
+    def _anlegen(self):
+        """Datei mit leeren Plätzen anlegen, in Stücken von LEER_STUECK Datensätzen.
+        Ein Puffer über den ganzen Flash-Ring (z.B. 512 kB) passt nicht in den RAM.
+        Bricht das Anlegen ab, wird die kürzere Datei beim nächsten Mal verlängert."""
+        f = open(self.datei, "wb")
+        try:
+            leer = bytearray(SATZ_GROESSE * LEER_STUECK)
+            for platz in range(0, self.flash_plaetze, LEER_STUECK):
+                stueck = min(LEER_STUECK, self.flash_plaetze - platz)
+                f.write(leer if stueck == LEER_STUECK else memoryview(leer)[:stueck * SATZ_GROESSE])
+        except (OSError, MemoryError):
+            f.close()
+            raise
+        return f
+
+    #=====Nachsenden=====#
+    @staticmethod
+    def _eintrag(puffer, start):
+        """Datensatz als JSON-Objekt für den Nachtrag"""
+        _, _, zeit, laenge_topic, laenge, _ = struct.unpack_from(KOPF_FORMAT, puffer, start)
+        daten = start + KOPF_GROESSE
+        return b'{"Zeit":%d,"Topic":"%s","Daten":%s}' % (
+            zeit + UNIX_VERSATZ, bytes(puffer[daten:daten + laenge_topic]),
+            bytes(puffer[daten + laenge_topic:daten + laenge_topic + laenge]))
+
+    def nachsenden(self, senden):
+        """Die ältesten Nachrichten (höchstens stapel) in einer Nachricht senden.
+        senden(topic, bytes) gibt zurück, ob gesendet wurde. Gibt die Anzahl
+        der nachgesendeten Nachrichten zurück."""
+        if self.flash_anfang < self.flash_ende:
+            return self._flash_nachsenden(senden)
+        anzahl = min(self.stapel, self.nummer - self.ram_anfang)
+        if anzahl == 0:
+            return 0
+        eintraege = [self._eintrag(self.ram, (nummer % self.ram_plaetze) * SATZ_GROESSE)
+                     for nummer in range(self.ram_anfang, self.ram_anfang + anzahl)]
+        if not senden(self.topic_nachtrag, b"[" + b",".join(eintraege) + b"]"):
+            return 0
+        self.ram_anfang += anzahl
+        self.nachgesendet += anzahl
+        return anzahl
+
+    def _flash_nachsenden(self, senden):
+        # Nur bis zum Ende des Rings lesen, damit es ein zusammenhängendes Stück bleibt
+        platz = self.flash_anfang % self.flash_plaetze
+        anzahl = min(self.stapel, self.flash_ende - self.flash_anfang, self.flash_plaetze - platz)
+        with open(self.datei, "r+b") as f:
+            f.seek(platz * SATZ_GROESSE)
+            daten = f.read(anzahl * SATZ_GROESSE)
+            # Ungültige Datensätze (z.B. abgebrochener Schreibvorgang) werden übersprungen
+            eintraege = [self._eintrag(daten, i * SATZ_GROESSE) for i in range(anzahl)
+                         if self._gueltig(daten, i * SATZ_GROESSE)]
+            if eintraege and not senden(self.topic_nachtrag, b"[" + b",".join(eintraege) + b"]"):
+                return 0
+            # Nachgesendete Datensätze ungültig machen
+            f.seek(platz * SATZ_GROESSE)
+            f.write(bytearray(anzahl * SATZ_GROESSE))
+            self.flash_bytes += anzahl * SATZ_GROESSE
+        self.flash_anfang += anzahl
+        self.nachgesendet += len(eintraege)
+        return len(eintraege)
@@ -0,0 +1,424 @@
+#Projekt: Smart Heizungssteuerung
+#Programm Name: zeitreihe
+#Aufgabe: Verlauf der Messwerte im Flash speichern und Zeitbereiche abfragen
+#		  Jeder Datensatz enthält nur die Änderung gegenüber dem vorherigen (Zeit und Werte als
+#		  Varint), im Mittel wenige Byte pro Messung. Die Datensätze liegen in einem Ring aus
+#		  Segment-Dateien, das älteste Segment wird überschrieben
+#		  Jedes Segment hat einen Zeitindex (Schlüsselsätze mit vollen Werten), eine Abfrage springt
+#		  zum passenden Segment und Schlüsselsatz und liest nur wenige Datensätze zu viel
+#		  Geschrieben wird gesammelt, höchstens einmal pro schreibabstand, um den Flash zu schonen
+#		  anhaengen() kodiert nur in den RAM, geschrieben wird in sichern() (eigene Aufgabe der Steuerung)
+
+#=====Bibliotheken=====#
+import struct
+import time
+from array import array
+#======================#
+
+#=====Segment=====#
+# Kopf: Kennung (2 Byte), Version (1 Byte), Anzahl Felder (1 Byte), laufende Nummer (4 Byte), erste Zeit in s (4 Byte)
+KOPF_FORMAT = "<HBBII"
+KOPF_GROESSE = struct.calcsize(KOPF_FORMAT) # 12 Byte
+SEGMENT_KENNUNG = 0x7E51
+VERSION = 1
+# Abschluss eines vollen Segments nach dem Zeitindex (je Schlüsselsatz Zeit und Position, 8 Byte):
+# letzte Zeit (4 Byte), Ende der Datensätze (4 Byte), Anzahl Schlüsselsätze (2 Byte), Kennung (2 Byte)
+ABSCHLUSS_FORMAT = "<IIHH"
+ABSCHLUSS_GROESSE = struct.calcsize(ABSCHLUSS_FORMAT) # 12 Byte
+INDEX_KENNUNG = 0x1D3C
+#=================#
+
+#=====Datensatz=====#
+# Varint aus (Zeit << 2) | Lücken << 1 | Schlüssel, danach bei Lücken ein Byte mit den fehlenden Feldern,
+# danach je vorhandenem Feld ein Varint (Zickzack). Im Schlüsselsatz stehen die Zeit in s und die vollen Werte,
+# sonst die Differenz zum vorherigen Datensatz
+SCHLUESSEL = 1
+LUECKEN = 2
+LESEBLOCK = 512 # Byte pro Lesevorgang bei der Abfrage
+RESERVE = 4 # Datensätze, die nach sichern() noch in Puffer und Segment passen müssen
+#===================#
+
+# Felder der Messwerte (Name, Faktor), gespeichert als ganze Zahl mit Faktor wie im Binärformat
+MESSWERTE = (("Temperatur", 100), # in 1/100 °C
+             ("Luftfeuchtigkeit", 10), # in 1/10 %
+             ("CO2_Wert", 1), # in ppm
+             ("TVOC_Wert", 1), # in ppb
+             ("Momentane_Leistung", 1)) # in W
+
+
+def _varint(puffer, pos, wert):
+    """Nicht negative Zahl ab pos schreiben, 7 Bit pro Byte. Gibt die neue Position zurück."""
+    while wert > 0x7F:
+        puffer[pos] = (wert & 0x7F) | 0x80
+        wert >>= 7
+        pos += 1
+    puffer[pos] = wert
+    return pos + 1
+
+
+def _zickzack(wert):
+    """Vorzeichen ins niedrigste Bit: 0, -1, 1, -2 ... -> 0, 1, 2, 3 ..."""
+    return wert << 1 if wert >= 0 else ((-wert) << 1) - 1
+
+
+def _varint_lesen(daten, pos):
+    """Varint ab pos lesen. Gibt Wert und neue Position zurück."""
+    wert = 0
+    schiebung = 0
+    while True:
+        byte = daten[pos]
+        pos += 1
+        wert |= (byte & 0x7F) << schiebung
+        if byte < 0x80:
+            return wert, pos
+        schiebung += 7
+
+
+class Zeitreihe:
+    """Messwerte mit Zeit in einem Ring aus "segmente" Dateien (name_0.bin ...).
+
+    anhaengen() kodiert einen Datensatz in den RAM-Puffer, ohne Zugriff auf den
+    Flash. sichern() wird regelmäßig außerhalb der Regelung aufgerufen und hängt
+    den Puffer an das aktuelle Segment an, wenn schreibabstand abgelaufen ist
+    oder Puffer bzw. Segment fast voll sind (RESERVE Datensätze). Ein fast volles
+    Segment bekommt dort seinen Zeitindex ans Ende, das nächste ersetzt das
+    älteste, seine Datei wird beim ersten Schreiben angelegt. Nur wenn sichern()
+    zu selten läuft, schreibt anhaengen() selbst (im_anhaengen). Jeder index_abstand-te Datensatz
+    ist ein Schlüsselsatz mit vollen Werten, dort beginnt eine Abfrage.
+    abfragen(von, bis) liefert (Zeit, Werte) aus Flash und Puffer, fehlende
+    Werte (z.B. "Fehler") als None."""
+
+    def __init__(self, name="zeitreihe", felder=MESSWERTE, segmente=16, segment_bytes=32768,
+                 index_abstand=64, puffer_bytes=1024, schreibabstand=600000):
+        self.name = name
+        self.namen = tuple(feld for feld, _ in felder)
+        self.faktoren = tuple(faktor for _, faktor in felder)
+        self.segmente = segmente
+        self.segment_bytes = segment_bytes # Datensätze pro Segment höchstens, ohne Kopf und Index
+        self.index_abstand = index_abstand
+        self.schreibabstand = schreibabstand # in ms
+        self.max_satz = 5 + 1 + 5 * len(felder) # Zeit, Lücken, Werte als Varint (je höchstens 5 Byte)
+        self.puffer = bytearray(puffer_bytes)
+        self.fuellstand = 0
+        self.puffer_zeit = None # ticks_ms des ersten Datensatzes im Puffer
+
+        # Aktuelles Segment: laufende Nummer, Länge der Datensätze im Flash, Zeitindex der Schlüsselsätze
+        self.nummer = -1 # -1 = noch kein Segment
+        self.abgeschlossen = True # das Segment hat seinen Zeitindex, der nächste Datensatz beginnt ein neues
+        self.angelegt = False # die Datei des Segments ist geschrieben (Kopf im Flash)
+        self.laenge = 0 # Datensätze im Flash, ohne Puffer
+        self.index_zeiten = array("I")
+        self.index_positionen = array("I")
+        self.anzahl = 0 # Datensätze im Segment, mit Puffer
+        self.zeit = 0 # Zeit und Werte des letzten Datensatzes, davon aus wird die Differenz gebildet
+        self.werte = [0] * len(felder)
+
+        # Zeiten aller Segmente für die Abfrage: laufende Nummer, erste und letzte Zeit (je Platz im Ring)
+        self.seg_nummern = array("i", [-1] * segmente)
+        self.seg_erste = array("I", [0] * segmente)
+        self.seg_letzte = array("I", [0] * segmente)
+
+        # Zähler für die Auswertung
+        self.datensaetze = 0
+        self.schreibvorgaenge = 0
+        self.flash_bytes = 0
+        self.vorzeitig = 0 # Schreibvorgänge vor Ablauf von schreibabstand (Puffer oder Segment voll)
+        self.im_anhaengen = 0 # Schreibvorgänge in anhaengen(), weil sichern() nicht rechtzeitig lief
+
+    def datei(self, nummer):
+        return "%s_%d.bin" % (self.name, nummer % self.segmente)
+
+    #=====Start=====#
+    def laden(self):
+        """Segmente nach einem Neustart wiederfinden. Das neueste, nicht abgeschlossene Segment
+        wird einmal gelesen, um Zeitindex und letzte Werte herzustellen. Gibt die Anzahl der Segmente zurück."""
+        kopf = bytearray(KOPF_GROESSE)
+        abschluss = bytearray(ABSCHLUSS_GROESSE)
+        gefunden = 0
+        offen = None
+        for platz in range(self.segmente):
+            try:
+                with open(self.datei(platz), "rb") as f:
+                    if f.readinto(kopf) != KOPF_GROESSE:
+                        continue
+                    kennung, version, felder, nummer, erste = struct.unpack(KOPF_FORMAT, kopf)
+                    if kennung != SEGMENT_KENNUNG or version != VERSION or felder != len(self.namen) \
+                            or nummer % self.segmente != platz:
+                        continue
+                    groesse = f.seek(0, 2)
+                    letzte, ende = self._abschluss(f, groesse, abschluss)
+            except OSError:
+                # Noch keine Datei an diesem Platz
+                continue
+            gefunden += 1
+            self.seg_nummern[platz] = nummer
+            self.seg_erste[platz] = erste
+            self.seg_letzte[platz] = letzte if ende is not None else erste
+            if nummer > self.nummer:
+                self.nummer = nummer
+                offen = None if ende is not None else groesse
+
+        self.abgeschlossen = offen is None
+        if offen is not None:
+            # Neuestes Segment weiterschreiben: Datensätze einmal lesen (LittleFS schreibt jeden
+            # Schreibvorgang ganz oder gar nicht, die Datei endet mit einem vollständigen Datensatz)
+            self.laenge = offen - KOPF_GROESSE
+            self.angelegt = True
+            with open(self.datei(self.nummer), "rb") as f:
+                for zeit, werte, luecken, anfang, schluessel in self._lesen(f, KOPF_GROESSE, offen, None):
+                    if schluessel:
+                        self.index_zeiten.append(zeit)
+                        self.index_positionen.append(anfang)
+                    self.anzahl += 1
+                    self.zeit = zeit
+                    self.werte = list(werte)
+            self.seg_letzte[self.nummer % self.segmente] = self.zeit
+        return gefunden
+
+    @staticmethod
+    def _abschluss(f, groesse, puffer):
+        """Letzte Zeit und Ende der Datensätze eines vollen Segments, (None, None) ohne Abschluss"""
+        if groesse < KOPF_GROESSE + ABSCHLUSS_GROESSE:
+            return None, None
+        f.seek(groesse - ABSCHLUSS_GROESSE)
+        f.readinto(puffer)
+        letzte, ende, anzahl, kennung = struct.unpack(ABSCHLUSS_FORMAT, puffer)
+        if kennung != INDEX_KENNUNG or ende + anzahl * 8 + ABSCHLUSS_GROESSE != groesse:
+            return None, None
+        return letzte, ende
+
+    #=====Schreiben=====#
+    def anhaengen(self, zeit, werte, jetzt=None):
+        """Datensatz anhängen. zeit in s (time.time()), werte in der Reihenfolge der Felder,
+        Werte, die keine Zahl sind (None, "Fehler"), werden als fehlend gespeichert.
+        jetzt in ms (ticks_ms) für den Schreibabstand, ohne Angabe die aktuelle Zeit."""
+        jetzt = time.ticks_ms() if jetzt is None else jetzt
+        zeit = int(zeit)
+        if not self.abgeschlossen and self.laenge + self.fuellstand + self.max_satz > self.segment_bytes:
+            # sichern() lief nicht rechtzeitig
+            self.im_anhaengen += 1
+            self.schreiben(jetzt)
+            self._abschliessen()
+        elif not self.abgeschlossen and self.fuellstand + self.max_satz > len(self.puffer):
+            self.im_anhaengen += 1
+            self.schreiben(jetzt)
+        if self.abgeschlossen:
+            self._neues_segment(zeit)
+
+        # Schlüsselsatz am Anfang des Segments, alle index_abstand Datensätze und wenn die Uhr zurückspringt
+        dauer = zeit - self.zeit
+        schluessel = self.anzahl % self.index_abstand == 0 or dauer < 0
+        luecken = 0
+        for nummer, wert in enumerate(werte):
+            if not isinstance(wert, (int, float)):
+                luecken |= 1 << nummer
+        if schluessel:
+            self.index_zeiten.append(zeit)
+            self.index_positionen.append(KOPF_GROESSE + self.laenge + self.fuellstand)
+
+        # Direkt in den Puffer kodieren, er hat immer Platz für max_satz
+        puffer = self.puffer
+        pos = _varint(puffer, self.fuellstand, ((zeit if schluessel else dauer) << 2)
+                      | (LUECKEN if luecken else 0) | (SCHLUESSEL if schluessel else 0))
+        if luecken:
+            puffer[pos] = luecken
+            pos += 1
+        vorher = self.werte
+        for nummer, wert in enumerate(werte):
+            if luecken >> nummer & 1:
+                if schluessel:
+                    vorher[nummer] = 0 # wie beim Lesen ab diesem Schlüsselsatz
+                continue
+            wert = int(round(wert * self.faktoren[nummer]))
+            pos = _varint(puffer, pos, _zickzack(wert if schluessel else wert - vorher[nummer]))
+            vorher[nummer] = wert
+
+        self.fuellstand = pos
+        if self.puffer_zeit is None:
+            self.puffer_zeit = jetzt
+        self.zeit = zeit
+        self.anzahl += 1
+        self.datensaetze += 1
+        self.seg_letzte[self.nummer % self.segmente] = zeit
+
+    def sichern(self, jetzt=None):
+        """Puffer schreiben, wenn schreibabstand abgelaufen ist oder er fast voll ist, ein fast volles
+        Segment abschließen. Gibt zurück, ob auf den Flash geschrieben wurde."""
+        if self.abgeschlossen:
+            return False
+        jetzt = time.ticks_ms() if jetzt is None else jetzt
+        reserve = RESERVE * self.max_satz
+        if self.laenge + self.fuellstand + reserve > self.segment_bytes:
+            self.schreiben(jetzt)
+            self._abschliessen()
+            return True
+        if self.fuellstand == 0:
+            return False
+        if time.ticks_diff(jetzt, self.puffer_zeit) >= self.schreibabstand or self.fuellstand + reserve > len(self.puffer):
+            self.schreiben(jetzt)
+            return True
+        return False
+
+    def _abschliessen(self):
+        """Zeitindex und Abschluss an das aktuelle Segment anhängen, der nächste Datensatz beginnt ein neues"""
+        index = bytearray(len(self.index_zeiten) * 8)
+        for nummer in range(len(self.index_zeiten)):
+            struct.pack_into("<II", index, nummer * 8, self.index_zeiten[nummer], self.index_positionen[nummer])
+        with open(self.datei(self.nummer), "ab") as f:
+            f.write(index)
+            f.write(struct.pack(ABSCHLUSS_FORMAT, self.zeit, KOPF_GROESSE + self.laenge,
+                                len(self.index_zeiten), INDEX_KENNUNG))
+        self.flash_bytes += len(index) + ABSCHLUSS_GROESSE
+        self.abgeschlossen = True
+
+    def _neues_segment(self, zeit):
+        """Das älteste Segment durch ein neues ersetzen. Nur im RAM, die Datei legt schreiben() an"""
+        self.nummer += 1
+        platz = self.nummer % self.segmente
+        self.seg_nummern[platz] = self.nummer
+        self.seg_erste[platz] = zeit
+        self.seg_letzte[platz] = zeit
+        self.abgeschlossen = False
+        self.angelegt = False
+        self.laenge = 0
+        self.anzahl = 0
+        self.index_zeiten = array("I")
+        self.index_positionen = array("I")
+
+    def schreiben(self, jetzt=None):
+        """Puffer an das aktuelle Segment anhängen (ein Schreibvorgang), z.B. auch vor dem Ausschalten"""
+        if self.fuellstand == 0:
+            return
+        jetzt = time.ticks_ms() if jetzt is None else jetzt
+        if time.ticks_diff(jetzt, self.puffer_zeit) < self.schreibabstand:
+            self.vorzeitig += 1
+        with open(self.datei(self.nummer), "ab" if self.angelegt else "wb") as f:
+            if not self.angelegt:
+                # Erster Schreibvorgang im Segment: Datei mit Kopf anlegen, das alte Segment an diesem Platz ist weg
+                f.write(struct.pack(KOPF_FORMAT, SEGMENT_KENNUNG, VERSION, len(self.namen), self.nummer,
+                                    self.seg_erste[self.nummer % self.segmente]))
+                self.flash_bytes += KOPF_GROESSE
+            f.write(memoryview(self.puffer)[:self.fuellstand])
+        self.angelegt = True
+        self.laenge += self.fuellstand
+        self.flash_bytes += self.fuellstand
+        self.schreibvorgaenge += 1
+        self.fuellstand = 0
+        self.puffer_zeit = None
+
+    #=====Abfrage=====#
+    def abfragen(self, von, bis):
+        """Datensätze mit von <= Zeit <= bis (in s) als (Zeit, Werte), älteste zuerst.
+        Segmente außerhalb des Bereichs werden nicht geöffnet, im Segment beginnt das
+        Lesen am letzten Schlüsselsatz vor von (Binärsuche im Zeitindex)."""
+        # Segmente in der Reihenfolge ihrer laufenden Nummer, das älteste zuerst
+        for nummer in range(max(0, self.nummer - self.segmente + 1), self.nummer + 1):
+            platz = nummer % self.segmente
+            if self.seg_nummern[platz] != nummer or self.seg_letzte[platz] < von or self.seg_erste[platz] > bis:
+                continue
+            if nummer == self.nummer and not self.abgeschlossen:
+                zeiten, positionen = self.index_zeiten, self.index_positionen
+                ende = KOPF_GROESSE + self.laenge
+                puffer = memoryview(self.puffer)[:self.fuellstand]
+            else:
+                zeiten, positionen, ende = self._index_laden(nummer)
+                puffer = None
+            if not zeiten:
+                continue
+
+            unten, oben = 0, len(zeiten) - 1
+            while unten < oben:
+                mitte = (unten + oben + 1) // 2
+                if zeiten[mitte] <= von:
+                    unten = mitte
+                else:
+                    oben = mitte - 1
+            if nummer == self.nummer and not self.angelegt:
+                f = None # neues Segment, alle Datensätze noch im Puffer
+            else:
+                try:
+                    f = open(self.datei(nummer), "rb")
+                except OSError:
+                    continue
+            try:
+                for zeit, werte, luecken, _, _ in self._lesen(f, positionen[unten], ende, puffer):
+                    if zeit > bis:
+                        break
+                    if zeit >= von:
+                        yield zeit, tuple(None if luecken >> feld & 1 else
+                                          werte[feld] if self.faktoren[feld] == 1 else werte[feld] / self.faktoren[feld]
+                                          for feld in range(len(werte)))
+            finally:
+                if f is not None:
+                    f.close()
+
+    def _index_laden(self, nummer):
+        """Zeitindex eines vollen Segments aus dem Flash: Zeiten, Positionen, Ende der Datensätze"""
+        zeiten, positionen = array("I"), array("I")
+        try:
+            with open(self.datei(nummer), "rb") as f:
+                groesse = f.seek(0, 2)
+                letzte, ende = self._abschluss(f, groesse, bytearray(ABSCHLUSS_GROESSE))
+                if ende is None:
+                    return zeiten, positionen, 0
+                f.seek(ende)
+                daten = f.read(groesse - ABSCHLUSS_GROESSE - ende)
+        except OSError:
+            return zeiten, positionen, 0
+        for pos in range(0, len(daten), 8):
+            zeit, position = struct.unpack_from("<II", daten, pos)
+            zeiten.append(zeit)
+            positionen.append(position)
+        return zeiten, positionen, ende
+
+    def _lesen(self, f, start, ende, puffer):
+        """Datensätze ab dem Schlüsselsatz bei start: aus der Datei f bis ende, danach aus puffer
+        (noch nicht geschriebene Datensätze). Gibt (Zeit, Werte als ganze Zahlen, Lücken,
+        Position des Datensatzes, Schlüsselsatz) zurück, die Liste der Werte wird weiterverwendet."""
+        werte = [0] * len(self.namen)
+        zeit = 0
+        position = start # Position von daten[0]
+        gelesen = start # bis hier ist gelesen (Datei, danach Puffer)
+        daten = b""
+        pos = 0
+        if start < ende:
+            f.seek(start)
+        while True:
+            # Nachladen, solange ein Datensatz über das Ende der Daten reichen könnte
+            if len(daten) - pos < self.max_satz:
+                if gelesen < ende:
+                    neu = f.read(min(LESEBLOCK, ende - gelesen))
+                    gelesen = gelesen + len(neu) if neu else ende
+                elif puffer is not None:
+                    neu = bytes(puffer[gelesen - ende:])
+                    puffer = None
+                else:
+                    neu = None
+                if neu:
+                    position += pos
+                    daten = daten[pos:] + neu
+                    pos = 0
+                    continue
+            if pos >= len(daten):
+                return
+            anfang = position + pos
+            try:
+                kopf, pos = _varint_lesen(daten, pos)
+                luecken = 0
+                if kopf & LUECKEN:
+                    luecken = daten[pos]
+                    pos += 1
+                schluessel = kopf & SCHLUESSEL
+                zeit = (kopf >> 2) if schluessel else zeit + (kopf >> 2)
+                for nummer in range(len(werte)):
+                    if luecken >> nummer & 1:
+                        if schluessel:
+                            werte[nummer] = 0
+                        continue
+                    z, pos = _varint_lesen(daten, pos)
+                    differenz = (z >> 1) ^ -(z & 1)
+                    werte[nummer] = differenz if schluessel else werte[nummer] + differenz
+            except IndexError:
+                # Unvollständiger Datensatz am Ende (beschädigte Datei)
+                return
+            yield zeit, werte, luecken, anfang, schluessel